@@ -0,0 +1,256 @@
+"""Artifact serving for /output — in-memory, compressed, revalidatable.
+
+Every file served from OUTPUT_DIR (charts, reports, traces, profiles) is
+read once into a byte-bounded LRU together with a strong ETag (a hash of
+its content) and precompressed gzip / brotli variants for text formats.
+Repeat requests are answered from memory, and a viewer that already has
+the file gets a 304.
+
+Cache-Control:
+  per-run files (reports/{run_id}.md, traces/, profiles/) are written
+  once, atomically (backend/crew/files.py), when their run ends and are
+  served as immutable; anything
+  requested with ?v=<etag> is immutable too (the URL names the content).
+  Everything else — charts, whose names the LLM picks and later runs may
+  overwrite — is `no-cache`: the browser revalidates, and gets a 304.
+
+Cached entries for mutable files are checked against the file's mtime and
+size on each request (a stat, no read); immutable ones are not.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import mimetypes
+import posixpath
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+from backend.config import ARCHIVES_DIR, ARTIFACT_CACHE_MB, OUTPUT_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("artifacts")
+
+# Per-run directories under OUTPUT_DIR — files there never change once written
+IMMUTABLE_DIRS = {"reports", "traces", "profiles"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+COMPRESSIBLE_TYPES = {"application/json", "image/svg+xml", "application/javascript"}
+MIN_COMPRESS_BYTES = 512
+
+mimetypes.add_type("text/markdown", ".md")
+mimetypes.add_type("text/plain", ".collapsed")
+
+
+def _compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class Payload:
+    """A response body with its strong ETag and precompressed variants."""
+
+    __slots__ = ("body", "media_type", "etag", "variants")
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.variants: dict[str, bytes] = {}
+        if _compressible(media_type) and len(body) >= MIN_COMPRESS_BYTES:
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=9)
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+    def respond(self, request: Request, cache_control: str) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        if self.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if _etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = self.body
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and encoding in accepted:
+                body = self.variants[encoding]
+                headers["Content-Encoding"] = encoding
+                break
+        media_type = self.media_type
+        if media_type.startswith("text/") and "charset" not in media_type:
+            media_type += "; charset=utf-8"
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=headers, media_type=media_type)
+        return Response(body, headers=headers, media_type=media_type)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by the total size of its values.
+
+    Safe to share between the event loop and worker threads (files are
+    loaded and cached in asyncio.to_thread).
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._pop(key)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+
+    def pop(self, key):
+        with self._lock:
+            return self._pop(key)
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+        return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _FileEntry:
+    __slots__ = ("payload", "mtime_ns", "file_size")
+
+    def __init__(self, payload: Payload, mtime_ns: int, file_size: int):
+        self.payload = payload
+        self.mtime_ns = mtime_ns
+        self.file_size = file_size
+
+    @property
+    def size(self) -> int:
+        return self.payload.size
+
+
+class ArtifactStore:
+    """Loads files under a root directory into an LRU of Payloads."""
+
+    def __init__(self, root: Path, max_bytes: int, private: tuple[Path, ...] = ()):
+        self.root = root.resolve()
+        # Directories under root that are never served (run archives hold full LLM bodies)
+        self.private = tuple(p.resolve() for p in private)
+        self.cache = LRUCache(max_bytes)
+        # Larger files are streamed from disk instead of evicting everything else
+        self.max_entry_bytes = max_bytes // 8
+
+    def resolve(self, rel_path: str) -> Path | None:
+        path = (self.root / rel_path).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return None
+        if any(path.is_relative_to(p) for p in self.private):
+            return None
+        return path
+
+    @staticmethod
+    def is_immutable(rel_path: str) -> bool:
+        return rel_path.split("/", 1)[0] in IMMUTABLE_DIRS
+
+    def _load(self, rel_path: str) -> _FileEntry | Path | None:
+        path = self.resolve(rel_path)
+        if path is None:
+            return None
+        stat = path.stat()
+        if stat.st_size > self.max_entry_bytes:
+            return path
+        media_type, encoding = mimetypes.guess_type(path.name)
+        if encoding:
+            media_type = f"application/{encoding}"  # e.g. a .jsonl.gz archive
+        media_type = media_type or "application/octet-stream"
+        entry = _FileEntry(Payload(path.read_bytes(), media_type), stat.st_mtime_ns, stat.st_size)
+        self.cache.put(rel_path, entry)
+        return entry
+
+    def _fresh(self, rel_path: str, entry: _FileEntry) -> bool:
+        if self.is_immutable(rel_path):
+            return True
+        try:
+            stat = (self.root / rel_path).stat()
+        except OSError:
+            self.cache.pop(rel_path)
+            return False
+        return stat.st_mtime_ns == entry.mtime_ns and stat.st_size == entry.file_size
+
+    async def get(self, rel_path: str) -> _FileEntry | Path | None:
+        """The cached entry for a file, a Path for files too big to cache, or None."""
+        # One cache key per file, and "reports/../charts/x.png" is not a report
+        rel_path = posixpath.normpath(rel_path)
+        if rel_path.startswith(("..", "/")):
+            return None
+        entry = self.cache.get(rel_path)
+        if entry is not None and self._fresh(rel_path, entry):
+            return entry
+        return await asyncio.to_thread(self._load, rel_path)
+
+    async def read_text(self, rel_path: str) -> str | None:
+        entry = await self.get(rel_path)
+        if entry is None:
+            return None
+        if isinstance(entry, Path):
+            return await asyncio.to_thread(entry.read_text, encoding="utf-8")
+        return entry.payload.body.decode("utf-8")
+
+    async def serve(self, request: Request, rel_path: str) -> Response:
+        rel_path = posixpath.normpath(rel_path)
+        entry = await self.get(rel_path)
+        if entry is None:
+            return JSONResponse({"error": "Artifact not found", "path": rel_path}, status_code=404)
+        if isinstance(entry, Path):
+            return FileResponse(entry)
+        versioned = request.query_params.get("v") == entry.payload.etag.strip('"')
+        return entry.payload.respond(request, IMMUTABLE if versioned or self.is_immutable(rel_path) else REVALIDATE)
+
+
+# Module-level singleton
+artifacts = ArtifactStore(OUTPUT_DIR, ARTIFACT_CACHE_MB * 1024 * 1024, private=(ARCHIVES_DIR,))
@@ -1,15 +1,12 @@
-"""Centralized configuration from environment variables."""
+"""Centralized configuration from environment variables.
 
-# ChromaDB (pulled in by CrewAI) requires sqlite3 >= 3.35.
-# On some systems the bundled sqlite3 is too old; pysqlite3-binary ships a newer one.
-try:
-    __import__("pysqlite3")
-    import sys
-    sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
-except ImportError:
-    pass
+Importing this module only reads settings — side effects (the sqlite3 swap,
+creating output directories) are explicit calls, so the API server can start
+without touching CrewAI's dependencies.
+"""
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -28,14 +25,144 @@ MANAGER_BASE_URL = os.getenv("MANAGER_BASE_URL", f"http://{ORCHESTRATOR_HOST}:11
 SPECIALIST_MODEL = os.getenv("SPECIALIST_MODEL", "ollama/gemma3:12b")
 SPECIALIST_BASE_URL = os.getenv("SPECIALIST_BASE_URL", f"http://{SPECIALIST_HOST}:11434")
 
+# Model routing — which model and Ollama endpoint serve each agent. The mechanical
+# stages (the analyst's schema-constrained chart JSON, the visualizer's ChartTool
+# calls) default to FAST_MODEL on the specialist VM; FAST_MODEL= (empty) sends them
+# to SPECIALIST_MODEL. Override any agent with <AGENT>_MODEL / <AGENT>_BASE_URL.
+FAST_MODEL = os.getenv("FAST_MODEL", "ollama/qwen2.5:3b") or SPECIALIST_MODEL
+FAST_BASE_URL = os.getenv("FAST_BASE_URL", SPECIALIST_BASE_URL)
+
+
+def _route(agent: str, model: str, base_url: str) -> dict:
+    prefix = agent.upper()
+    return {
+        "model": os.getenv(f"{prefix}_MODEL", model),
+        "base_url": os.getenv(f"{prefix}_BASE_URL", base_url),
+    }
+
+
+MODEL_ROUTES = {
+    "manager": _route("manager", MANAGER_MODEL, MANAGER_BASE_URL),
+    "researcher": _route("researcher", SPECIALIST_MODEL, SPECIALIST_BASE_URL),
+    "analyst": _route("analyst", FAST_MODEL, FAST_BASE_URL),
+    "visualizer": _route("visualizer", FAST_MODEL, FAST_BASE_URL),
+    "writer": _route("writer", SPECIALIST_MODEL, SPECIALIST_BASE_URL),
+}
+
+# Model residency — Ollama keep_alive while runs are queued/active, and after they finish
+MODEL_KEEP_ALIVE = os.getenv("MODEL_KEEP_ALIVE", "30m")
+MODEL_IDLE_KEEP_ALIVE = os.getenv("MODEL_IDLE_KEEP_ALIVE", "5m")
+
+# Per-agent inference profiles — context window (num_ctx), max output tokens, temperature,
+# per-LLM-call deadline in seconds (0 = none) and retry budget.
+# Override any field per agent, e.g. WRITER_NUM_CTX=16384, ANALYST_TEMPERATURE=0.1, WRITER_DEADLINE_S=600
+def _profile(agent: str, num_ctx: int, max_tokens: int, temperature: float,
+             deadline_s: float, retries: int, max_steps: int, max_repeats: int, token_budget: int) -> dict:
+    prefix = agent.upper()
+    return {
+        "num_ctx": int(os.getenv(f"{prefix}_NUM_CTX", num_ctx)),
+        "max_tokens": int(os.getenv(f"{prefix}_MAX_TOKENS", max_tokens)),
+        "temperature": float(os.getenv(f"{prefix}_TEMPERATURE", temperature)),
+        "deadline_s": float(os.getenv(f"{prefix}_DEADLINE_S", deadline_s)),
+        "retries": int(os.getenv(f"{prefix}_RETRIES", retries)),
+        "max_steps": int(os.getenv(f"{prefix}_MAX_STEPS", max_steps)),
+        "max_repeats": int(os.getenv(f"{prefix}_MAX_REPEATS", max_repeats)),
+        "token_budget": int(os.getenv(f"{prefix}_TOKEN_BUDGET", token_budget)),
+    }
+
+
+AGENT_PROFILES = {
+    "manager": _profile("manager", 8192, 1024, 0.3, 180, 1, 8, 2, 16000),
+    "researcher": _profile("researcher", 8192, 2048, 0.5, 240, 1, 6, 2, 12000),
+    "analyst": _profile("analyst", 8192, 1024, 0.2, 180, 1, 4, 2, 6000),
+    "visualizer": _profile("visualizer", 4096, 768, 0.0, 120, 1, 8, 2, 6000),
+    "writer": _profile("writer", 12288, 3072, 0.4, 360, 1, 6, 2, 16000),
+}
+
+# Watchdog — per-agent step, repeat and token limits (<AGENT>_MAX_STEPS,
+# <AGENT>_MAX_REPEATS, <AGENT>_TOKEN_BUDGET above; 0 = no limit). A looping
+# agent is made to give its final answer ("finish") or fails the run ("fail")
+WATCHDOG_ENABLED = os.getenv("WATCHDOG_ENABLED", "true").lower() == "true"
+WATCHDOG_ACTION = os.getenv("WATCHDOG_ACTION", "finish")
+
+# Hedging — a streamed specialist request with no response after HEDGE_AFTER_MS is also sent
+# to HEDGE_BASE_URL (a second Ollama serving SPECIALIST_MODEL); the first answer wins
+HEDGE_BASE_URL = os.getenv("HEDGE_BASE_URL", "")
+HEDGE_AFTER_MS = float(os.getenv("HEDGE_AFTER_MS", "10000"))
+
+# Stream LLM responses — gives real time-to-first-token in /metrics
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() == "true"
+
+# Structured output — constrain the analyst to the ChartSpecSet JSON schema via Ollama's `format`
+STRUCTURED_CHARTS = os.getenv("STRUCTURED_CHARTS", "true").lower() == "true"
+
+# Render the analyst's chart specs directly instead of running the visualizer agent
+DIRECT_CHARTS = os.getenv("DIRECT_CHARTS", "false").lower() == "true"
+
 # Paths
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = BASE_DIR / os.getenv("OUTPUT_DIR", "output")
 CHARTS_DIR = BASE_DIR / os.getenv("CHARTS_DIR", "output/charts")
+REPORTS_DIR = BASE_DIR / os.getenv("REPORTS_DIR", "output/reports")
+TRACES_DIR = BASE_DIR / os.getenv("TRACES_DIR", "output/traces")
+PROFILES_DIR = BASE_DIR / os.getenv("PROFILES_DIR", "output/profiles")
+# Full LLM request/response bodies — outside OUTPUT_DIR, which is served
+ARCHIVES_DIR = BASE_DIR / os.getenv("ARCHIVES_DIR", "state/archives")
+
+# In-memory cache of /output artifacts (with their gzip/brotli variants)
+ARTIFACT_CACHE_MB = int(os.getenv("ARTIFACT_CACHE_MB", "64"))
+
+# Tracing — per-run OTLP/JSON span files in TRACES_DIR
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+# Profiling — sample the backend's stacks during runs (per-run `profile` flag, or every run)
+PROFILE_RUNS = os.getenv("PROFILE_RUNS", "false").lower() == "true"
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+
+# Recording — archive each real run (events, LLM calls, tool I/O) for replay
+RECORD_RUNS = os.getenv("RECORD_RUNS", "true").lower() == "true"
+
+# Executor — "inprocess" runs crews in API threads; "workers" queues them to worker
+# processes (python -m backend.crew.worker) through a SQLite job queue
+EXECUTOR_MODE = os.getenv("EXECUTOR_MODE", "inprocess")
+WORKERS = int(os.getenv("WORKERS", "2"))  # worker processes the API starts and supervises (0 = run them yourself)
+JOBS_DB = BASE_DIR / os.getenv("JOBS_DB", "state/jobs.sqlite3")  # outside OUTPUT_DIR, which is served
+WORKER_POLL_MS = float(os.getenv("WORKER_POLL_MS", "50"))  # job claim / event relay polling interval
+WORKER_TIMEOUT_S = float(os.getenv("WORKER_TIMEOUT_S", "30"))  # heartbeat age at which a job is failed
+
+# Shared event logs — with several API worker processes (uvicorn --workers, which
+# reads WEB_CONCURRENCY), runs append their events to per-run log files so a
+# WebSocket on any process can stream any run
+SHARED_EVENTS = os.getenv("SHARED_EVENTS", str(int(os.getenv("WEB_CONCURRENCY", "1")) > 1)).lower() == "true"
+EVENT_LOG_DIR = BASE_DIR / os.getenv("EVENT_LOG_DIR", "state/events")
+EVENT_LOG_POLL_MS = float(os.getenv("EVENT_LOG_POLL_MS", "25"))  # how often other processes check a log for new events
+
+# Cancellation — cancel a run once its last WebSocket viewer has been gone this long
+AUTO_CANCEL_ABANDONED = os.getenv("AUTO_CANCEL_ABANDONED", "false").lower() == "true"
+CANCEL_GRACE_SECONDS = float(os.getenv("CANCEL_GRACE_SECONDS", "30"))
 
 # Dev
 MOCK_MODE = os.getenv("MOCK_MODE", "false").lower() == "true"
 
-# Ensure output dirs exist
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-CHARTS_DIR.mkdir(parents=True, exist_ok=True)
+# Preload crewai / litellm / matplotlib in a background thread once the server is up
+WARM_IMPORTS = os.getenv("WARM_IMPORTS", "true").lower() == "true"
+
+
+def use_modern_sqlite():
+    """Swap in pysqlite3 as sqlite3 — call before the first crewai import.
+
+    ChromaDB (pulled in by CrewAI) requires sqlite3 >= 3.35.
+    On some systems the bundled sqlite3 is too old; pysqlite3-binary ships a newer one.
+    """
+    try:
+        __import__("pysqlite3")
+        sys.modules["sqlite3"] = sys.modules.pop("pysqlite3")
+    except ImportError:
+        pass
+
+
+def ensure_output_dirs():
+    """Create the output directories (the /output mount needs them to exist)."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    CHARTS_DIR.mkdir(parents=True, exist_ok=True)
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -2,27 +2,54 @@
 
 from crewai import Agent, LLM
 
-from backend.config import (
-    MANAGER_MODEL, MANAGER_BASE_URL,
-    SPECIALIST_MODEL, SPECIALIST_BASE_URL,
-)
+from backend.config import MODEL_KEEP_ALIVE, STRUCTURED_CHARTS, LLM_STREAM, HEDGE_BASE_URL
+from backend.crew.ollama_http import ollama_client
+from backend.crew.profiles import profile_for
+from backend.crew.routing import route_for
+from backend.crew.schemas import ChartSpecSet
 
 
-def _manager_llm() -> LLM:
+# CrewAI routes "ollama/..." to its native OpenAI-compatible client by default,
+# which speaks /v1/chat/completions and rejects Ollama's own options
+# (keep_alive, num_ctx, format schemas) and our instrumented client.
+# is_litellm keeps every agent on LiteLLM's native Ollama path.
+
+def _hedge_url(base_url: str) -> str | None:
+    """The second endpoint for a specialist's requests, if one is configured."""
+    if HEDGE_BASE_URL and HEDGE_BASE_URL.rstrip("/") != base_url.rstrip("/"):
+        return HEDGE_BASE_URL
+    return None
+
+
+def _manager_llm(run_id: str | None = None) -> LLM:
+    route = route_for("manager")
     return LLM(
-        model=MANAGER_MODEL,
-        base_url=MANAGER_BASE_URL,
+        model=route.model,
+        is_litellm=True,
+        base_url=route.base_url,
+        # Every request resets Ollama's unload timer — keep the pin in place
+        keep_alive=MODEL_KEEP_ALIVE,
+        stream=LLM_STREAM,
+        client=ollama_client(run_id, "manager", route.model),
+        **profile_for("manager").llm_kwargs(),
     )
 
 
-def _specialist_llm() -> LLM:
+def _specialist_llm(agent_key: str, run_id: str | None = None, **extra) -> LLM:
+    route = route_for(agent_key)
     return LLM(
-        model=SPECIALIST_MODEL,
-        base_url=SPECIALIST_BASE_URL,
+        model=route.model,
+        is_litellm=True,
+        base_url=route.base_url,
+        keep_alive=MODEL_KEEP_ALIVE,
+        stream=LLM_STREAM,
+        client=ollama_client(run_id, agent_key, route.model, hedge_url=_hedge_url(route.base_url)),
+        **profile_for(agent_key).llm_kwargs(),
+        **extra,
     )
 
 
-def build_manager() -> Agent:
+def build_manager(run_id: str | None = None) -> Agent:
     return Agent(
         role="Senior Research Director",
         goal="Produce a comprehensive, well-structured market analysis with data visualizations",
@@ -32,13 +59,14 @@ def build_manager() -> Agent:
             "delegating effectively, and synthesizing diverse inputs into coherent, "
             "insight-driven reports."
         ),
-        llm=_manager_llm(),
+        llm=_manager_llm(run_id),
         allow_delegation=True,
         verbose=True,
+        **profile_for("manager").agent_kwargs(),
     )
 
 
-def build_researcher() -> Agent:
+def build_researcher(run_id: str | None = None) -> Agent:
     return Agent(
         role="Market Research Specialist",
         goal="Gather comprehensive information — key players, trends, competitive dynamics",
@@ -47,30 +75,36 @@ def build_researcher() -> Agent:
             "organizing, and synthesizing information from multiple angles. You always "
             "structure findings clearly with sections and bullet points."
         ),
-        llm=_specialist_llm(),
+        llm=_specialist_llm("researcher", run_id),
         allow_delegation=False,
         verbose=True,
+        **profile_for("researcher").agent_kwargs(),
     )
 
 
-def build_analyst() -> Agent:
+def build_analyst(run_id: str | None = None) -> Agent:
+    # Ollama's `format` constrains decoding to the schema, so the output
+    # always parses — no regex recovery, no reformatting round trips.
+    extra = {"format": ChartSpecSet.model_json_schema()} if STRUCTURED_CHARTS else {}
     return Agent(
         role="Data Analyst",
         goal="Transform research into quantitative insights and structured chart-ready datasets",
         backstory=(
             "You transform qualitative research into quantitative insights. You estimate "
             "market sizes, create comparative frameworks, and output clean structured data. "
-            "You ALWAYS output chart data as JSON blocks with these exact fields: "
+            "You ALWAYS output chart data as a single JSON object {\"charts\": [...]} "
+            "where each chart has these exact fields: "
             "chart_type (bar/horizontal_bar/pie/line), title, labels (list of strings), "
             "values (list of numbers), unit, filename."
         ),
-        llm=_specialist_llm(),
+        llm=_specialist_llm("analyst", run_id, **extra),
         allow_delegation=False,
         verbose=True,
+        **profile_for("analyst").agent_kwargs(),
     )
 
 
-def build_visualizer(tools: list) -> Agent:
+def build_visualizer(tools: list, run_id: str | None = None) -> Agent:
     return Agent(
         role="Data Visualization Specialist",
         goal="Create 2-4 clear, professional charts from the analyst's data",
@@ -80,14 +114,15 @@ def build_visualizer(tools: list) -> Agent:
             "call the tool with the exact JSON data provided by the analyst. "
             "Always generate all charts requested."
         ),
-        llm=_specialist_llm(),
+        llm=_specialist_llm("visualizer", run_id),
         tools=tools,
         allow_delegation=False,
         verbose=True,
+        **profile_for("visualizer").agent_kwargs(),
     )
 
 
-def build_writer(tools: list) -> Agent:
+def build_writer(tools: list, run_id: str | None = None) -> Agent:
     return Agent(
         role="Report Writer",
         goal="Produce a polished markdown report with executive summary, analysis, chart references, and recommendations",
@@ -97,8 +132,9 @@ def build_writer(tools: list) -> Agent:
             "Write in a confident, analytical tone with clear sections: "
             "Executive Summary, Key Players, Market Drivers, Strategic Position, Recommendations."
         ),
-        llm=_specialist_llm(),
+        llm=_specialist_llm("writer", run_id),
         tools=tools,
         allow_delegation=False,
         verbose=True,
+        **profile_for("writer").agent_kwargs(),
     )
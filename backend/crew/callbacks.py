@@ -2,43 +2,20 @@
 
 import asyncio
 import logging
-import re
-from datetime import datetime, timezone
+import threading
+import time
 
-logger = logging.getLogger("crew_callbacks")
-
-
-def _clean_content(content: str) -> str:
-    """Clean up raw CrewAI output for display in the UI."""
-    if not content:
-        return ""
+from backend.crew import cancellation, metrics, tracing
+from backend.crew.events import AgentComplete, AgentOutput, AgentStart, Event, Snapshot, ToolUse, from_wire
+from backend.crew.sanitizer import clean_content
+from backend.crew.snapshot import RunSnapshot, compact
 
-    # Strip ToolResult(result='...', result_as_answer=...) wrappers
-    # Match: ToolResult(result='...' followed by optional kwargs and closing paren
-    m = re.match(r"ToolResult\(result=['\"](.+)", content, flags=re.DOTALL)
-    if m:
-        inner = m.group(1)
-        # Remove trailing ', result_as_answer=...) or similar
-        inner = re.sub(r"['\"],\s*result_as_answer=\w+\)\s*$", "", inner, flags=re.DOTALL)
-        # Also handle simple closing
-        inner = re.sub(r"['\"]\)\s*$", "", inner)
-        content = inner.strip()
-
-    # Strip AgentFinish(...) wrappers
-    m = re.match(r"AgentFinish\(thought=['\"].*?['\"],\s*output=['\"](.+)", content, flags=re.DOTALL)
-    if m:
-        inner = m.group(1)
-        inner = re.sub(r"['\"]\)\s*$", "", inner)
-        content = inner.strip()
-
-    # Strip "### Assistant:" prefix that Gemma sometimes adds
-    content = re.sub(r"^###?\s*Assistant:\s*", "", content, flags=re.IGNORECASE)
+logger = logging.getLogger("crew_callbacks")
 
-    # Truncate for live stream display
-    if len(content) > 1500:
-        content = content[:1500] + "... [truncated]"
 
-    return content.strip()
+def _agent_of(event: Event) -> str | None:
+    """The agent an event is attributed to (a delegation's is the delegator)."""
+    return getattr(event, "agent", None) or getattr(event, "from_", None)
 
 
 class CrewEventBridge:
@@ -46,96 +23,236 @@ class CrewEventBridge:
 
     def __init__(self, run_id: str):
         self.run_id = run_id
-        self.events: list[dict] = []
+        self.events: list[Event] = []
         self._complete = False
         self._notify: asyncio.Event = asyncio.Event()
         self._current_agent = ("manager", "Senior Research Director")
+        self._agent_started_at = time.monotonic()
+        self._pushed_at: list[float] = []  # monotonic push time per event, for fan-out lag
+        self._loop: asyncio.AbstractEventLoop | None = None  # consumers' loop, set in consume_from
+        self._listeners: list = []  # called with each event as it is pushed (e.g. the run recorder)
+        self._completion_callbacks: list = []  # called once by mark_complete
+        self.snapshot = RunSnapshot()  # run state as of the last event, for late joiners
+        self.compacted = False  # superseded events dropped once the run completed
+        self._lock = threading.Lock()  # keeps snapshot, events and indexes in step across threads
+        # Secondary indexes — positions in self.events by type and by agent
+        self._by_type: dict[str, list[int]] = {}
+        self._by_agent: dict[str, list[int]] = {}
+        self._longest_output: dict[str, AgentOutput] = {}  # per agent
+
+    def push_event(self, event: Event | dict):
+        """Push an event (from any context — sync or async).
+
+        A dict is a wire-format event relayed from elsewhere (another
+        process, an archive) and becomes its typed record.
+        """
+        if isinstance(event, dict):
+            event = from_wire(event)
+        event.run_id = self.run_id
+        with self._lock:
+            self.snapshot.apply(event)
+            self._index(event, len(self.events))
+            self._pushed_at.append(time.monotonic())
+            self.events.append(event)
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"[{self.run_id}] Event listener failed: {e}")
+        self._wake()
+
+    def _index(self, event: Event, position: int):
+        self._by_type.setdefault(event.type, []).append(position)
+        agent = _agent_of(event)
+        if agent:
+            self._by_agent.setdefault(agent, []).append(position)
+        if isinstance(event, AgentOutput) and agent:
+            longest = self._longest_output.get(agent)
+            if longest is None or len(event.content or "") > len(longest.content or ""):
+                self._longest_output[agent] = event
+
+    def events_of(self, type: str | None = None, agent: str | None = None) -> list[Event]:
+        """The run's events of a type and/or by an agent, in order, from the indexes."""
+        with self._lock:
+            events = self.events
+            if type is None and agent is None:
+                return list(events)
+            positions = self._by_type.get(type, []) if type is not None else self._by_agent.get(agent, [])
+            if type is not None and agent is not None:
+                return [events[i] for i in positions if _agent_of(events[i]) == agent]
+            return [events[i] for i in positions]
 
-    def push_event(self, event: dict):
-        """Push an event (from any context — sync or async)."""
-        if "timestamp" not in event:
-            event["timestamp"] = datetime.now(timezone.utc).isoformat()
-        event["run_id"] = self.run_id
-        self.events.append(event)
-        self._notify.set()
+    def longest_output(self, agent: str) -> str | None:
+        """The longest agent_output content the agent has produced."""
+        longest = self._longest_output.get(agent)
+        return longest.content if longest else None
+
+    def add_listener(self, listener):
+        """Call listener(event) synchronously for every event (record) pushed from now on."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def on_complete(self, callback):
+        """Call callback() once the run's last event has been pushed."""
+        self._completion_callbacks.append(callback)
+
+    def _wake(self):
+        """Set the notify event on the consumers' loop.
+
+        asyncio.Event is not thread-safe: set() from the crew thread doesn't
+        wake a waiting consumer, which would then only notice on its poll
+        timeout.
+        """
+        loop = self._loop
+        if loop is None:
+            self._notify.set()
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._notify.set()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._notify.set)
 
     def step_callback(self, step_output):
         """Called by CrewAI on each agent step. Runs in a sync thread.
 
         In hierarchical mode, this fires on the manager's executor for all work.
         We use _current_agent (set by task_callback) to attribute correctly.
+        Also a cancellation checkpoint — raises RunCancelled once the run is cancelled.
         """
+        cancellation.check(self.run_id)
         from crewai.agents.parser import AgentAction, AgentFinish
 
         agent_key, agent_role = self._current_agent
+        trace = tracing.trace_for(self.run_id)
 
         if isinstance(step_output, AgentFinish):
+            if trace:
+                trace.step("finish")
             output = step_output.output
-            content = _clean_content(str(output) if output else step_output.text)
+            content = clean_content(str(output) if output else step_output.text)
             if not content:
                 return
-            self.push_event({
-                "type": "agent_output",
-                "agent": agent_key,
-                "role": agent_role,
-                "content": content,
-            })
+            self.push_event(AgentOutput(agent=agent_key, role=agent_role, content=content))
         elif isinstance(step_output, AgentAction):
             tool_name = step_output.tool
-            self.push_event({
-                "type": "tool_use",
-                "agent": agent_key,
-                "role": agent_role,
-                "tool": tool_name,
-                "tool_input": (step_output.tool_input or "")[:500],
-                "content": f"Using tool: {tool_name}",
-            })
+            if trace:
+                trace.step("action", tool_name)
+            self.push_event(ToolUse(
+                agent=agent_key,
+                role=agent_role,
+                tool=tool_name,
+                tool_input=(step_output.tool_input or "")[:500],
+                content=f"Using tool: {tool_name}",
+            ))
         else:
-            content = _clean_content(str(step_output))
+            if trace:
+                trace.step(type(step_output).__name__)
+            content = clean_content(str(step_output))
             if content:
-                self.push_event({
-                    "type": "agent_output",
-                    "agent": agent_key,
-                    "role": agent_role,
-                    "content": content,
-                })
+                self.push_event(AgentOutput(agent=agent_key, role=agent_role, content=content))
 
     def set_current_agent(self, agent_key: str, agent_role: str, model: str, vm: str):
         """Update the current agent and emit an agent_start event."""
         self._current_agent = (agent_key, agent_role)
-        self.push_event({
-            "type": "agent_start",
-            "agent": agent_key,
-            "role": agent_role,
-            "model": model,
-            "vm": vm,
-            "task_summary": f"{agent_role} is working...",
-        })
+        self._agent_started_at = time.monotonic()
+        trace = tracing.trace_for(self.run_id)
+        if trace:
+            trace.start_task(agent_key, agent_role, model, vm)
+        self.push_event(AgentStart(
+            agent=agent_key,
+            role=agent_role,
+            model=model,
+            vm=vm,
+            task_summary=f"{agent_role} is working...",
+        ))
+
+    def complete_agent(self, agent_key: str, agent_role: str):
+        """Emit agent_complete with the agent's wall time since its agent_start."""
+        elapsed = time.monotonic() - self._agent_started_at
+        metrics.observe_agent(self.run_id, agent_key, elapsed)
+        trace = tracing.trace_for(self.run_id)
+        if trace:
+            trace.end_task()
+        self.push_event(AgentComplete(agent=agent_key, role=agent_role, elapsed_seconds=round(elapsed, 1)))
 
     def mark_complete(self):
         """Signal that no more events will be produced."""
+        if self._complete:
+            return
         self._complete = True
-        self._notify.set()
+        for callback in self._completion_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"[{self.run_id}] Completion callback failed: {e}")
+        self._compact()
+        self._wake()
+
+    def _compact(self):
+        """Drop superseded events from the finished run's history.
+
+        The lists are replaced, not edited — consumers already streaming
+        keep reading the full ones they started on.
+        """
+        keep = compact(self.events)
+        if len(keep) == len(self.events):
+            return
+        with self._lock:
+            self.events = [self.events[i] for i in keep]
+            self._pushed_at = [self._pushed_at[i] for i in keep]
+            self._by_type, self._by_agent = {}, {}
+            for position, event in enumerate(self.events):
+                self._index(event, position)
+            self.compacted = True
+
+    def snapshot_event(self) -> tuple[Snapshot, int]:
+        """A snapshot message for the run's state, and the index of the first event after it."""
+        with self._lock:
+            state = self.snapshot.to_dict()
+            next_index = len(self.events)
+        return Snapshot(run_id=self.run_id, state=state, next_index=next_index), next_index
 
     @property
     def is_complete(self) -> bool:
         return self._complete
 
-    async def consume_from(self, start_index: int = 0):
+    async def consume_from(self, start_index: int = 0, snapshot: bool = False):
         """Async generator that yields events starting from start_index.
 
         Uses an asyncio.Event for notification instead of a queue,
         so multiple consumers and late-joiners work correctly.
+        With `snapshot`, it first yields a snapshot message of the run's
+        state and then only the events pushed after it — joining costs the
+        same however long the run has been going. Resuming at an index of
+        a compacted history gets a snapshot too: the index no longer means
+        the same event.
         """
         idx = start_index
+        self._loop = asyncio.get_running_loop()
+        # The lists as of joining — compaction replaces them, it doesn't edit them
+        events, pushed_at = self.events, self._pushed_at
+        if snapshot or (start_index and self.compacted):
+            message, idx = self.snapshot_event()
+            yield message
+        # Replayed history is not lag — only time events pushed after we joined
+        joined_at = time.monotonic()
         while True:
             # Yield any events we haven't seen yet
-            while idx < len(self.events):
-                yield self.events[idx]
+            while idx < len(events):
+                if pushed_at[idx] >= joined_at:
+                    metrics.observe_fanout_lag(self.run_id, time.monotonic() - pushed_at[idx])
+                yield events[idx]
                 idx += 1
 
             # If complete and we've yielded everything, stop
-            if self._complete and idx >= len(self.events):
+            if self._complete and idx >= len(events):
                 break
 
             # Wait for new events (with timeout to check completion)
@@ -0,0 +1,131 @@
+"""Cooperative run cancellation.
+
+A run is cancelled through its CancelScope, opened by execute_run. The
+crew thread can't be interrupted, so cancellation reaches it at
+checkpoints — every step_callback and task_callback, and every LLM request
+the agents' transport is asked to send — and callbacks registered with
+on_cancel() abort work already in flight: the Ollama transport shuts down
+its sockets, which ends the generation server-side instead of letting it
+run to completion for nobody. The mock and replay engines wait with
+sleep(), which returns as soon as the run is cancelled.
+"""
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+
+from backend.crew.events import CrewError
+
+logger = logging.getLogger("cancellation")
+
+
+class RunCancelled(Exception):
+    """Raised at a checkpoint of a cancelled run."""
+
+
+class CancelScope:
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.reason: str | None = None
+        self._flag = threading.Event()
+        self._callbacks: list = []
+        self._lock = threading.Lock()
+        # Wakes sleep() — set on the loop the scope was opened on
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._flag.is_set()
+
+    def cancel(self, reason: str) -> bool:
+        """Cancel the run (from any thread). False if it already was."""
+        with self._lock:
+            if self._flag.is_set():
+                return False
+            self.reason = reason
+            self._flag.set()
+            callbacks, self._callbacks = self._callbacks, []
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        logger.info(f"[{self.run_id}] Cancelling: {reason}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"[{self.run_id}] Cancel callback failed: {e}")
+        return True
+
+    def on_cancel(self, callback):
+        """Call callback() when the run is cancelled — now, if it already is."""
+        with self._lock:
+            if not self._flag.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def check(self):
+        """A checkpoint: raise RunCancelled if the run has been cancelled."""
+        if self._flag.is_set():
+            raise RunCancelled(self.reason)
+
+    async def sleep(self, delay: float):
+        """asyncio.sleep that raises RunCancelled as soon as the run is cancelled."""
+        if delay > 0 and not self._flag.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(0)
+        self.check()
+
+
+_scopes: dict[str, CancelScope] = {}
+
+
+def open_scope(run_id: str) -> CancelScope:
+    """The run's scope, created on first use. Call from the event loop."""
+    scope = _scopes.get(run_id)
+    if scope is None:
+        scope = _scopes[run_id] = CancelScope(run_id)
+    return scope
+
+
+def scope_for(run_id: str | None) -> CancelScope | None:
+    return _scopes.get(run_id) if run_id else None
+
+
+def close_scope(run_id: str):
+    _scopes.pop(run_id, None)
+
+
+def check(run_id: str | None):
+    """Checkpoint for code that only knows the run id (callbacks, tools)."""
+    scope = scope_for(run_id)
+    if scope:
+        scope.check()
+
+
+def is_cancelled(run_id: str | None) -> bool:
+    scope = scope_for(run_id)
+    return scope is not None and scope.cancelled
+
+
+async def sleep(run_id: str, delay: float):
+    scope = scope_for(run_id)
+    if scope:
+        await scope.sleep(delay)
+    else:
+        await asyncio.sleep(delay)
+
+
+def mark_cancelled(run):
+    """Record a cancelled run's final state and tell its viewers."""
+    scope = scope_for(run.run_id)
+    reason = scope.reason if scope else "cancelled"
+    run.status = "cancelled"
+    run.completed_at = run.completed_at or datetime.now(timezone.utc)
+    run.error = f"Run cancelled: {reason}"
+    run.bridge.push_event(CrewError(agent="system", message=run.error, cancelled=True))
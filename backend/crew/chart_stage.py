@@ -0,0 +1,73 @@
+"""Deterministic chart stage — renders the analyst's specs without a visualizer LLM turn.
+
+The visualizer agent only copies the analyst's JSON into ChartTool calls,
+which costs a full specialist-model turn (often several). With DIRECT_CHARTS
+enabled the crew drops the visualization task and this stage renders the
+validated specs in parallel right after the analysis task completes. It
+emits the same tool_use / chart_created events as the LLM path, so the UI
+cannot tell the difference.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from backend.crew.events import ChartCreated, ToolUse
+from backend.crew.schemas import ChartSpec, parse_chart_specs
+from backend.crew.tools import render_chart
+
+logger = logging.getLogger("chart_stage")
+
+MAX_WORKERS = 4
+
+
+def specs_from_output(task_output) -> list[ChartSpec]:
+    """Chart specs from the analysis task — pre-validated if the hand-off ran."""
+    if task_output.pydantic is not None and hasattr(task_output.pydantic, "charts"):
+        return list(task_output.pydantic.charts)
+    return parse_chart_specs(task_output.raw)
+
+
+def render_chart_specs(specs: list[ChartSpec], bridge=None) -> list[tuple[ChartSpec, str]]:
+    """Render specs in parallel. Returns (spec, /output/... path) for each chart that rendered."""
+    if bridge:
+        for spec in specs:
+            bridge.push_event(ToolUse(
+                agent="visualizer",
+                role="Data Visualization Specialist",
+                tool="ChartTool",
+                tool_input=spec.model_dump_json()[:500],
+                content="Using tool: ChartTool",
+            ))
+
+    rendered = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="chart") as pool:
+        # copy_context keeps the run id visible to tool timing in the pool threads
+        futures = [(spec, pool.submit(copy_context().run, render_chart, spec)) for spec in specs]
+        for spec, future in futures:
+            try:
+                path = f"/output/{future.result()}"
+            except Exception as e:
+                logger.error(f"Chart stage failed to render '{spec.title}': {e}")
+                continue
+            rendered.append((spec, path))
+            if bridge:
+                bridge.push_event(ChartCreated(agent="visualizer", chart_title=spec.title, path=path))
+    return rendered
+
+
+def run_chart_stage(task_output, bridge=None) -> list[str]:
+    """Render the analysis output's charts and tell the writer where they are."""
+    specs = specs_from_output(task_output)
+    if not specs:
+        logger.warning("Chart stage found no valid chart specs in the analysis output")
+        return []
+
+    rendered = render_chart_specs(specs, bridge)
+
+    # The writer's context comes from the analysis output — list the files
+    # the same way the visualizer's output would have.
+    if rendered:
+        refs = "\n".join(f"![{spec.title}](./{path.removeprefix('/output/')})" for spec, path in rendered)
+        task_output.raw = f"{task_output.raw}\n\nRendered charts:\n{refs}"
+    return [path for _, path in rendered]
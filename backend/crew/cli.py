@@ -0,0 +1,157 @@
+"""Headless batch runner — runs a list of topics through the crew without the API.
+
+    python -m backend.crew.cli demo/sample-topics.txt
+    python -m backend.crew.cli topics.txt --concurrency 2 --manifest output/batch/nightly.jsonl
+    cat topics.txt | python -m backend.crew.cli - --mock
+    echo 1a2b3c4d | python -m backend.crew.cli - --replay --speed max --profile
+
+Topics are read one per line (blank lines and #-comments are skipped).
+With --replay each line names a recorded run (run id or archive path)
+to replay instead of a topic to research.
+Progress is streamed to stderr; each finished topic appends one JSON line
+to the manifest with its run id, status, timings, token counts and the
+artifact paths (report, charts, trace, profile). Exits non-zero if any
+topic failed.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from backend.config import MOCK_MODE, OUTPUT_DIR, TRACES_DIR, ensure_output_dirs
+from backend.crew.recorder import archive_path, read_header
+from backend.crew.run_manager import run_manager
+from backend.crew.runner import execute_run
+
+# Events worth a progress line; the rest (agent_output, tool_use...) is noise here
+PROGRESS_EVENTS = {"agent_start", "agent_complete", "chart_created", "crew_complete", "error"}
+
+
+def read_topics(source: str) -> list[str]:
+    lines = sys.stdin.read().splitlines() if source == "-" else Path(source).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _log(message: str):
+    stamp = datetime.now().strftime("%H:%M:%S")
+    print(f"{stamp} {message}", file=sys.stderr, flush=True)
+
+
+def _describe(event) -> str:
+    kind = event.type
+    if kind == "agent_start":
+        return f"{event.agent} started ({event.model or '?'})"
+    if kind == "agent_complete":
+        return f"{event.agent} done in {event.elapsed_seconds if event.elapsed_seconds is not None else '?'}s"
+    if kind == "chart_created":
+        return f"chart {event.path}"
+    if kind == "crew_complete":
+        return f"complete in {event.total_seconds}s"
+    return f"error: {event.message}"
+
+
+async def _stream_progress(run, label: str):
+    async for event in run.bridge.consume_from(0):
+        if event.type in PROGRESS_EVENTS:
+            _log(f"{label} {_describe(event)}")
+
+
+def _output_file(path: str | None) -> str | None:
+    """Map an /output/... URL path to the file on disk."""
+    if not path:
+        return None
+    return str(OUTPUT_DIR / path.removeprefix("/output/"))
+
+
+def _speed(value: str) -> float:
+    return 0.0 if value == "max" else float(value)
+
+
+def manifest_entry(run) -> dict:
+    timings = run.timings or {}
+    llm = (timings.get("llm") or {}).values()
+    tokens = {
+        "prompt": sum(t["prompt_tokens"] for t in llm),
+        "completion": sum(t["completion_tokens"] for t in llm),
+    }
+    trace = TRACES_DIR / f"{run.run_id}.json"
+    return {
+        "topic": run.topic,
+        "run_id": run.run_id,
+        "status": run.status,
+        "error": run.error,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+        "elapsed_seconds": run.elapsed_seconds,
+        "report": _output_file(run.report_path),
+        "charts": [_output_file(p) for p in run.charts],
+        "trace": str(trace) if trace.exists() else None,
+        "profile": {k: _output_file(p) for k, p in (run.profile or {}).items()} or None,
+        "tokens": tokens,
+        "timings": timings,
+    }
+
+
+async def run_batch(topics: list[str], concurrency: int, manifest: Path, mock: bool, profile: bool,
+                    replay: bool = False, speed: float = 1.0) -> list[dict]:
+    semaphore = asyncio.Semaphore(concurrency)
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    entries = []
+
+    async def _one(n: int, topic: str):
+        async with semaphore:
+            header = read_header(archive_path(topic)) if replay else None
+            run = run_manager.create_run(str(uuid4())[:8], header.get("topic", topic) if header else topic)
+            label = f"[{n}/{len(topics)} {run.run_id}]"
+            _log(f"{label} {f'replay of {topic}: ' if replay else ''}{run.topic}")
+            progress = asyncio.create_task(_stream_progress(run, label))
+            try:
+                await execute_run(run, mock=mock, profile=profile, replay=topic if replay else None, speed=speed)
+            finally:
+                await progress
+            entry = manifest_entry(run)
+            if replay:
+                entry["replay_of"] = topic
+            entries.append(entry)
+            # Append as each topic finishes, so an interrupted batch keeps its results
+            with manifest.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    await asyncio.gather(*(_one(n, topic) for n, topic in enumerate(topics, 1)))
+    return entries
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.crew.cli", description="Run a batch of research topics.")
+    parser.add_argument("topics", nargs="?", default="-", help="File with one topic per line, or - for stdin")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="Runs in flight at once (default 1)")
+    parser.add_argument("-m", "--manifest", type=Path, help="JSON Lines manifest path (default output/batch/<timestamp>.jsonl)")
+    parser.add_argument("--mock", action="store_true", default=MOCK_MODE, help="Use the mock engine (default: MOCK_MODE)")
+    parser.add_argument("--profile", action="store_true", help="Capture a sampling profile for each run")
+    parser.add_argument("--replay", action="store_true", help="Lines are recorded runs to replay, not topics")
+    parser.add_argument("--speed", type=_speed, default=1.0, help="Replay speed: 1 = real time, N = N times faster, max")
+    args = parser.parse_args(argv)
+
+    topics = read_topics(args.topics)
+    if not topics:
+        parser.error("no topics given")
+
+    ensure_output_dirs()
+    manifest = args.manifest or OUTPUT_DIR / "batch" / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.jsonl"
+    engine = "replay" if args.replay else "mock" if args.mock else "crew"
+    _log(f"{len(topics)} topics, concurrency {args.concurrency}, {engine} engine -> {manifest}")
+
+    entries = asyncio.run(run_batch(topics, max(1, args.concurrency), manifest, args.mock, args.profile,
+                                    args.replay, args.speed))
+
+    failed = [e for e in entries if e["status"] != "completed"]
+    _log(f"Done: {len(entries) - len(failed)} completed, {len(failed)} failed. Manifest: {manifest}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
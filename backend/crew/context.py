@@ -0,0 +1,10 @@
+"""Per-run context that follows a crew run into its worker thread.
+
+asyncio.to_thread copies the caller's contextvars, so anything set before
+crew.kickoff is handed off is visible to tools and HTTP calls running in
+the crew thread.
+"""
+
+from contextvars import ContextVar
+
+current_run_id: ContextVar[str | None] = ContextVar("current_run_id", default=None)
@@ -0,0 +1,184 @@
+"""Fits upstream task outputs into each consumer task's context budget.
+
+The writer receives the research, analysis and visualization outputs as
+context. Left alone that can overflow the writer's num_ctx (Ollama silently
+truncates from the front) or force a larger window, and every extra token is
+prefill time on the specialist GPU. Before a task starts we trim the outputs
+it consumes so the whole prompt fits its InferenceProfile — in the copies the
+task reads as context, not in the outputs the report is built from.
+"""
+
+import logging
+import re
+
+from crewai import Task
+
+from backend.crew.profiles import InferenceProfile
+
+logger = logging.getLogger("context_budget")
+
+# Rough chars-per-token for English prose on Gemma/Qwen tokenizers
+CHARS_PER_TOKEN = 4
+
+# ReAct scaffolding, tool descriptions and CrewAI's context framing
+SCAFFOLD_TOKENS = 768
+
+# Below this a trimmed output is not worth keeping at all
+MIN_SHARE_TOKENS = 128
+
+_BLANK_RUNS = re.compile(r"\n{3,}")
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _paragraphs(text: str) -> list[str]:
+    """Split on blank lines, keeping fenced code blocks (chart JSON) intact."""
+    paragraphs, current, in_fence = [], [], False
+    for line in text.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                paragraphs.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        paragraphs.append("\n".join(current))
+    return paragraphs
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Trim text to roughly max_tokens on paragraph boundaries.
+
+    Keeps the opening (summary, first sections) and the closing paragraphs,
+    and lists the headings of anything dropped from the middle so the
+    consumer still knows those sections existed.
+    """
+    text = _TRAILING_SPACE.sub("\n", _BLANK_RUNS.sub("\n\n", text.strip()))
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    paragraphs = _paragraphs(text)
+
+    head, used = [], 0
+    for p in paragraphs:
+        if used + len(p) > budget * 2 // 3:
+            break
+        head.append(p)
+        used += len(p) + 2
+
+    tail = []
+    for p in reversed(paragraphs[len(head):]):
+        if used + len(p) > budget:
+            break
+        tail.insert(0, p)
+        used += len(p) + 2
+
+    dropped = paragraphs[len(head):len(paragraphs) - len(tail)]
+    if not head and not tail:
+        # A single paragraph larger than the budget — hard cut
+        return text[:budget] + "\n\n[... trimmed to fit context budget ...]"
+
+    headings = [p.split("\n", 1)[0].lstrip("# ").strip() for p in dropped if p.startswith("#")]
+    marker = f"[... {len(dropped)} paragraphs trimmed to fit context budget"
+    if headings:
+        marker += f"; omitted sections: {', '.join(headings)}"
+    marker += " ...]"
+
+    return "\n\n".join(head + [marker] + tail)
+
+
+def _fair_shares(sizes: list[int], budget: int) -> list[int]:
+    """Water-fill: small outputs keep everything, large ones split the rest."""
+    shares = [0] * len(sizes)
+    remaining = budget
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for n, i in enumerate(order):
+        share = remaining // (len(sizes) - n)
+        shares[i] = min(sizes[i], share)
+        remaining -= shares[i]
+    return shares
+
+
+class ContextBudgeter:
+    """Trims a task's context outputs to its consumer's InferenceProfile."""
+
+    def __init__(self, consumer: Task, profile: InferenceProfile):
+        self.consumer = consumer
+        self.profile = profile
+
+    def prompt_budget(self) -> int:
+        """Tokens available for upstream context in the consumer's prompt."""
+        agent = self.consumer.agent
+        static = " ".join([
+            self.consumer.description,
+            self.consumer.expected_output,
+            getattr(agent, "role", ""),
+            getattr(agent, "goal", ""),
+            getattr(agent, "backstory", ""),
+        ])
+        return self.profile.input_budget - estimate_tokens(static) - SCAFFOLD_TOKENS
+
+    def apply(self):
+        context = self.consumer.context if isinstance(self.consumer.context, list) else []
+        producers = [t for t in context if t.output is not None]
+        if not producers:
+            return
+
+        sizes = [estimate_tokens(t.output.raw or "") for t in producers]
+        budget = self.prompt_budget()
+        if sum(sizes) <= budget:
+            return
+
+        # The consumer reads its context through copies of the producers, so
+        # the producers' own outputs (the report's sources) stay whole
+        trimmed = {}
+        for task, size, share in zip(producers, sizes, _fair_shares(sizes, budget)):
+            if share >= size:
+                continue
+            raw = fit_to_budget(task.output.raw, max(share, MIN_SHARE_TOKENS))
+            trimmed[id(task)] = task.model_copy(update={"output": task.output.model_copy(update={"raw": raw})})
+            logger.info(
+                f"Trimmed context for {self.consumer.agent.role}: "
+                f"~{size} -> ~{estimate_tokens(raw)} tokens"
+            )
+        if trimmed:
+            self.consumer.context = [trimmed.get(id(t), t) for t in context]
+
+
+def context_budgeters(tasks: list[Task], profiles: list[InferenceProfile]) -> list[ContextBudgeter | None]:
+    """Per task, the budgeter to apply once it completes (None if none is needed).
+
+    Tasks run in list order, so the completion of task i is the moment all
+    of task i+1's upstream outputs exist.
+    """
+    budgeters: list[ContextBudgeter | None] = [None] * len(tasks)
+    for i, (consumer, profile) in enumerate(zip(tasks[1:], profiles[1:])):
+        if isinstance(consumer.context, list) and consumer.context:
+            budgeters[i] = ContextBudgeter(consumer, profile)
+    return budgeters
+
+
+def apply_context_budgets(tasks: list[Task], profiles: list[InferenceProfile]):
+    """Attach callbacks so each task's context is budgeted before it starts.
+
+    Any callback already on the producer runs first. A crew with its own
+    task_callback can call the context_budgeters() itself instead, after
+    whatever else that callback adds to a task's output.
+    """
+    for producer, budgeter in zip(tasks, context_budgeters(tasks, profiles)):
+        if budgeter is None:
+            continue
+        previous = producer.callback
+
+        def _callback(output, b=budgeter, previous=previous):
+            if previous:
+                previous(output)
+            b.apply()
+
+        producer.callback = _callback
@@ -1,8 +1,12 @@
 """CrewAI Crew definition — hierarchical process with manager + specialists."""
 
+from backend.config import OUTPUT_DIR, DIRECT_CHARTS, use_modern_sqlite
+
+use_modern_sqlite()  # before anything pulls in crewai (and chromadb)
+
 from crewai import Crew, Process
 
-from backend.config import OUTPUT_DIR
+from backend.crew import cancellation
 from backend.crew.agents import (
     build_manager,
     build_researcher,
@@ -10,71 +14,163 @@ from backend.crew.agents import (
     build_visualizer,
     build_writer,
 )
+from backend.crew.chart_stage import run_chart_stage
+from backend.crew.context_budget import apply_context_budgets, context_budgeters
+from backend.crew.events import Delegation
+from backend.crew.profiles import profile_for
+from backend.crew.residency import residency
+from backend.crew.routing import route_for
+from backend.crew.schemas import ChartSpecSet, parse_chart_specs
 from backend.crew.tasks import build_tasks
 from backend.crew.tools import chart_tool, file_tool
+from backend.crew.watchdog import watchdog_for
 
 
-# Explicit agent info for each task in pipeline order
+# Explicit agent info for each task in pipeline order — (key, role, model, vm),
+# the model and vm as routed in config
 TASK_AGENTS = [
-    ("researcher", "Market Research Specialist", "qwen2.5:14b", "specialist"),
-    ("analyst", "Data Analyst", "qwen2.5:14b", "specialist"),
-    ("visualizer", "Data Visualization Specialist", "qwen2.5:14b", "specialist"),
-    ("writer", "Report Writer", "qwen2.5:14b", "specialist"),
+    (key, role, route_for(key).label, route_for(key).vm)
+    for key, role in (
+        ("researcher", "Market Research Specialist"),
+        ("analyst", "Data Analyst"),
+        ("visualizer", "Data Visualization Specialist"),
+        ("writer", "Report Writer"),
+    )
 ]
 
+# Attribution for the deterministic chart stage (DIRECT_CHARTS) — no LLM involved
+CHART_STAGE_AGENT = ("visualizer", "Data Visualization Specialist", "matplotlib", "app")
+
+
+def _validate_chart_handoff(task_output):
+    """Validate the analyst's chart specs once, at the analyst -> visualizer hand-off.
+
+    The validated set is attached as task_output.pydantic and the raw output is
+    rewritten to one canonical JSON object per line, so the visualizer copies
+    known-good input into ChartTool instead of re-deriving it.
+    """
+    specs = parse_chart_specs(task_output.raw)
+    if not specs:
+        return
+    task_output.pydantic = ChartSpecSet(charts=specs[:4])
+    task_output.raw = "\n".join(spec.model_dump_json() for spec in specs[:4])
+
+
+def build_crew(topic: str, bridge=None, direct_charts: bool = DIRECT_CHARTS, report=None) -> Crew:
+    """Build a fully configured crew for the given research topic.
 
-def build_crew(topic: str, bridge=None) -> Crew:
-    """Build a fully configured crew for the given research topic."""
+    With direct_charts the visualization task is dropped and the analyst's
+    specs are rendered by the deterministic chart stage instead. A
+    ReportAssembler, if given, is fed each task's output as it completes.
+    """
 
-    # Build agents
-    manager = build_manager()
-    researcher = build_researcher()
-    analyst = build_analyst()
-    visualizer = build_visualizer(tools=[chart_tool])
-    writer = build_writer(tools=[file_tool])
+    # Build agents — the run id attributes each agent's LLM calls in /metrics
+    run_id = bridge.run_id if bridge else None
+    manager = build_manager(run_id)
+    researcher = build_researcher(run_id)
+    analyst = build_analyst(run_id)
+    visualizer = build_visualizer(tools=[chart_tool], run_id=run_id)
+    writer = build_writer(tools=[file_tool], run_id=run_id)
 
-    # Build tasks (always in this order: research → analysis → visualization → writing)
+    # Build tasks (always in this order: research → analysis → [visualization] → writing)
     tasks = build_tasks(
         topic=topic,
         researcher=researcher,
         analyst=analyst,
         visualizer=visualizer,
         writer=writer,
+        include_visualization=not direct_charts,
     )
+    task_agents = [a for a in TASK_AGENTS if not (direct_charts and a[0] == "visualizer")]
+
+    def _after_analysis(task_output):
+        _validate_chart_handoff(task_output)
+        if direct_charts and not bridge:
+            run_chart_stage(task_output)
+
+    analysis_task = tasks[1]
+    analysis_task.callback = _after_analysis
+
+    # Trim upstream outputs to each consumer's context window before it starts.
+    # With the bridge, the crew's task_callback runs the chart stage — after
+    # the tasks' own callbacks — so it budgets too, once the stage's chart
+    # paths are in the analysis output.
+    profiles = [profile_for(agent_key) for agent_key, *_ in task_agents]
+    if not bridge:
+        apply_context_budgets(tasks, profiles)
 
     # In hierarchical mode, the manager's executor handles all tasks.
     # We track which task index is active and attribute events accordingly.
     if bridge:
         task_index = [0]  # Mutable container for closure
+        budgeters = context_budgeters(tasks, profiles)
 
         manager.step_callback = bridge.step_callback
 
+        # Loop limits — every agent's steps pass through the run's watchdog
+        dog = watchdog_for(run_id)
+        if dog:
+            manager_step = dog.watch("manager", manager)
+
+            def _manager_step(step_output):
+                bridge.step_callback(step_output)
+                manager_step(step_output)
+
+            manager.step_callback = _manager_step
+            for agent_key, agent in (("researcher", researcher), ("analyst", analyst),
+                                     ("visualizer", visualizer), ("writer", writer)):
+                agent.step_callback = dog.watch(agent_key, agent)
+
+        def _start_agent(idx: int):
+            if dog:
+                dog.start_task()
+            bridge.set_current_agent(*task_agents[idx])
+            # Warm the next stage's model so it is resident by the hand-off
+            if idx + 1 < len(task_agents):
+                next_route = route_for(task_agents[idx + 1][0])
+                residency.prewarm(next_route.model, next_route.base_url)
+
+        def _chart_stage(task_output):
+            stage_key, stage_role, _, _ = CHART_STAGE_AGENT
+            bridge.push_event(Delegation(
+                from_="manager",
+                to=stage_key,
+                instruction="Rendering the analyst's chart specs directly",
+            ))
+            bridge.set_current_agent(*CHART_STAGE_AGENT)
+            paths = run_chart_stage(task_output, bridge)
+            bridge.complete_agent(stage_key, stage_role)
+            if report:
+                report.add_charts(paths)
+
         # Set the first agent as current
-        bridge.set_current_agent(*TASK_AGENTS[0])
+        _start_agent(0)
 
         def _task_callback(task_output):
+            # Cancellation checkpoint between tasks
+            cancellation.check(bridge.run_id)
             current_idx = task_index[0]
-            agent_key, agent_role, _, _ = TASK_AGENTS[current_idx]
+            agent_key, agent_role, _, _ = task_agents[current_idx]
 
             # Emit agent_complete for the finishing agent
-            bridge.push_event({
-                "type": "agent_complete",
-                "agent": agent_key,
-                "role": agent_role,
-            })
+            bridge.complete_agent(agent_key, agent_role)
+
+            if report:
+                report.on_task_complete(agent_key, task_output)
+
+            if direct_charts and agent_key == "analyst":
+                _chart_stage(task_output)
+
+            if budgeters[current_idx]:
+                budgeters[current_idx].apply()
 
             # Advance to next task
             next_idx = current_idx + 1
-            if next_idx < len(TASK_AGENTS):
+            if next_idx < len(task_agents):
                 # Manager delegates — show the handoff
-                next_key, next_role, next_model, next_vm = TASK_AGENTS[next_idx]
-                bridge.push_event({
-                    "type": "delegation",
-                    "from": "manager",
-                    "to": next_key,
-                    "instruction": f"Delegating to {next_role}",
-                })
-                bridge.set_current_agent(next_key, next_role, next_model, next_vm)
+                next_key, next_role, _, _ = task_agents[next_idx]
+                bridge.push_event(Delegation(from_="manager", to=next_key, instruction=f"Delegating to {next_role}"))
+                _start_agent(next_idx)
                 task_index[0] = next_idx
 
         crew_kwargs_extra = {"task_callback": _task_callback}
@@ -84,7 +180,7 @@ def build_crew(topic: str, bridge=None) -> Crew:
     # Assemble crew
     log_path = str(OUTPUT_DIR / "crew_log.txt")
     crew_kwargs = dict(
-        agents=[researcher, analyst, visualizer, writer],
+        agents=[researcher, analyst, writer] if direct_charts else [researcher, analyst, visualizer, writer],
         tasks=tasks,
         manager_agent=manager,
         process=Process.hierarchical,
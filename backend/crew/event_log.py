@@ -0,0 +1,266 @@
+"""Shared per-run event logs — lets every API worker process stream every run.
+
+With several uvicorn workers, a WebSocket can land on a process other than
+the one running the crew. With SHARED_EVENTS on, each run the API starts
+also appends its events to an append-only file, EVENT_LOG_DIR/{run_id}.jsonl:
+one compact JSON event per line, then a blank line once the run is complete.
+A coalesced duplicate's id is a symlink to the run's log.
+
+Another process streams the run by tailing that file into a local mirror
+CrewEventBridge — one tail per run per process, however many viewers it
+has — and its viewers consume the mirror exactly like a local run. Viewers
+on the process that runs the crew read the run's own bridge; the file is
+not in their path.
+
+Next to the log, {run_id}.run.json holds the run's state — status, report
+path, exports — rewritten whenever it changes, so any process can answer
+/status, /report and /export for it (SharedRun). A cancel request for a run
+owned elsewhere is left as {run_id}.cancel, which the owning process picks
+up and handles like its own DELETE /run.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from backend.config import EVENT_LOG_DIR, EVENT_LOG_POLL_MS
+from backend.crew.callbacks import CrewEventBridge
+from backend.crew.files import write_atomic
+from backend.crew.metrics import timings_for
+from backend.crew.run_manager import IN_FLIGHT
+
+logger = logging.getLogger("event_log")
+
+_RETENTION_S = 24 * 3600  # logs older than this are removed as new runs start
+# A log that stops growing without its end marker belongs to a process that
+# died; LLM calls can be silent for minutes, so give up only well after that
+_ABANDONED_S = 900
+_CANCEL_POLL_S = 0.5  # how often the owning process looks for forwarded cancel requests
+
+
+def _path(run_id: str):
+    return EVENT_LOG_DIR / f"{run_id}.jsonl"
+
+
+def _state_path(run_id: str):
+    return EVENT_LOG_DIR / f"{run_id}.run.json"
+
+
+def _cancel_path(run_id: str):
+    return EVENT_LOG_DIR / f"{run_id}.cancel"
+
+
+def _timings(run) -> dict | None:
+    # The publisher writes the final state before the engine stores run.timings
+    timings = timings_for(run.run_id)
+    return timings.summary() if timings else run.timings
+
+
+def _state(run) -> dict:
+    return {
+        "run_id": run.run_id,
+        "topic": run.topic,
+        "status": run.status,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "elapsed_seconds": run.elapsed_seconds,
+        "report_path": run.report_path,
+        "charts": run.charts,
+        "error": run.error,
+        "profile": run.profile,
+        "exports": run.exports,
+        "report_html": run.report_html,
+        "partial_report": run.partial_report,
+        "partial_stage": run.partial_stage,
+        "timings": _timings(run),
+    }
+
+
+class _Publisher:
+    """Bridge listener appending each event to the run's log (from any thread).
+
+    The run's state file is rewritten after an event that follows a change
+    of status, stage, report or exports, and once more when the run ends.
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self._file = open(_path(run.run_id), "ab", buffering=0)
+        self._lock = threading.Lock()
+        self._saved = None
+
+    def _fingerprint(self) -> tuple:
+        run = self.run
+        return (run.status, run.partial_stage, run.report_path, run.exports is not None, len(run.charts), run.error)
+
+    def save_state(self):
+        with self._lock:
+            fingerprint = self._fingerprint()
+            if fingerprint == self._saved:
+                return
+            self._saved = fingerprint
+            try:
+                write_atomic(_state_path(self.run.run_id), json.dumps(_state(self.run), ensure_ascii=False, default=str))
+            except OSError as e:
+                logger.warning(f"[{self.run.run_id}] Could not save shared run state: {e}")
+
+    def __call__(self, event):
+        line = json.dumps(event.to_wire(), ensure_ascii=False, separators=(",", ":"), default=str).encode() + b"\n"
+        with self._lock:
+            if not self._file.closed:
+                # One write() per event — readers never see half a line followed by another event
+                self._file.write(line)
+        self.save_state()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(b"\n")
+                self._file.close()
+            self._saved = None  # the final state is always written
+        self.save_state()
+
+
+def _prune():
+    cutoff = time.time() - _RETENTION_S
+    with os.scandir(EVENT_LOG_DIR) as entries:
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+def publish(run, on_cancel: Callable[[str], object]):
+    """Mirror `run`'s events (past and future) and state into its shared log.
+
+    `on_cancel(run_id)` is called on this process for each cancel request
+    another process forwards for the run or one of its aliases.
+    """
+    EVENT_LOG_DIR.mkdir(parents=True, exist_ok=True)
+    _prune()
+    publisher = _Publisher(run)
+    publisher.save_state()
+    for event in run.bridge.events:
+        publisher(event)
+    run.bridge.add_listener(publisher)
+    run.bridge.on_complete(publisher.close)
+    asyncio.create_task(_watch_cancels(run, on_cancel))
+
+
+def publish_alias(alias_id: str, run_id: str):
+    """Make a coalesced duplicate's id stream its run's log and read its state."""
+    for path in (_path, _state_path):
+        try:
+            os.symlink(path(run_id).name, path(alias_id))
+        except OSError as e:
+            logger.warning(f"[{alias_id}] Could not alias {path(run_id).name}: {e}")
+
+
+async def _watch_cancels(run, on_cancel: Callable[[str], object]):
+    while run.status in IN_FLIGHT:
+        await asyncio.sleep(_CANCEL_POLL_S)
+        for run_id in (run.run_id, *run.aliases):
+            path = _cancel_path(run_id)
+            if path.exists():
+                path.unlink(missing_ok=True)
+                logger.info(f"[{run_id}] Cancel request forwarded by another process")
+                on_cancel(run_id)
+
+
+def request_cancel(run_id: str):
+    """Forward a cancel request to the process running `run_id`."""
+    _cancel_path(run_id).touch()
+
+
+@dataclass
+class SharedRun:
+    """Another process's run, as last recorded in its state file."""
+
+    run_id: str
+    topic: str
+    status: str
+    started_at: Optional[str] = None
+    elapsed_seconds: Optional[float] = None
+    report_path: Optional[str] = None
+    charts: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+    profile: Optional[dict] = None
+    exports: Optional[dict] = None
+    report_html: Optional[str] = None
+    partial_report: Optional[str] = None
+    partial_stage: Optional[str] = None
+    timings: Optional[dict] = None
+
+    def __post_init__(self):
+        if self.status in IN_FLIGHT and self.started_at:
+            elapsed = datetime.now(timezone.utc) - datetime.fromisoformat(self.started_at)
+            self.elapsed_seconds = round(elapsed.total_seconds(), 1)
+
+    def events(self) -> list[dict]:
+        """The events logged so far (blocking — call from a thread)."""
+        try:
+            lines = _path(self.run_id).read_bytes().split(b"\n")
+        except OSError:
+            return []
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+def shared_run(run_id: str) -> SharedRun | None:
+    """The run behind `run_id` from its shared state file, or None if there is none (blocking)."""
+    try:
+        state = json.loads(_state_path(run_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return SharedRun(**state)
+
+
+_mirrors: dict[str, CrewEventBridge] = {}
+
+
+def mirror(run_id: str) -> CrewEventBridge | None:
+    """A bridge replaying another process's run from its log, or None if there is no log."""
+    path = _path(run_id)
+    if not path.exists():
+        return None
+    path = path.resolve()  # aliases share their run's mirror
+    real_id = path.name.removesuffix(".jsonl")
+    bridge = _mirrors.get(real_id)
+    if bridge is None:
+        bridge = _mirrors[real_id] = CrewEventBridge(real_id)
+        asyncio.create_task(_tail(path, bridge))
+    return bridge
+
+
+async def _tail(path, bridge: CrewEventBridge):
+    """Push the log's events into `bridge` as they are appended, until the end marker."""
+    pending = b""
+    idle_since = time.monotonic()
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read()
+                if not chunk:
+                    if time.monotonic() - idle_since > _ABANDONED_S:
+                        logger.warning(f"[{bridge.run_id}] Event log abandoned by its publisher")
+                        return
+                    await asyncio.sleep(EVENT_LOG_POLL_MS / 1000)
+                    continue
+                idle_since = time.monotonic()
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    if not line:
+                        return
+                    bridge.push_event(json.loads(line))
+    except OSError as e:
+        logger.warning(f"[{bridge.run_id}] Event log unreadable: {e}")
+    finally:
+        # Finished mirrors are dropped; a late viewer re-reads the file
+        _mirrors.pop(bridge.run_id, None)
+        bridge.mark_complete()
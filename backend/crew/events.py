@@ -0,0 +1,175 @@
+"""Typed crew events — compact records behind the WebSocket wire format.
+
+A bridge keeps every event of its run for late joiners, so each event is a
+slotted record rather than a dict: no per-event key table, and the
+timestamp is a monotonic float that becomes the wire's ISO string only when
+the event is serialized (to_wire). to_wire() produces exactly the JSON
+objects the stream has always sent. Events relayed from another process or
+replayed from an archive arrive as wire dicts and go through from_wire();
+keys a record has no field for are kept in `extra` and sent back out.
+"""
+
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import ClassVar
+
+# Wall clock at monotonic zero — monotonic times become wire timestamps through it
+_WALL_ANCHOR = time.time() - time.monotonic()
+
+
+def _iso(at: float) -> str:
+    return datetime.fromtimestamp(_WALL_ANCHOR + at, timezone.utc).isoformat()
+
+
+def _monotonic(timestamp) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp() - _WALL_ANCHOR
+    except (TypeError, ValueError):
+        return time.monotonic()
+
+
+@dataclass(slots=True, kw_only=True)
+class Event:
+    type: ClassVar[str] = ""
+    NULLABLE: ClassVar[tuple] = ()  # fields sent as null when None (the rest are left out)
+
+    at: float = field(default_factory=time.monotonic)
+    run_id: str | None = None
+    extra: dict | None = None
+
+    @property
+    def timestamp(self) -> str:
+        return _iso(self.at)
+
+    def to_wire(self) -> dict:
+        wire = {"type": self.type}
+        for name, key in _WIRE_FIELDS[type(self)]:
+            value = getattr(self, name)
+            if value is not None or name in self.NULLABLE:
+                wire[key] = value
+        if self.extra:
+            wire.update(self.extra)
+        wire["timestamp"] = self.timestamp
+        wire["run_id"] = self.run_id
+        return wire
+
+
+@dataclass(slots=True, kw_only=True)
+class AgentStart(Event):
+    type: ClassVar[str] = "agent_start"
+    agent: str | None = None
+    role: str | None = None
+    model: str | None = None
+    vm: str | None = None
+    task_summary: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class AgentOutput(Event):
+    type: ClassVar[str] = "agent_output"
+    agent: str | None = None
+    role: str | None = None
+    content: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class ToolUse(Event):
+    type: ClassVar[str] = "tool_use"
+    agent: str | None = None
+    role: str | None = None
+    tool: str | None = None
+    tool_input: str | None = None
+    content: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class AgentComplete(Event):
+    type: ClassVar[str] = "agent_complete"
+    agent: str | None = None
+    role: str | None = None
+    elapsed_seconds: float | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class Delegation(Event):
+    type: ClassVar[str] = "delegation"
+    from_: str | None = None  # "from" on the wire
+    to: str | None = None
+    instruction: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class ChartCreated(Event):
+    type: ClassVar[str] = "chart_created"
+    agent: str | None = None
+    chart_title: str | None = None
+    path: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class ReportPartial(Event):
+    type: ClassVar[str] = "report_partial"
+    stage: str | None = None
+    content: str | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class CrewComplete(Event):
+    type: ClassVar[str] = "crew_complete"
+    NULLABLE: ClassVar[tuple] = ("total_seconds", "report_path", "charts")
+    total_seconds: float | None = None
+    report_path: str | None = None
+    charts: list[str] | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class CrewError(Event):
+    type: ClassVar[str] = "error"
+    NULLABLE: ClassVar[tuple] = ("message",)
+    agent: str | None = None
+    message: str | None = None
+    recoverable: bool = False
+    cancelled: bool | None = None
+    watchdog: bool | None = None
+
+
+@dataclass(slots=True, kw_only=True)
+class Snapshot(Event):
+    """A joining viewer's view of the run's state — sent, never pushed."""
+    type: ClassVar[str] = "snapshot"
+    state: dict | None = None
+    next_index: int = 0
+
+
+EVENT_TYPES = {cls.type: cls for cls in (
+    AgentStart, AgentOutput, ToolUse, AgentComplete, Delegation,
+    ChartCreated, ReportPartial, CrewComplete, CrewError, Snapshot,
+)}
+
+_BASE_FIELDS = {f.name for f in fields(Event)}
+# (attribute, wire key) per record type, in wire order
+_WIRE_FIELDS = {
+    cls: tuple((f.name, f.name.rstrip("_")) for f in fields(cls) if f.name not in _BASE_FIELDS)
+    for cls in EVENT_TYPES.values()
+}
+
+
+def from_wire(data: dict) -> Event:
+    """The record for a wire-format event dict."""
+    cls = EVENT_TYPES.get(data.get("type"))
+    if cls is None:
+        raise ValueError(f"Unknown event type: {data.get('type')!r}")
+    known = {key: name for name, key in _WIRE_FIELDS[cls]}
+    values, extra = {}, {}
+    for key, value in data.items():
+        if key in known:
+            values[known[key]] = value
+        elif key not in ("type", "timestamp", "run_id"):
+            extra[key] = value
+    return cls(
+        at=_monotonic(data.get("timestamp")) if "timestamp" in data else time.monotonic(),
+        run_id=data.get("run_id"),
+        extra=extra or None,
+        **values,
+    )
@@ -0,0 +1,25 @@
+"""Atomic writes for run artifacts.
+
+Files under reports/, traces/ and profiles/ are served as immutable and
+cached in memory on first request (backend/artifacts.py), so a reader must
+never see one half-written: each is written to a temporary file next to it
+and renamed into place.
+"""
+
+import os
+import threading
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: str | bytes):
+    """Write `data` to `path` — readers see the old file or the whole new one."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if isinstance(data, str):
+            tmp.write_text(data, encoding="utf-8")
+        else:
+            tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,201 @@
+"""Local job queue for out-of-process crew execution (EXECUTOR_MODE=workers).
+
+A SQLite database in WAL mode, shared by the API process and the worker
+processes on the same host — no external service. The API enqueues a job
+per run; a worker claims it, appends the run's bridge events to the
+`events` table as they are pushed, heartbeats while it runs and stores the
+run's final fields as `result`. The API relays events back into the run's
+CrewEventBridge (remote_runner.py) and asks for cancellation by setting
+the job's `cancel` reason, which the worker sees on its next heartbeat.
+
+Each job records the API process that queued it (`owner`). Jobs whose
+owner has exited are failed when an API process starts (fail_orphans),
+and a worker's result only lands on a job it still holds — a job the API
+already failed stays failed.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued | running | done
+    worker TEXT,
+    owner INTEGER,  -- pid of the API process relaying the run
+    cancel TEXT,  -- reason, once cancellation is requested
+    result TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_run ON events (run_id, id);
+"""
+
+
+class JobQueue:
+    """One connection per process; methods are blocking and thread-safe."""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: commits don't fsync, a power cut loses at most the last events
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:  # databases created before jobs had owners
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+
+    def enqueue(self, run_id: str, topic: str, options: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (run_id, topic, options, owner, created_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, topic, json.dumps(options), os.getpid(), time.time()),
+            )
+
+    def claim(self, worker: str) -> dict | None:
+        """Take the oldest queued job, or None."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT run_id, topic, options, cancel FROM jobs WHERE status = 'queued' "
+                    "ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    now = time.time()
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? "
+                        "WHERE run_id = ?",
+                        (worker, now, now, row["run_id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"run_id": row["run_id"], "topic": row["topic"], "options": json.loads(row["options"]),
+                "cancel": row["cancel"]}
+
+    def append_event(self, run_id: str, event: dict):
+        payload = json.dumps(event, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self._conn.execute("INSERT INTO events (run_id, payload) VALUES (?, ?)", (run_id, payload))
+
+    def events_since(self, run_id: str, after_id: int) -> list[tuple[int, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM events WHERE run_id = ? AND id > ? ORDER BY id", (run_id, after_id),
+            ).fetchall()
+        return [(row["id"], json.loads(row["payload"])) for row in rows]
+
+    def heartbeat(self, run_id: str) -> str | None:
+        """Mark the job alive; returns the cancel reason once cancellation is requested."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE run_id = ?", (time.time(), run_id))
+            row = self._conn.execute("SELECT cancel FROM jobs WHERE run_id = ?", (run_id,)).fetchone()
+        return row["cancel"] if row else None
+
+    def request_cancel(self, run_id: str, reason: str):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET cancel = ? WHERE run_id = ? AND cancel IS NULL", (reason, run_id))
+
+    def withdraw(self, run_id: str, result: dict) -> bool:
+        """Finish a job no worker has claimed yet; False if one already has."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? WHERE run_id = ? AND status = 'queued'",
+                (json.dumps(result), time.time(), run_id),
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, run_id: str, worker: str, result: dict) -> bool:
+        """Store a worker's result; False if the job is no longer that worker's to finish."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? "
+                "WHERE run_id = ? AND status = 'running' AND worker = ?",
+                (json.dumps(result, ensure_ascii=False, default=str), time.time(), run_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, run_id: str, error: str):
+        """Finish a job as failed from the API's side, and tell its worker (if any) to stop."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ?, cancel = COALESCE(cancel, ?) "
+                "WHERE run_id = ? AND status != 'done'",
+                (json.dumps({"status": "error", "error": error}), time.time(), error, run_id),
+            )
+
+    def fail_orphans(self) -> int:
+        """Fail the unfinished jobs of API processes that have exited; returns how many."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, owner FROM jobs WHERE status != 'done' AND owner IS NOT NULL"
+            ).fetchall()
+        orphans = [row["run_id"] for row in rows if not _alive(row["owner"])]
+        for run_id in orphans:
+            self.fail(run_id, "API process exited")
+        return len(orphans)
+
+    def job(self, run_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def forget_events(self, run_id: str):
+        """Drop a finished run's relayed events — the API keeps them in memory."""
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE run_id = ?", (run_id,))
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+_queue: JobQueue | None = None
+
+
+def job_queue() -> JobQueue:
+    """This process's connection to JOBS_DB, opened on first use."""
+    global _queue
+    if _queue is None:
+        from backend.config import JOBS_DB
+
+        JOBS_DB.parent.mkdir(parents=True, exist_ok=True)
+        _queue = JobQueue(JOBS_DB)
+    return _queue
@@ -0,0 +1,284 @@
+"""Latency and token instrumentation — Prometheus text exposition plus per-run timings.
+
+Kept dependency-free: a handful of counters and histograms with labels is
+all we need, and the text format is simple enough to render directly.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.crew import tracing
+from backend.crew.context import current_run_id
+
+# Seconds — from sub-second tool calls up to multi-minute agent stages
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{_label_str(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in self._values.items():
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_label_str(key + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_label_str(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_label_str(key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list = []  # callables returning extra exposition lines
+
+    def counter(self, name: str, help: str) -> Counter:
+        metric = Counter(name, help)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+AGENT_SECONDS = REGISTRY.histogram("crew_agent_seconds", "Wall time per agent stage")
+LLM_SECONDS = REGISTRY.histogram("crew_llm_request_seconds", "LLM HTTP request latency")
+LLM_TTFT = REGISTRY.histogram("crew_llm_time_to_first_token_seconds", "Time to first response byte from Ollama")
+LLM_PROMPT_TOKENS = REGISTRY.counter("crew_llm_prompt_tokens_total", "Prompt tokens evaluated")
+LLM_COMPLETION_TOKENS = REGISTRY.counter("crew_llm_completion_tokens_total", "Completion tokens generated")
+LLM_RETRIES = REGISTRY.counter("crew_llm_retries_total", "LLM requests retried, by reason")
+LLM_HEDGES = REGISTRY.counter(
+    "crew_llm_hedged_total", "LLM requests duplicated to the hedge endpoint, by which copy answered first",
+)
+TOOL_SECONDS = REGISTRY.histogram("crew_tool_seconds", "Tool execution time")
+FANOUT_LAG = REGISTRY.histogram(
+    "crew_event_fanout_lag_seconds", "Delay between push_event and a consumer picking the event up", LAG_BUCKETS,
+)
+WATCHDOG_TRIPS = REGISTRY.counter(
+    "crew_watchdog_trips_total", "Agents stopped by the loop watchdog, by action (finish or fail)",
+)
+RUNS = REGISTRY.counter("crew_runs_total", "Crew runs by final status")
+RUNS_COALESCED = REGISTRY.counter(
+    "crew_runs_coalesced_total", "Run requests served by an identical run already in flight",
+)
+RUN_SECONDS = REGISTRY.histogram("crew_run_seconds", "End-to-end run time")
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "crew_event_loop_lag_seconds", "Event-loop wake-up delay, sampled while a profiled run is active", LAG_BUCKETS,
+)
+
+
+def _process_metrics() -> list[str]:
+    lines = [
+        "# HELP process_cpu_seconds_total CPU time consumed by the API process",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {time.process_time()}",
+    ]
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        lines += [
+            "# HELP process_resident_memory_bytes Resident set size",
+            "# TYPE process_resident_memory_bytes gauge",
+            f"process_resident_memory_bytes {rss_pages * os.sysconf('SC_PAGE_SIZE')}",
+        ]
+    except (OSError, ValueError, IndexError):
+        pass
+    return lines
+
+
+REGISTRY.register_collector(_process_metrics)
+
+
+class RunTimings:
+    """Per-run timing breakdown reported by /api/crew/status/{run_id}."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.agents: dict[str, float] = {}
+        self.llm: dict[str, dict] = {}
+        self.tools: dict[str, dict] = {}
+        self.fanout_lag_max = 0.0
+
+    def record_agent(self, agent: str, seconds: float):
+        with self._lock:
+            self.agents[agent] = round(self.agents.get(agent, 0.0) + seconds, 3)
+
+    def record_llm(self, agent: str, model: str, seconds: float, ttft: float | None,
+                   prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            entry = self.llm.setdefault(agent, {
+                "model": model, "calls": 0, "seconds": 0.0, "ttft_seconds_max": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0,
+            })
+            entry["calls"] += 1
+            entry["seconds"] = round(entry["seconds"] + seconds, 3)
+            if ttft is not None:
+                entry["ttft_seconds_max"] = round(max(entry["ttft_seconds_max"], ttft), 3)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+
+    def record_tool(self, tool: str, seconds: float):
+        with self._lock:
+            entry = self.tools.setdefault(tool, {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] = round(entry["seconds"] + seconds, 3)
+
+    def record_lag(self, seconds: float):
+        if seconds > self.fanout_lag_max:
+            self.fanout_lag_max = seconds
+
+    def load(self, summary: dict):
+        """Adopt the agent, LLM and tool timings of a run executed by a worker process."""
+        with self._lock:
+            self.agents = dict(summary.get("agents") or {})
+            self.llm = {k: dict(v) for k, v in (summary.get("llm") or {}).items()}
+            self.tools = {k: dict(v) for k, v in (summary.get("tools") or {}).items()}
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "agents": dict(self.agents),
+                "llm": {k: dict(v) for k, v in self.llm.items()},
+                "tools": {k: dict(v) for k, v in self.tools.items()},
+                "fanout_lag_max_seconds": round(self.fanout_lag_max, 4),
+            }
+
+
+# Runs in progress in this process; a finished run keeps its summary (CrewRun.timings)
+_run_timings: dict[str, RunTimings] = {}
+
+
+def start_timings(run_id: str) -> RunTimings:
+    """Begin recording `run_id`'s timings — called once, when the run starts."""
+    return _run_timings.setdefault(run_id, RunTimings())
+
+
+def timings_for(run_id: str | None) -> RunTimings | None:
+    """The timings of a run in progress in this process, or None."""
+    if run_id is None:
+        return None
+    return _run_timings.get(run_id)
+
+
+def finish_timings(run_id: str) -> dict | None:
+    """Stop recording `run_id`'s timings and return their summary."""
+    timings = _run_timings.pop(run_id, None)
+    return timings.summary() if timings else None
+
+
+def observe_agent(run_id: str, agent: str, seconds: float):
+    AGENT_SECONDS.observe(seconds, agent=agent)
+    timings = timings_for(run_id)
+    if timings:
+        timings.record_agent(agent, seconds)
+
+
+def observe_llm_call(run_id: str | None, agent: str, model: str, seconds: float,
+                     ttft: float | None, prompt_tokens: int, completion_tokens: int):
+    LLM_SECONDS.observe(seconds, agent=agent, model=model)
+    if ttft is not None:
+        LLM_TTFT.observe(ttft, agent=agent, model=model)
+    LLM_PROMPT_TOKENS.inc(prompt_tokens, agent=agent, model=model)
+    LLM_COMPLETION_TOKENS.inc(completion_tokens, agent=agent, model=model)
+    timings = timings_for(run_id)
+    if timings:
+        timings.record_llm(agent, model, seconds, ttft, prompt_tokens, completion_tokens)
+
+
+def observe_fanout_lag(run_id: str, seconds: float):
+    FANOUT_LAG.observe(seconds)
+    timings = timings_for(run_id)
+    if timings:
+        timings.record_lag(seconds)
+
+
+def observe_run(status: str, seconds: float | None):
+    RUNS.inc(status=status)
+    if seconds is not None:
+        RUN_SECONDS.observe(seconds)
+
+
+@contextmanager
+def track_tool(tool: str):
+    """Time a tool call, attributed to the run in the current context."""
+    start = time.monotonic()
+    start_ns = time.time_ns()
+    status = tracing.STATUS_OK
+    try:
+        yield
+    except Exception:
+        status = tracing.STATUS_ERROR
+        raise
+    finally:
+        seconds = time.monotonic() - start
+        TOOL_SECONDS.observe(seconds, tool=tool)
+        run_id = current_run_id.get()
+        timings = timings_for(run_id)
+        if timings:
+            timings.record_tool(tool, seconds)
+        trace = tracing.trace_for(run_id)
+        if trace:
+            trace.record(f"tool {tool}", start_ns, time.time_ns(), status=status, attributes={"tool.name": tool})
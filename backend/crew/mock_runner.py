@@ -3,9 +3,15 @@
 import asyncio
 from datetime import datetime, timezone
 
+from backend.config import REPORTS_DIR
+from backend.crew import cancellation
+from backend.crew.events import CrewComplete, CrewError
+from backend.crew.files import write_atomic
+from backend.crew.metrics import observe_run
+from backend.crew.report_export import export_report
+from backend.crew.routing import route_for
 from backend.crew.run_manager import CrewRun
 from backend.tools.chart_tool import generate_chart
-from backend.tools.file_tool import save_report
 
 
 # ── Mock chart datasets ──
@@ -121,8 +127,8 @@ def _build_event_sequence(topic: str, chart_paths: list[str]) -> list[tuple[floa
             "type": "agent_start",
             "agent": "manager",
             "role": "Senior Research Director",
-            "model": "gemma3:27b",
-            "vm": "orchestrator",
+            "model": route_for("manager").label,
+            "vm": route_for("manager").vm,
             "task_summary": f"Planning research approach for: {topic}",
         }),
         (2.0, {
@@ -142,8 +148,8 @@ def _build_event_sequence(topic: str, chart_paths: list[str]) -> list[tuple[floa
             "type": "agent_start",
             "agent": "researcher",
             "role": "Market Research Specialist",
-            "model": "gemma3:12b",
-            "vm": "specialist",
+            "model": route_for("researcher").label,
+            "vm": route_for("researcher").vm,
             "task_summary": "Researching edge AI inference competitive landscape",
         }),
         (3.0, {
@@ -173,8 +179,8 @@ def _build_event_sequence(topic: str, chart_paths: list[str]) -> list[tuple[floa
             "type": "agent_start",
             "agent": "analyst",
             "role": "Data Analyst",
-            "model": "gemma3:12b",
-            "vm": "specialist",
+            "model": route_for("analyst").label,
+            "vm": route_for("analyst").vm,
             "task_summary": "Producing chart-ready datasets from research",
         }),
         (3.0, {
@@ -199,8 +205,8 @@ def _build_event_sequence(topic: str, chart_paths: list[str]) -> list[tuple[floa
             "type": "agent_start",
             "agent": "visualizer",
             "role": "Data Visualization Specialist",
-            "model": "gemma3:12b",
-            "vm": "specialist",
+            "model": route_for("visualizer").label,
+            "vm": route_for("visualizer").vm,
             "task_summary": "Generating presentation-ready charts",
         }),
         (2.0, {
@@ -238,8 +244,8 @@ def _build_event_sequence(topic: str, chart_paths: list[str]) -> list[tuple[floa
             "type": "agent_start",
             "agent": "writer",
             "role": "Report Writer",
-            "model": "gemma3:12b",
-            "vm": "specialist",
+            "model": route_for("writer").label,
+            "vm": route_for("writer").vm,
             "task_summary": "Writing final markdown report",
         }),
         (4.0, {
@@ -280,15 +286,17 @@ async def run_mock_crew(run: CrewRun):
         run.charts = [f"/output/{p}" for p in chart_paths]
 
         # Save real report
-        report_filename = save_report("report", MOCK_REPORT)
-        run.report_path = f"/output/{report_filename}"
+        report_file = REPORTS_DIR / f"{run.run_id}.md"
+        write_atomic(report_file, MOCK_REPORT)
+        run.report_path = f"/output/reports/{report_file.name}"
+        await asyncio.to_thread(export_report, run, MOCK_REPORT)
 
         # Stream events with timing
         events = _build_event_sequence(run.topic, chart_paths)
         total_elapsed = 0.0
 
         for i, (delay, event) in enumerate(events):
-            await asyncio.sleep(delay)
+            await cancellation.sleep(run.run_id, delay)
             total_elapsed += delay
             logger.info(f"[{run.run_id}] Pushing event {i+1}/{len(events)}: {event['type']} agent={event.get('agent', event.get('from', ''))}")
             bridge.push_event(event)
@@ -297,27 +305,25 @@ async def run_mock_crew(run: CrewRun):
 
         # Final crew_complete event
         run.completed_at = datetime.now(timezone.utc)
-        bridge.push_event({
-            "type": "crew_complete",
-            "total_seconds": round(total_elapsed, 1),
-            "report_path": run.report_path,
-            "charts": run.charts,
-        })
-
-        logger.info(f"[{run.run_id}] crew_complete pushed. Queue size: {bridge.queue.qsize()}")
+        bridge.push_event(CrewComplete(
+            total_seconds=round(total_elapsed, 1),
+            report_path=run.report_path,
+            charts=run.charts,
+        ))
+
+        logger.info(f"[{run.run_id}] crew_complete pushed. Events: {len(bridge.events)}")
         run.status = "completed"
 
+    except cancellation.RunCancelled:
+        cancellation.mark_cancelled(run)
+
     except Exception as e:
         logger.error(f"[{run.run_id}] Mock runner error: {e}")
         run.status = "error"
         run.error = str(e)
-        bridge.push_event({
-            "type": "error",
-            "agent": "system",
-            "message": str(e),
-            "recoverable": False,
-        })
+        bridge.push_event(CrewError(agent="system", message=str(e)))
 
     finally:
+        observe_run(run.status, run.elapsed_seconds)
         logger.info(f"[{run.run_id}] Calling mark_complete()")
         bridge.mark_complete()
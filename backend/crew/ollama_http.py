@@ -0,0 +1,392 @@
+"""Instrumented HTTP client for the agents' Ollama calls.
+
+LiteLLM's callback hooks are reset by CrewAI on every call, so we measure
+at the HTTP layer instead: each agent's LLM gets its own httpx client whose
+transport times the request, notes when the first response byte arrives,
+and reads Ollama's prompt_eval_count / eval_count from the tail of the body.
+
+The transport is also the run's cancellation point for generation: it
+refuses new requests once the run is cancelled, and on cancel shuts down
+every socket it has opened, so Ollama sees the client go away and stops
+generating.
+
+It also moves keep_alive to the top of /api/generate bodies: LiteLLM sends
+it inside options there, where Ollama ignores it.
+"""
+
+import json
+import logging
+import re
+import socket
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+import httpx
+
+from backend.config import HEDGE_AFTER_MS
+from backend.crew import cancellation, metrics, recorder, tracing
+from backend.crew.watchdog import watchdog_for
+from backend.crew.profiles import profile_for
+
+logger = logging.getLogger("ollama_http")
+
+# Ollama reports token counts in the final (or only) JSON object of the body
+_TOKEN_COUNTS = re.compile(rb'"(prompt_eval_count|eval_count)"\s*:\s*(\d+)')
+_TAIL_BYTES = 4096
+
+
+class _ObservedStream(httpx.SyncByteStream):
+    """Wraps a response body to time the first byte and read token counts on close.
+
+    With keep_body the whole body is also kept and handed to on_close (for
+    the run recorder); otherwise on_close gets None.
+    """
+
+    def __init__(self, stream, on_first_byte, on_close, keep_body: bool = False):
+        self._stream = stream
+        self._on_first_byte = on_first_byte
+        self._on_close = on_close
+        self._tail = b""
+        self._body = bytearray() if keep_body else None
+        self._first = True
+        self._closed = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            if self._first and chunk:
+                self._first = False
+                self._on_first_byte()
+            self._tail = (self._tail + chunk)[-_TAIL_BYTES:]
+            if self._body is not None:
+                self._body += chunk
+            yield chunk
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._stream.close()
+        finally:
+            counts = {k.decode(): int(v) for k, v in _TOKEN_COUNTS.findall(self._tail)}
+            self._on_close(counts, bytes(self._body) if self._body is not None else None)
+
+
+class _Attempt:
+    """One try of a request against one endpoint, under its own deadline.
+
+    The deadline covers the whole call, body included: when it passes, the
+    attempt's connections are shut down and whoever is reading fails.
+    """
+
+    def __init__(self, transport: "OllamaTransport", request: httpx.Request, deadline: float):
+        self.transport = transport
+        self.request = request
+        self.origin = (request.url.scheme, request.url.host, request.url.port)
+        self.deadline = deadline
+        self.timed_out = False
+        self._timer = None
+
+    def send(self) -> httpx.Response:
+        if self.deadline > 0:
+            self._timer = threading.Timer(self.deadline, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+        # httpcore's trace extension hands us each new connection's network stream
+        self.request.extensions["trace"] = self._trace
+        try:
+            return httpx.HTTPTransport.handle_request(self.transport, self.request)
+        except httpx.TransportError as e:
+            self.finish()
+            if self.timed_out:
+                raise httpx.ReadTimeout(
+                    f"LLM call exceeded its {self.deadline:g}s deadline", request=self.request,
+                ) from e
+            raise
+        except BaseException:
+            self.finish()
+            raise
+
+    def _trace(self, event: str, info: dict):
+        if event == "connection.connect_tcp.complete":
+            self.transport._track(info["return_value"], self.origin)
+
+    def _expire(self):
+        self.timed_out = True
+        self.transport.abort(self.origin)
+
+    def abort(self):
+        self.finish()
+        self.transport.abort(self.origin)
+
+    def finish(self):
+        """The call is over — stop the deadline timer."""
+        if self._timer:
+            self._timer.cancel()
+
+
+# Runs the competing attempts of hedged requests — created by the first
+# hedged request, shut down with the process's app (shutdown_hedging)
+_hedge_pool: ThreadPoolExecutor | None = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+        return _hedge_pool
+
+
+def shutdown_hedging():
+    """Stop the hedging threads; attempts still in flight finish on their own."""
+    global _hedge_pool
+    with _hedge_pool_lock:
+        pool, _hedge_pool = _hedge_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+_RETRY_BACKOFF = 0.5  # seconds, doubled per retry
+
+
+class OllamaTransport(httpx.HTTPTransport):
+    """httpx transport that records per-call latency, TTFT and tokens for one agent.
+
+    Each call has a deadline and a retry budget. Failures before the
+    response starts — connection errors, a passed deadline, HTTP 5xx — are
+    retried. With a hedge URL, a streamed request with no response within
+    hedge_after seconds is also sent to that endpoint; the first response
+    wins and the other request is aborted. Ollama sends a streamed
+    response's headers with its first token, so that is the time to first
+    token. A non-streamed response only starts once the whole generation is
+    done, so those requests are never hedged.
+    """
+
+    def __init__(self, run_id: str | None, agent: str, model: str, deadline: float = 0.0,
+                 retries: int = 0, hedge_url: str | None = None, hedge_after: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.run_id = run_id
+        self.agent = agent
+        self.model = model
+        self.deadline = deadline
+        self.retries = retries
+        self.hedge_url = httpx.URL(hedge_url) if hedge_url else None
+        self.hedge_after = hedge_after
+        # Connections opened by this transport (all of them belong to this
+        # run), with the endpoint each one talks to
+        self._streams = weakref.WeakKeyDictionary()
+        self._streams_lock = threading.Lock()
+        self._scope = cancellation.scope_for(run_id)
+        if self._scope:
+            self._scope.on_cancel(self.abort)
+
+    def _track(self, stream, origin: tuple):
+        with self._streams_lock:
+            self._streams[stream] = origin
+
+    def abort(self, origin: tuple | None = None):
+        """Shut down this transport's connections (to one endpoint), from any thread.
+
+        shutdown() — unlike close() — wakes a read blocked in another
+        thread, which then fails the request; Ollama cancels the generation
+        when its client disconnects.
+        """
+        with self._streams_lock:
+            streams = [s for s, o in self._streams.items() if origin is None or o == origin]
+        for stream in streams:
+            sock = stream.get_extra_info("socket")
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except (OSError, AttributeError):
+                pass  # already closed
+
+    def _hedge_request(self, request: httpx.Request) -> httpx.Request:
+        url = request.url.copy_with(
+            scheme=self.hedge_url.scheme, host=self.hedge_url.host, port=self.hedge_url.port,
+        )
+        headers = [(k, v) for k, v in request.headers.raw if k.lower() != b"host"]
+        # Timeouts and the like carry over; the hedge gets its own trace from its _Attempt
+        extensions = {k: v for k, v in request.extensions.items() if k != "trace"}
+        return httpx.Request(request.method, url, headers=headers, content=request.content, extensions=extensions)
+
+    def _send_hedged(self, request: httpx.Request) -> tuple[httpx.Response, _Attempt]:
+        primary = _Attempt(self, request, self.deadline)
+        pool = _hedge_executor()
+        first = pool.submit(primary.send)
+        try:
+            return first.result(timeout=self.hedge_after), primary
+        except FuturesTimeout:
+            pass
+
+        hedge = _Attempt(self, self._hedge_request(request), self.deadline)
+        attempts = {first: primary, pool.submit(hedge.send): hedge}
+        pending, winner = set(attempts), None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if f.exception() is None), None)
+
+        for future in pending:
+            loser = attempts[future]
+            loser.abort()
+            # If the loser's response still arrives, release its connection
+            future.add_done_callback(lambda f: f.exception() is None and f.result().close())
+        metrics.LLM_HEDGES.inc(
+            agent=self.agent, winner="none" if winner is None else "hedge" if attempts[winner] is hedge else "primary",
+        )
+        if winner is None:
+            raise first.exception()
+        return winner.result(), attempts[winner]
+
+    def _send(self, request: httpx.Request) -> tuple[httpx.Response, _Attempt]:
+        """Send with the deadline, retry budget and hedging — up to the response headers."""
+        for attempt_no in range(self.retries + 1):
+            last = attempt_no == self.retries
+            if self._scope:
+                self._scope.check()
+            try:
+                if self.hedge_url is not None and _streamed(request):
+                    response, attempt = self._send_hedged(request)
+                else:
+                    attempt = _Attempt(self, request, self.deadline)
+                    response = attempt.send()
+            except httpx.TransportError as e:
+                if last or (self._scope and self._scope.cancelled):
+                    raise
+                reason = "timeout" if isinstance(e, httpx.TimeoutException) else "connection"
+                logger.warning(f"[{self.run_id}] {self.agent} LLM request failed ({e}), retrying")
+                metrics.LLM_RETRIES.inc(agent=self.agent, reason=reason)
+            else:
+                if response.status_code < 500 or last:
+                    return response, attempt
+                response.read()
+                response.close()
+                attempt.finish()
+                logger.warning(f"[{self.run_id}] {self.agent} LLM request got HTTP {response.status_code}, retrying")
+                metrics.LLM_RETRIES.inc(agent=self.agent, reason="http_5xx")
+            time.sleep(_RETRY_BACKOFF * 2 ** attempt_no)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        start_ns = time.time_ns()
+        response, attempt = self._send(_hoist_keep_alive(request))
+        request = attempt.request  # the hedge endpoint's copy, if that one won
+        first_byte = [None]
+        run_recorder = recorder.recorder_for(self.run_id)
+
+        def _first_byte():
+            first_byte[0] = time.monotonic() - start
+
+        def _close(counts: dict, body: bytes | None):
+            attempt.finish()
+            prompt_tokens = counts.get("prompt_eval_count", 0)
+            completion_tokens = counts.get("eval_count", 0)
+            metrics.observe_llm_call(
+                self.run_id, self.agent, self.model,
+                seconds=time.monotonic() - start,
+                ttft=first_byte[0],
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+            dog = watchdog_for(self.run_id)
+            if dog:
+                dog.on_tokens(self.agent, completion_tokens)
+            trace = tracing.trace_for(self.run_id)
+            if trace:
+                attributes = {
+                    "agent.key": self.agent,
+                    "llm.model": self.model,
+                    "http.url": str(request.url),
+                    "http.status_code": response.status_code,
+                    "llm.prompt_tokens": prompt_tokens,
+                    "llm.completion_tokens": completion_tokens,
+                }
+                if first_byte[0] is not None:
+                    attributes["llm.ttft_seconds"] = round(first_byte[0], 4)
+                trace.record(
+                    f"llm {self.agent}", start_ns, time.time_ns(), kind=tracing.KIND_CLIENT,
+                    status=tracing.STATUS_OK if response.status_code < 400 else tracing.STATUS_ERROR,
+                    attributes=attributes,
+                )
+            if run_recorder and body is not None:
+                run_recorder.llm_call(
+                    self.agent, self.model, str(request.url),
+                    request=_request_json(request),
+                    response=_response_text(body),
+                    seconds=time.monotonic() - start,
+                    ttft=first_byte[0],
+                )
+
+        response.stream = _ObservedStream(response.stream, _first_byte, _close, keep_body=run_recorder is not None)
+        return response
+
+
+def _hoist_keep_alive(request: httpx.Request) -> httpx.Request:
+    """The request with options.keep_alive moved to the top level of its body.
+
+    Ollama only reads a top-level keep_alive; left in options, every agent
+    call would reset the model's residency to the server default.
+    """
+    try:
+        if b"keep_alive" not in request.content:
+            return request
+        body = json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return request
+    options = body.get("options") if isinstance(body, dict) else None
+    if not isinstance(options, dict) or "keep_alive" not in options:
+        return request
+    body.setdefault("keep_alive", options.pop("keep_alive"))
+    headers = [(k, v) for k, v in request.headers.raw if k.lower() != b"content-length"]
+    return httpx.Request(
+        request.method, request.url, headers=headers,
+        content=json.dumps(body).encode(), extensions=request.extensions,
+    )
+
+
+def _streamed(request: httpx.Request) -> bool:
+    """Whether Ollama will stream the response (its default when "stream" is absent)."""
+    body = _request_json(request)
+    return not isinstance(body, dict) or body.get("stream", True) is not False
+
+
+def _request_json(request: httpx.Request) -> dict | None:
+    try:
+        return json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return None
+
+
+def _response_text(body: bytes) -> str:
+    """The generated text of an Ollama response — streamed NDJSON or a single object."""
+    pieces = []
+    for line in body.splitlines():
+        try:
+            chunk = json.loads(line)
+        except ValueError:
+            # Not JSON (an error page, say) — keep the raw body
+            return body.decode("utf-8", errors="replace")
+        if "error" in chunk:
+            return body.decode("utf-8", errors="replace")
+        pieces.append(chunk.get("response") or (chunk.get("message") or {}).get("content") or "")
+    return "".join(pieces)
+
+
+def ollama_client(run_id: str | None, agent: str, model: str, hedge_url: str | None = None):
+    """A LiteLLM HTTPHandler whose requests are attributed to one agent of one run.
+
+    The agent's profile sets the per-call deadline and retry budget; with a
+    hedge_url, slow requests are also sent there after HEDGE_AFTER_MS.
+    """
+    from litellm.llms.custom_httpx.http_handler import HTTPHandler
+
+    profile = profile_for(agent)
+    transport = OllamaTransport(
+        run_id, agent, model.split("/")[-1],
+        deadline=profile.deadline_s, retries=profile.retries,
+        hedge_url=hedge_url, hedge_after=HEDGE_AFTER_MS / 1000,
+    )
+    return HTTPHandler(client=httpx.Client(transport=transport, timeout=httpx.Timeout(600.0, connect=10.0)))
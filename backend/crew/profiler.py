@@ -0,0 +1,233 @@
+"""Opt-in sampling profiler for the backend process, captured per run.
+
+When a run is started with profile=true (or PROFILE_RUNS is set), a sampler
+thread snapshots every thread's stack via sys._current_frames() for the
+duration of the run, and an asyncio task measures event-loop lag — how late
+a short sleep wakes up, which is how long something blocked the loop.
+
+Artifacts land in output/profiles/ next to the run's other output:
+  {run_id}.collapsed          collapsed stacks (flamegraph.pl / speedscope)
+  {run_id}.speedscope.json    one sampled profile per thread (speedscope.app)
+  {run_id}.summary.json       top frames by self time + event-loop lag histogram
+
+The sampler sees the whole process, so overlapping profiled runs each
+capture the other's work too.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from backend.config import PROFILE_INTERVAL_MS, PROFILES_DIR
+from backend.crew.files import write_atomic
+from backend.crew.metrics import EVENT_LOOP_LAG, LAG_BUCKETS
+
+logger = logging.getLogger("profiler")
+
+LOOP_LAG_INTERVAL = 0.05  # seconds between event-loop lag probes
+TOP_FRAMES = 25
+
+
+def _frame_label(code) -> tuple[str, str, int]:
+    # Trim paths to package/module so stacks are readable across machines
+    path = Path(code.co_filename)
+    return code.co_name, "/".join(path.parts[-2:]), code.co_firstlineno
+
+
+class StackSampler:
+    """Background thread aggregating stack samples by (thread, stack)."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()  # (thread name, (frame, ...) root-first) -> count
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.monotonic() - self.started_at
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        labels: dict = {}  # code object -> frame label, so each code object is formatted once
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(names.get(ident, str(ident)), tuple(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = ";".join(f"{name} ({file}:{line})" for name, file, line in stack)
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        frames: list[dict] = []
+        frame_index: dict = {}
+        profiles: dict[str, dict] = {}
+        for (thread, stack), count in self.samples.items():
+            indices = []
+            for label in stack:
+                idx = frame_index.get(label)
+                if idx is None:
+                    idx = frame_index[label] = len(frames)
+                    frames.append({"name": label[0], "file": label[1], "line": label[2]})
+                indices.append(idx)
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": thread, "unit": "seconds",
+                "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+            })
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+        for profile in profiles.values():
+            profile["endValue"] = round(sum(profile["weights"]), 6)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "agentic-simple profiler",
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda p: -p["endValue"]),
+        }
+
+    def top_frames(self, limit: int = TOP_FRAMES) -> list[dict]:
+        """Frames by self time (leaf of the stack), across all threads."""
+        self_counts: Counter = Counter()
+        for (_, stack), count in self.samples.items():
+            if stack:
+                self_counts[stack[-1]] += count
+        return [
+            {"frame": f"{name} ({file}:{line})", "samples": count, "seconds": round(count * self.interval, 3)}
+            for (name, file, line), count in self_counts.most_common(limit)
+        ]
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes from a short sleep."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - before - self.interval)
+            self.lags.append(lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+    def summary(self) -> dict:
+        if not self.lags:
+            return {"probes": 0}
+        ordered = sorted(self.lags)
+        histogram = {str(bound): sum(1 for lag in ordered if lag <= bound) for bound in LAG_BUCKETS}
+        histogram["+Inf"] = len(ordered)
+        return {
+            "probes": len(ordered),
+            "interval_seconds": self.interval,
+            "max_seconds": round(ordered[-1], 4),
+            "p50_seconds": round(ordered[len(ordered) // 2], 4),
+            "p99_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 4),
+            "total_seconds": round(sum(ordered), 3),
+            "histogram": histogram,
+        }
+
+
+class RunProfiler:
+    """Stack sampling plus event-loop lag for the lifetime of one run."""
+
+    def __init__(self, run_id: str, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.run_id = run_id
+        self.sampler = StackSampler(interval_ms / 1000)
+        self.loop_lag = LoopLagMonitor()
+
+    def start(self):
+        """Must be called from the event loop."""
+        self.sampler.start()
+        self.loop_lag.start()
+        logger.info(f"[{self.run_id}] Profiling at {self.sampler.interval * 1000:.0f}ms")
+
+    async def stop(self) -> dict:
+        """Stop sampling and write artifacts. Returns {kind: /output/... path}."""
+        await self.loop_lag.stop()
+        await asyncio.to_thread(self.sampler.stop)
+        return await asyncio.to_thread(self._write)
+
+    def _write(self) -> dict:
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        summary = {
+            "run_id": self.run_id,
+            "duration_seconds": round(self.sampler.duration, 3),
+            "interval_seconds": self.sampler.interval,
+            "samples": self.sampler.sample_count,
+            "top_self_frames": self.sampler.top_frames(),
+            "event_loop_lag": self.loop_lag.summary(),
+        }
+        files = {
+            "collapsed": (f"{self.run_id}.collapsed", self.sampler.collapsed()),
+            "speedscope": (f"{self.run_id}.speedscope.json", json.dumps(self.sampler.speedscope(f"run {self.run_id}"))),
+            "summary": (f"{self.run_id}.summary.json", json.dumps(summary, indent=2)),
+        }
+        paths = {}
+        for kind, (filename, content) in files.items():
+            write_atomic(PROFILES_DIR / filename, content)
+            paths[kind] = f"/output/profiles/{filename}"
+        logger.info(
+            f"[{self.run_id}] Profile: {self.sampler.sample_count} samples, "
+            f"max loop lag {summary['event_loop_lag'].get('max_seconds', 0)}s"
+        )
+        return paths
+
+
+async def run_profiled(run, runner):
+    """Run a crew runner coroutine under a RunProfiler and attach the artifacts to the run."""
+    profiler = RunProfiler(run.run_id)
+    profiler.start()
+    try:
+        await runner(run)
+    finally:
+        try:
+            run.profile = await profiler.stop()
+        except Exception as e:
+            logger.error(f"[{run.run_id}] Failed to write profile: {e}")
@@ -0,0 +1,41 @@
+"""Per-agent inference profiles (context window, output length, temperature, call deadline, loop limits)."""
+
+from dataclasses import dataclass
+
+from backend.config import AGENT_PROFILES
+
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    num_ctx: int
+    max_tokens: int
+    temperature: float
+    deadline_s: float  # per LLM call, enforced by the Ollama transport (0 = none)
+    retries: int  # extra attempts when a call fails before its response starts
+    max_steps: int  # steps per task before the watchdog steps in — also CrewAI's max_iter (0 = none)
+    max_repeats: int  # identical actions (or tool results) allowed per task (0 = any)
+    token_budget: int  # completion tokens per run (0 = none)
+
+    def llm_kwargs(self) -> dict:
+        """Keyword arguments for crewai.LLM — num_ctx is passed through to Ollama."""
+        return {
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "num_ctx": self.num_ctx,
+        }
+
+    def agent_kwargs(self) -> dict:
+        """Keyword arguments for crewai.Agent — CrewAI forces a final answer at max_iter."""
+        return {"max_iter": self.max_steps} if self.max_steps else {}
+
+    @property
+    def input_budget(self) -> int:
+        """Tokens left for the prompt once the output has been reserved."""
+        return self.num_ctx - self.max_tokens
+
+
+PROFILES = {agent: InferenceProfile(**values) for agent, values in AGENT_PROFILES.items()}
+
+
+def profile_for(agent_key: str) -> InferenceProfile:
+    return PROFILES.get(agent_key, PROFILES["researcher"])
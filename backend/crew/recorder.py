@@ -0,0 +1,157 @@
+"""Run recorder — archives a real run so it can be inspected and replayed.
+
+Each recorded run produces state/archives/{run_id}.jsonl.gz, one JSON
+record per line:
+
+  {"kind": "header", "run_id", "topic", "started_at", "version"}
+  {"kind": "event",  "t", "event"}                      every bridge event
+  {"kind": "llm",    "t", "agent", "model", "url", "request", "response", "seconds", "ttft"}
+  {"kind": "tool",   "t", "tool", "input", "output", "seconds"}
+  {"kind": "footer", "t", "status", "report", "charts"}
+
+`t` is seconds since the run started. Events arrive through a bridge
+listener; LLM calls from the instrumented Ollama transport and tool calls
+from the tool wrappers, attributed to the run via current_run_id.
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.config import ARCHIVES_DIR, RECORD_RUNS
+
+logger = logging.getLogger("recorder")
+
+ARCHIVE_VERSION = 1
+
+
+class RunRecorder:
+    def __init__(self, run):
+        self.run_id = run.run_id
+        self.path = ARCHIVES_DIR / f"{run.run_id}.jsonl.gz"
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        ARCHIVES_DIR.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._write({
+            "kind": "header",
+            "version": ARCHIVE_VERSION,
+            "run_id": run.run_id,
+            "topic": run.topic,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def _write(self, record: dict):
+        record.setdefault("t", round(time.monotonic() - self._started, 4))
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+
+    def on_event(self, event):
+        self._write({"kind": "event", "t": round(event.at - self._started, 4), "event": event.to_wire()})
+
+    def llm_call(self, agent: str, model: str, url: str, request: dict | None, response: str,
+                 seconds: float, ttft: float | None):
+        self._write({
+            "kind": "llm", "agent": agent, "model": model, "url": url,
+            "request": request, "response": response,
+            "seconds": round(seconds, 4), "ttft": round(ttft, 4) if ttft is not None else None,
+        })
+
+    def tool_call(self, tool: str, input, output, seconds: float):
+        self._write({"kind": "tool", "tool": tool, "input": input, "output": output, "seconds": round(seconds, 4)})
+
+    def finish(self, run, report: str | None):
+        self._write({"kind": "footer", "status": run.status, "report": report, "charts": run.charts})
+        with self._lock:
+            self._file.close()
+            self._file = None
+        logger.info(f"[{self.run_id}] Archived run to {self.path}")
+
+
+_recorders: dict[str, RunRecorder] = {}
+
+
+def start_recording(run) -> RunRecorder | None:
+    if not RECORD_RUNS:
+        return None
+    try:
+        recorder = RunRecorder(run)
+    except OSError as e:
+        logger.error(f"[{run.run_id}] Cannot record run: {e}")
+        return None
+    _recorders[run.run_id] = recorder
+    run.bridge.add_listener(recorder.on_event)
+    return recorder
+
+
+def recorder_for(run_id: str | None) -> RunRecorder | None:
+    if run_id is None:
+        return None
+    return _recorders.get(run_id)
+
+
+def finish_recording(run, report: str | None = None):
+    recorder = _recorders.pop(run.run_id, None)
+    if recorder is None:
+        return None
+    run.bridge.remove_listener(recorder.on_event)
+    try:
+        recorder.finish(run, report)
+    except OSError as e:
+        logger.error(f"[{run.run_id}] Failed to finish archive: {e}")
+        return None
+    return recorder.path
+
+
+def archive_path(archive: str) -> Path:
+    """Resolve a recorded run id (or an archive file path) to the archive file."""
+    if "/" in archive or archive.endswith(".gz"):
+        return Path(archive)
+    return ARCHIVES_DIR / f"{archive}.jsonl.gz"
+
+
+def read_header(path) -> dict | None:
+    """The header record of an archive, or None if it is not one."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+    except (OSError, EOFError, ValueError):
+        return None
+    return header if header.get("kind") == "header" else None
+
+
+def list_archives() -> list[dict]:
+    archives = []
+    for path in sorted(ARCHIVES_DIR.glob("*.jsonl.gz"), key=lambda p: p.stat().st_mtime, reverse=True):
+        header = read_header(path)
+        if header is None:
+            continue
+        archives.append({
+            "run_id": header.get("run_id"),
+            "topic": header.get("topic"),
+            "started_at": header.get("started_at"),
+            "size_bytes": path.stat().st_size,
+        })
+    return archives
+
+
+def read_archive(path) -> list[dict]:
+    """All records of an archive, in order.
+
+    A run cut short by a crash leaves a truncated gzip stream and last line;
+    everything before the damage is returned.
+    """
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                records.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            logger.warning(f"Archive {path} is truncated after {len(records)} records")
+    return records
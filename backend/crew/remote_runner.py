@@ -0,0 +1,121 @@
+"""Run engine for EXECUTOR_MODE=workers — the API's side of a queued run.
+
+run_remote() enqueues the run in the job queue (jobs.py) and relays what
+the worker process that claims it reports: its bridge events are pushed
+into the local run's bridge, so WebSocket viewers, partial reports and
+coalesced duplicates work as for an in-process run, and its final fields
+(status, report, charts, exports, timings) are copied onto the local run.
+Cancelling the local run sets the job's cancel reason for the worker.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from backend.config import WORKER_POLL_MS, WORKER_TIMEOUT_S
+from backend.crew import cancellation
+from backend.crew.events import CrewError
+from backend.crew.jobs import job_queue
+from backend.crew.metrics import observe_run, timings_for
+
+logger = logging.getLogger("crew_remote")
+
+# Copied from the worker's CrewRun when the job is done
+_RESULT_FIELDS = ("status", "error", "report_path", "charts", "exports", "report_html", "profile")
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _apply_event(run, event: dict):
+    """Keep the run's fields in step with a relayed event, as the engines do."""
+    kind = event.get("type")
+    if kind == "report_partial":
+        run.partial_report = event.get("content")
+        run.partial_stage = event.get("stage")
+    elif kind == "crew_complete":
+        run.charts = list(event.get("charts") or [])
+        run.report_path = event.get("report_path")
+    elif kind == "error":
+        run.error = event.get("message")
+
+
+def _apply_result(run, result: dict):
+    for name in _RESULT_FIELDS:
+        if name in result:
+            setattr(run, name, result[name])
+    run.started_at = _parse_time(result.get("started_at")) or run.started_at
+    run.completed_at = _parse_time(result.get("completed_at")) or datetime.now(timezone.utc)
+    timings = timings_for(run.run_id)
+    if timings and result.get("timings"):
+        timings.load(result["timings"])
+
+
+def _fail(run, message: str):
+    run.status = "error"
+    run.error = message
+    run.completed_at = datetime.now(timezone.utc)
+    run.bridge.push_event(CrewError(agent="system", message=message))
+
+
+async def run_remote(run, mock: bool, profile: bool):
+    """Queue `run` for a worker process and mirror it until the worker is done."""
+    queue = job_queue()
+    bridge = run.bridge
+    last_event = 0
+    claimed = False
+
+    try:
+        await asyncio.to_thread(queue.enqueue, run.run_id, run.topic, {"mock": mock, "profile": profile})
+        scope = cancellation.scope_for(run.run_id)
+        scope.on_cancel(lambda: queue.request_cancel(run.run_id, scope.reason))
+
+        while True:
+            events = await asyncio.to_thread(queue.events_since, run.run_id, last_event)
+            for last_event, event in events:
+                _apply_event(run, event)
+                bridge.push_event(event)
+
+            job = await asyncio.to_thread(queue.job, run.run_id)
+            if job["status"] == "done":
+                # Events are written before the result — one last read catches the tail
+                for last_event, event in await asyncio.to_thread(queue.events_since, run.run_id, last_event):
+                    _apply_event(run, event)
+                    bridge.push_event(event)
+                _apply_result(run, job["result"] or {})
+                break
+
+            if job["status"] == "running":
+                if not claimed:
+                    claimed = True
+                    logger.info(f"[{run.run_id}] Claimed by worker {job['worker']}")
+                    if run.status == "pending":
+                        run.status = "running"
+                    run.started_at = datetime.fromtimestamp(job["started_at"], timezone.utc)
+                if time.time() - job["heartbeat_at"] > WORKER_TIMEOUT_S:
+                    logger.error(f"[{run.run_id}] Worker {job['worker']} stopped heartbeating")
+                    await asyncio.to_thread(queue.fail, run.run_id, "worker lost")
+                    _fail(run, f"Worker {job['worker']} stopped responding")
+                    break
+            elif run.status == "cancelling":
+                # Not claimed yet — take it off the queue (a worker that got there
+                # first sees the cancel reason instead)
+                if await asyncio.to_thread(queue.withdraw, run.run_id, {"status": "cancelled"}):
+                    cancellation.mark_cancelled(run)
+                    break
+
+            await asyncio.sleep(WORKER_POLL_MS / 1000)
+
+    except Exception as e:
+        logger.error(f"[{run.run_id}] Job queue failed: {e}")
+        _fail(run, f"Job queue failed: {e}")
+
+    finally:
+        observe_run(run.status, run.elapsed_seconds)
+        bridge.mark_complete()
+        try:
+            await asyncio.to_thread(queue.forget_events, run.run_id)
+        except Exception as e:
+            logger.warning(f"[{run.run_id}] Could not drop relayed events: {e}")
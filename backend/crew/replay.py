@@ -0,0 +1,101 @@
+"""Replay engine — streams a recorded run back through a fresh CrewEventBridge.
+
+The archive's events are pushed at their recorded offsets divided by
+`speed` (1.0 = real time, 10.0 = ten times faster), or back to back when
+speed is 0 ("max"). Viewers, the partial report and the final report
+behave as they did in the original run, without any models: charts are
+re-rendered from the recorded ChartTool inputs when missing, and the final
+report is written from the archive's footer.
+
+Replays at max speed are a realistic high-volume workload for profiling
+the streaming path; 1x replays make GPU-free demos.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from backend.config import OUTPUT_DIR, REPORTS_DIR
+from backend.crew import cancellation
+from backend.crew.events import CrewError
+from backend.crew.files import write_atomic
+from backend.crew.metrics import observe_run
+from backend.crew.recorder import archive_path, read_archive
+from backend.crew.report_export import export_report
+
+logger = logging.getLogger("crew_replay")
+
+# Set by the bridge on push; replayed events get fresh ones
+_REPLACED_FIELDS = ("timestamp", "run_id")
+
+
+def _restore_charts(tool_records: list[dict]):
+    """Re-render recorded charts whose files are no longer on disk."""
+    from backend.tools.chart_tool import generate_chart
+
+    for record in tool_records:
+        if record.get("tool") != "ChartTool" or not record.get("output"):
+            continue
+        if (OUTPUT_DIR / record["output"]).exists():
+            continue
+        try:
+            generate_chart(**record["input"])
+        except Exception as e:
+            logger.warning(f"Could not re-render {record['output']}: {e}")
+
+
+async def replay_run(run, archive: str, speed: float = 1.0):
+    """Replay a recorded run into `run` (a fresh CrewRun) at the given speed."""
+    run.status = "running"
+    run.started_at = datetime.now(timezone.utc)
+    bridge = run.bridge
+
+    try:
+        path = archive_path(archive)
+        records = await asyncio.to_thread(read_archive, path)
+        if not records or records[0].get("kind") != "header":
+            raise ValueError(f"{path.name} is not a run archive")
+        events = [r for r in records if r["kind"] == "event"]
+        footer = next((r for r in reversed(records) if r["kind"] == "footer"), {})
+        await asyncio.to_thread(_restore_charts, [r for r in records if r["kind"] == "tool"])
+        logger.info(f"[{run.run_id}] Replaying {records[0]['run_id']} ({len(events)} events) at "
+                    f"{'max speed' if speed <= 0 else f'{speed:g}x'}")
+
+        start = time.monotonic()
+        for record in events:
+            # Let consumers run between events, as they would against a live run
+            delay = start + record["t"] / speed - time.monotonic() if speed > 0 else 0
+            await cancellation.sleep(run.run_id, delay)
+
+            event = {k: v for k, v in record["event"].items() if k not in _REPLACED_FIELDS}
+            kind = event.get("type")
+            if kind == "report_partial":
+                run.partial_report = event.get("content")
+                run.partial_stage = event.get("stage")
+            elif kind == "crew_complete":
+                run.charts = list(event.get("charts") or footer.get("charts") or [])
+                if footer.get("report"):
+                    report_file = REPORTS_DIR / f"{run.run_id}.md"
+                    await asyncio.to_thread(write_atomic, report_file, footer["report"])
+                    run.report_path = f"/output/reports/{report_file.name}"
+                    await asyncio.to_thread(export_report, run, footer["report"])
+                event["report_path"] = run.report_path
+            elif kind == "error":
+                run.error = event.get("message")
+            bridge.push_event(event)
+
+        run.completed_at = datetime.now(timezone.utc)
+        run.status = footer.get("status") or ("error" if run.error else "completed")
+
+    except cancellation.RunCancelled:
+        cancellation.mark_cancelled(run)
+
+    except Exception as e:
+        run.status = "error"
+        run.error = str(e)
+        bridge.push_event(CrewError(agent="system", message=f"Replay failed: {e}"))
+
+    finally:
+        observe_run(run.status, run.elapsed_seconds)
+        bridge.mark_complete()
@@ -0,0 +1,91 @@
+"""Incremental report assembly — publishes a partial report as each task completes.
+
+The final report only exists once crew.kickoff returns, minutes after the
+first useful output. The assembler renders what is known so far (research
+sections first, then charts, then the final prose) and publishes it as a
+report_partial event and on the run, so viewers see a report from the
+first task completion onward.
+"""
+
+import logging
+from pathlib import Path
+
+from backend.crew.events import ReportPartial
+
+logger = logging.getLogger("report_assembler")
+
+STAGE_LABELS = {
+    "research": "research findings",
+    "charts": "research findings and charts",
+    "final": "final report",
+}
+
+
+def _chart_title(path: str) -> str:
+    return Path(path).stem.replace("_", " ").title()
+
+
+class ReportAssembler:
+    """Collects section content for one run and renders the partial report."""
+
+    def __init__(self, run, charts_dir: Path | None = None):
+        self.run = run
+        self.charts_dir = charts_dir
+        # Charts on disk before the run started are not ours
+        self._existing = {f.name for f in charts_dir.glob("*.png")} if charts_dir else set()
+        self.research: str | None = None
+        self.charts: dict[str, str] = {}  # path -> title
+
+    def add_research(self, text: str):
+        self.research = (text or "").strip() or None
+        self.publish("research")
+
+    def add_charts(self, paths: list[str] | None = None):
+        """Record charts — explicit paths, or (as a fallback) new files in the charts directory.
+
+        The directory is shared with concurrent runs, so the fallback is only
+        for runs whose charts were not attributed to them by the tools.
+        """
+        if paths is None and self.charts_dir:
+            paths = [
+                f"/output/charts/{f.name}"
+                for f in sorted(self.charts_dir.glob("*.png"))
+                if f.name not in self._existing
+            ]
+        for path in paths or []:
+            self.charts.setdefault(path, _chart_title(path))
+        self.publish("charts")
+
+    def on_task_complete(self, agent_key: str, task_output, chart_paths: list[str] | None = None):
+        """Hook for the crew's task callback."""
+        if agent_key == "researcher":
+            self.add_research(task_output.raw)
+        elif agent_key == "visualizer":
+            # Charts rendered by this run's ChartTool calls, in order
+            self.add_charts(chart_paths or list(dict.fromkeys(self.run.rendered_charts)) or None)
+
+    def render(self, stage: str) -> str:
+        lines = [
+            f"# {self.run.topic}",
+            "",
+            f"> Partial report — {STAGE_LABELS.get(stage, stage)} so far. "
+            "The full report replaces this when the run completes.",
+            "",
+        ]
+        if self.research:
+            lines += ["## Research Findings", "", self.research, ""]
+        if self.charts:
+            lines += ["## Data Visualizations", ""]
+            for path, title in self.charts.items():
+                lines += [f"![{title}]({path})", ""]
+        return "\n".join(lines).strip() + "\n"
+
+    def publish(self, stage: str, content: str | None = None):
+        """Store the partial report on the run and push a report_partial event."""
+        content = content if content is not None else self.render(stage)
+        self.run.partial_report = content
+        self.run.partial_stage = stage
+        self.run.bridge.push_event(ReportPartial(stage=stage, content=content))
+
+    def publish_final(self, content: str):
+        self.publish("final", content)
@@ -0,0 +1,142 @@
+"""Report export — server-side HTML rendering and single-file packaging.
+
+When a run's final report is written, export_report() renders it once:
+
+  reports/{run_id}.html   standalone HTML document, charts inlined as base64
+  reports/{run_id}.zip    report.md + report.html + charts/*.png (relative links)
+
+and keeps the rendered fragment on the run for /api/crew/report, so a
+report view is one cached response instead of markdown plus a fetch per
+chart. Both files are per-run, so /output serves them as immutable.
+"""
+
+import base64
+import io
+import logging
+import mimetypes
+import re
+import zipfile
+from html import escape
+from pathlib import Path
+
+from backend.config import OUTPUT_DIR, REPORTS_DIR
+from backend.crew.files import write_atomic
+
+logger = logging.getLogger("report_export")
+
+_IMG_SRC = re.compile(r'(<img src=")([^"]+)(")')
+_MD_IMAGE = re.compile(r"(!\[[^\]]*\]\()([^)\s]+)(\))")
+_HEADING = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; line-height: 1.6;
+       color: #1f2328; max-width: 920px; margin: 2rem auto; padding: 0 1.5rem; }
+h1, h2, h3 { line-height: 1.25; margin-top: 1.75em; }
+h1 { border-bottom: 1px solid #d1d9e0; padding-bottom: .3em; }
+img { max-width: 100%; border-radius: 6px; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #d1d9e0; padding: .4em .8em; }
+code { background: #f6f8fa; padding: .1em .3em; border-radius: 4px; }
+blockquote { color: #59636e; border-left: .25em solid #d1d9e0; margin: 0; padding: 0 1em; }
+"""
+
+_markdown = None
+
+
+def _renderer():
+    # Imported on first use — keeps markdown-it off the API server's startup path
+    global _markdown
+    if _markdown is None:
+        from markdown_it import MarkdownIt
+
+        # No raw HTML from the LLM in exported documents
+        _markdown = MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+    return _markdown
+
+
+def _chart_file(src: str) -> Path | None:
+    """The file under OUTPUT_DIR an image reference points at, as the UI resolves it."""
+    if src.startswith(("http://", "https://", "data:")):
+        return None
+    rel = src.removeprefix("./").removeprefix("/output/").lstrip("/")
+    path = (OUTPUT_DIR / rel).resolve()
+    if not path.is_relative_to(OUTPUT_DIR.resolve()) or not path.is_file():
+        return None
+    return path
+
+
+def _data_uri(path: Path) -> str:
+    media_type = mimetypes.guess_type(path.name)[0] or "image/png"
+    return f"data:{media_type};base64," + base64.b64encode(path.read_bytes()).decode("ascii")
+
+
+def render_html(markdown: str, inline_charts: bool = True) -> str:
+    """Render report markdown to an HTML fragment.
+
+    Charts are inlined as data URIs; references to missing files are kept
+    as /output/... URLs like the UI's renderer does.
+    """
+    def _src(match):
+        src = match.group(2)
+        path = _chart_file(src)
+        if path is not None and inline_charts:
+            src = _data_uri(path)
+        elif not src.startswith(("http://", "https://", "data:", "/output/")):
+            src = "/output/" + src.removeprefix("./")
+        return match.group(1) + src + match.group(3)
+
+    return _IMG_SRC.sub(_src, _renderer().render(markdown))
+
+
+def render_document(title: str, body_html: str) -> str:
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        f"<title>{escape(title)}</title>\n<style>{STYLE}</style>\n</head>\n"
+        f"<body>\n<article>\n{body_html}</article>\n</body>\n</html>\n"
+    )
+
+
+def _bundle(markdown: str, title: str) -> bytes:
+    """Zip of the report with its charts, linked relatively under charts/."""
+    charts: dict[str, Path] = {}
+
+    def _relink(match):
+        path = _chart_file(match.group(2))
+        if path is None:
+            return match.group(0)
+        charts[path.name] = path
+        return f"{match.group(1)}charts/{path.name}{match.group(3)}"
+
+    bundled_md = _MD_IMAGE.sub(_relink, markdown)
+    # Not render_html — links stay relative to the bundle, not /output/
+    bundled_html = _renderer().render(bundled_md)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("report.md", bundled_md)
+        zf.writestr("report.html", render_document(title, bundled_html))
+        for name, path in charts.items():
+            # PNGs are already compressed
+            zf.write(path, f"charts/{name}", compress_type=zipfile.ZIP_STORED)
+    return buffer.getvalue()
+
+
+def export_report(run, markdown: str):
+    """Render and package a run's final report. Blocking — call via asyncio.to_thread."""
+    match = _HEADING.search(markdown)
+    title = match.group(1).strip() if match else run.topic
+    try:
+        fragment = render_html(markdown)
+        html_file = REPORTS_DIR / f"{run.run_id}.html"
+        write_atomic(html_file, render_document(title, fragment))
+        zip_file = REPORTS_DIR / f"{run.run_id}.zip"
+        write_atomic(zip_file, _bundle(markdown, title))
+    except Exception as e:
+        logger.error(f"[{run.run_id}] Report export failed: {e}")
+        return
+    run.report_html = fragment
+    run.exports = {
+        "html": f"/output/reports/{html_file.name}",
+        "zip": f"/output/reports/{zip_file.name}",
+    }
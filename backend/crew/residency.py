@@ -0,0 +1,188 @@
+"""Keeps every routed model resident in VRAM while runs are active."""
+
+import logging
+import threading
+import time
+
+import httpx
+
+from backend.config import MODEL_KEEP_ALIVE, MODEL_IDLE_KEEP_ALIVE, HEDGE_BASE_URL
+from backend.crew.metrics import REGISTRY
+from backend.crew.routing import ROUTES, resident_targets
+
+logger = logging.getLogger("residency")
+
+
+def ollama_model_name(model: str) -> str:
+    """Strip the LiteLLM provider prefix: "ollama/gemma3:27b" -> "gemma3:27b"."""
+    name = model.split("/")[-1]
+    # /api/ps always reports a tag
+    return name if ":" in name else f"{name}:latest"
+
+
+class ModelResidencyManager:
+    """Pins models with an explicit keep_alive while runs are queued or active.
+
+    Ollama unloads a model after its idle timeout, so the first run after a
+    lull pays a full cold load. We refresh keep_alive to MODEL_KEEP_ALIVE when
+    the first run starts and drop it back to MODEL_IDLE_KEEP_ALIVE when the
+    last one finishes. Load state comes from /api/ps.
+
+    Pinning and releasing run in background threads, one at a time
+    (_pin_lock), and each rechecks the active run count before touching
+    keep_alive — a release that lost the race to a new run does nothing.
+    Counts are per process: with several API or worker processes, each
+    pins and releases for its own runs.
+    """
+
+    def __init__(self, targets: dict[str, list[tuple[str, str]]]):
+        self._targets = targets  # vm -> [(model, base_url), ...]
+        self._lock = threading.Lock()
+        self._pin_lock = threading.Lock()  # serializes _pin and release_all
+        self._active_runs = 0
+        self.cold_starts = 0
+        self.cold_starts_by_model: dict[str, int] = {}
+        self.last_load_ms: dict[str, int] = {}
+
+    def loaded_models(self, base_url: str) -> set[str] | None:
+        """Names of models currently in VRAM, or None if Ollama is unreachable."""
+        try:
+            with httpx.Client(timeout=5.0) as client:
+                resp = client.get(f"{base_url}/api/ps")
+                resp.raise_for_status()
+                return {m.get("model") or m["name"] for m in resp.json().get("models", [])}
+        except Exception as e:
+            logger.warning(f"/api/ps failed for {base_url}: {e}")
+            return None
+
+    def is_loaded(self, model: str, base_url: str) -> bool | None:
+        loaded = self.loaded_models(base_url)
+        if loaded is None:
+            return None
+        return ollama_model_name(model) in loaded
+
+    def load(self, model: str, base_url: str, keep_alive: str = MODEL_KEEP_ALIVE) -> int:
+        """Load (or refresh) a model with the given keep_alive.
+
+        Returns the request time in ms, or -1 on failure. A request made while
+        the model was not resident is recorded as a cold start.
+        """
+        name = ollama_model_name(model)
+        cold = self.is_loaded(model, base_url) is False
+        start = time.monotonic()
+        if not self._keep_alive(name, base_url, keep_alive):
+            return -1
+
+        elapsed_ms = int((time.monotonic() - start) * 1000)
+        with self._lock:
+            self.last_load_ms[name] = elapsed_ms
+            if cold:
+                self.cold_starts += 1
+                self.cold_starts_by_model[name] = self.cold_starts_by_model.get(name, 0) + 1
+        if cold:
+            logger.info(f"Cold start: {name} loaded in {elapsed_ms}ms")
+        return elapsed_ms
+
+    def _keep_alive(self, name: str, base_url: str, keep_alive: str) -> bool:
+        try:
+            # An empty prompt loads the model without generating anything
+            with httpx.Client(timeout=300.0) as client:
+                resp = client.post(
+                    f"{base_url}/api/generate",
+                    json={"model": name, "keep_alive": keep_alive, "stream": False},
+                )
+                resp.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to set keep_alive={keep_alive} for {name} on {base_url}: {e}")
+            return False
+
+    def warm_all(self, keep_alive: str = MODEL_KEEP_ALIVE) -> dict[str, int]:
+        """Load every configured model. Returns the slowest load per VM in ms (-1 if one failed)."""
+        loads = {}
+        for vm, models in self._targets.items():
+            times = [self.load(model, url, keep_alive) for model, url in models]
+            loads[vm] = -1 if -1 in times else max(times)
+        return loads
+
+    def release_all(self):
+        """Drop resident models back to the idle keep_alive (never loads anything).
+
+        Stops as soon as a run is active again — that run's pin takes over.
+        """
+        with self._pin_lock:
+            for models in self._targets.values():
+                for model, url in models:
+                    with self._lock:
+                        if self._active_runs:
+                            return
+                    if self.is_loaded(model, url):
+                        self._keep_alive(ollama_model_name(model), url, MODEL_IDLE_KEEP_ALIVE)
+
+    def _pin(self):
+        with self._pin_lock:
+            with self._lock:
+                if not self._active_runs:
+                    return  # the run already finished
+            self.warm_all()
+
+    def prewarm(self, model: str, url: str):
+        """Load a model in the background if it is not already resident.
+
+        Called one stage ahead of a hand-off so the next agent's model is hot
+        by the time the manager delegates to it.
+        """
+        def _prewarm():
+            if self.is_loaded(model, url) is False:
+                self.load(model, url)
+
+        threading.Thread(target=_prewarm, daemon=True, name=f"prewarm-{ollama_model_name(model)}").start()
+
+    def run_started(self):
+        """Pin all models while at least one run is queued or active."""
+        with self._lock:
+            self._active_runs += 1
+            first = self._active_runs == 1
+        if first:
+            threading.Thread(target=self._pin, daemon=True, name="residency-pin").start()
+
+    def run_finished(self):
+        """Release the pin once the last run finishes."""
+        with self._lock:
+            self._active_runs = max(0, self._active_runs - 1)
+            idle = self._active_runs == 0
+        if idle:
+            threading.Thread(target=self.release_all, daemon=True, name="residency-release").start()
+
+    @property
+    def active_runs(self) -> int:
+        return self._active_runs
+
+    def stats(self) -> dict:
+        return {
+            "active_runs": self._active_runs,
+            "keep_alive": MODEL_KEEP_ALIVE if self._active_runs else MODEL_IDLE_KEEP_ALIVE,
+            "cold_starts": self.cold_starts,
+            "cold_starts_by_model": dict(self.cold_starts_by_model),
+            "last_load_ms": dict(self.last_load_ms),
+        }
+
+    def prometheus_lines(self) -> list[str]:
+        lines = [
+            "# HELP ollama_cold_starts_total Model loads that found the model absent from VRAM",
+            "# TYPE ollama_cold_starts_total counter",
+        ]
+        for model, count in self.cold_starts_by_model.items():
+            lines.append(f'ollama_cold_starts_total{{model="{model}"}} {count}')
+        return lines
+
+
+# Module-level singleton
+residency = ModelResidencyManager({
+    **resident_targets(),
+    # A hedge is only faster if its models are already resident
+    **({"hedge": list(dict.fromkeys(
+        (route.model, HEDGE_BASE_URL) for agent, route in ROUTES.items() if agent != "manager"
+    ))} if HEDGE_BASE_URL else {}),
+})
+REGISTRY.register_collector(residency.prometheus_lines)
@@ -0,0 +1,49 @@
+"""Per-agent model routing — which model, on which Ollama, serves each agent.
+
+Routes come from MODEL_ROUTES in config. Everything that names a model —
+the agents' LLMs, agent_start events, metrics labels, residency pinning —
+reads it from here, so what the dashboard shows is what actually ran.
+"""
+
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from backend.config import MANAGER_BASE_URL, MODEL_ROUTES, SPECIALIST_BASE_URL
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    model: str  # LiteLLM model name, e.g. "ollama/qwen2.5:3b"
+    base_url: str
+
+    @property
+    def label(self) -> str:
+        """The model as events and metrics show it: "qwen2.5:3b"."""
+        return self.model.split("/")[-1]
+
+    @property
+    def vm(self) -> str:
+        """The machine serving the route, as the dashboard names it."""
+        url = self.base_url.rstrip("/")
+        if url == MANAGER_BASE_URL.rstrip("/"):
+            return "orchestrator"
+        if url == SPECIALIST_BASE_URL.rstrip("/"):
+            return "specialist"
+        return urlparse(url).hostname or url
+
+
+ROUTES = {agent: ModelRoute(**route) for agent, route in MODEL_ROUTES.items()}
+
+
+def route_for(agent_key: str) -> ModelRoute:
+    return ROUTES.get(agent_key, ROUTES["researcher"])
+
+
+def resident_targets() -> dict[str, list[tuple[str, str]]]:
+    """Every routed (model, base_url), grouped by VM, without duplicates."""
+    targets: dict[str, list[tuple[str, str]]] = {}
+    for route in ROUTES.values():
+        pair = (route.model, route.base_url)
+        if pair not in targets.setdefault(route.vm, []):
+            targets[route.vm].append(pair)
+    return targets
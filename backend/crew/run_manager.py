@@ -1,9 +1,16 @@
-"""Tracks active and completed crew runs."""
+"""Tracks active and completed crew runs.
+
+Identical requests are coalesced: while a run is pending or running, a
+new request with the same normalized topic and options gets its own run
+id aliased to that run — same bridge, same report and charts — so one
+GPU pipeline serves every duplicate.
+"""
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
 
+from backend.crew import cancellation
 from backend.crew.callbacks import CrewEventBridge
 
 
@@ -11,13 +18,26 @@ from backend.crew.callbacks import CrewEventBridge
 class CrewRun:
     run_id: str
     topic: str
-    status: str = "pending"  # pending | running | completed | error
+    status: str = "pending"  # pending | running | cancelling | completed | cancelled | error
     bridge: CrewEventBridge = field(default=None)
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     report_path: Optional[str] = None
     charts: list[str] = field(default_factory=list)
     error: Optional[str] = None
+    partial_report: Optional[str] = None
+    partial_stage: Optional[str] = None  # research | charts | final
+    profile: Optional[dict] = None  # profiler artifact paths, for profiled runs
+    report_html: Optional[str] = None  # final report rendered to HTML, charts inlined
+    exports: Optional[dict] = None  # standalone html / zip bundle paths
+    timings: Optional[dict] = None  # per-agent, LLM and tool timings, summarized when the run ends
+    # Written by this run's tools (attributed via current_run_id), so
+    # concurrent runs sharing the output directory don't claim each other's files
+    rendered_charts: list[str] = field(default_factory=list)
+    saved_files: list[str] = field(default_factory=list)
+    aliases: list[str] = field(default_factory=list)  # coalesced duplicate run ids
+    viewers: int = 0  # open WebSocket streams
+    cancel_requests: set[str] = field(default_factory=set)  # run ids (own or aliases) that asked to cancel
 
     def __post_init__(self):
         if self.bridge is None:
@@ -31,19 +51,58 @@ class CrewRun:
         return round((end - self.started_at).total_seconds(), 1)
 
 
+IN_FLIGHT = ("pending", "running")
+
+
+def coalesce_key(topic: str, **options) -> tuple:
+    """Requests with equal keys would run identical crews."""
+    return (" ".join(topic.split()).casefold(), tuple(sorted(options.items())))
+
+
 class RunManager:
     """Singleton-ish manager for crew runs."""
 
     def __init__(self):
         self._runs: dict[str, CrewRun] = {}
+        self._aliases: dict[str, str] = {}  # alias run id -> run id
+        self._in_flight: dict[tuple, str] = {}  # coalesce key -> run id
 
-    def create_run(self, run_id: str, topic: str) -> CrewRun:
+    def create_run(self, run_id: str, topic: str, key: tuple | None = None) -> CrewRun:
+        """Create a run; with a coalesce `key`, later duplicates can join it."""
         run = CrewRun(run_id=run_id, topic=topic)
         self._runs[run_id] = run
+        if key is not None:
+            self._in_flight[key] = run_id
+        return run
+
+    def find_in_flight(self, key: tuple) -> Optional[CrewRun]:
+        """The pending or running run for `key`, if any."""
+        run_id = self._in_flight.get(key)
+        if run_id is None:
+            return None
+        run = self._runs.get(run_id)
+        if run is None or run.status not in IN_FLIGHT:
+            del self._in_flight[key]
+            return None
         return run
 
+    def alias_run(self, alias_id: str, run: CrewRun):
+        """Make `alias_id` resolve to `run`."""
+        self._aliases[alias_id] = run.run_id
+        run.aliases.append(alias_id)
+
+    def cancel_run(self, run: CrewRun, reason: str) -> bool:
+        """Stop an in-flight run; the engine records it as cancelled."""
+        if run.status not in IN_FLIGHT:
+            return False
+        run.status = "cancelling"  # no longer joinable by coalescing
+        return cancellation.open_scope(run.run_id).cancel(reason)
+
     def get_run(self, run_id: str) -> Optional[CrewRun]:
-        return self._runs.get(run_id)
+        run = self._runs.get(run_id)
+        if run is None and run_id in self._aliases:
+            run = self._runs.get(self._aliases[run_id])
+        return run
 
     def list_runs(self) -> list[dict]:
         return [
@@ -52,6 +111,7 @@ class RunManager:
                 "topic": r.topic,
                 "status": r.status,
                 "elapsed_seconds": r.elapsed_seconds,
+                "aliases": r.aliases,
             }
             for r in self._runs.values()
         ]
@@ -0,0 +1,205 @@
+"""Crew run engine — shared by the REST API and the batch CLI.
+
+execute_run() drives one CrewRun to completion through the real crew, the
+mock runner or a replay of a recorded run, optionally under the sampling
+profiler, or hands it to a worker process (remote_runner.py). Callers only
+create the run and decide whether to await it (CLI) or schedule it as a
+task (API).
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from backend.config import CHARTS_DIR, MOCK_MODE, OUTPUT_DIR, PROFILE_RUNS, REPORTS_DIR
+from backend.crew import cancellation
+from backend.crew.context import current_run_id
+from backend.crew.events import AgentStart, ChartCreated, CrewComplete, CrewError
+from backend.crew.files import write_atomic
+from backend.crew.metrics import finish_timings, observe_run, start_timings
+from backend.crew.profiler import run_profiled
+from backend.crew.recorder import start_recording, finish_recording
+from backend.crew.report_assembler import ReportAssembler
+from backend.crew.report_export import export_report
+from backend.crew.residency import residency
+from backend.crew.routing import route_for
+from backend.crew.sanitizer import clean_report
+from backend.crew.tracing import start_trace, finish_trace
+from backend.crew.watchdog import close_watchdog, open_watchdog
+
+logger = logging.getLogger("crew_runner")
+
+
+async def execute_run(run, mock: bool = MOCK_MODE, profile: bool = False,
+                      replay: str | None = None, speed: float = 1.0, remote: bool = False):
+    """Run a crew run to completion with the mock or real engine.
+
+    With `replay` (a recorded run id or archive path) the run instead
+    replays that archive at `speed` (0 = as fast as possible). The run
+    can be cancelled through its cancellation scope while this runs.
+    With `remote` it is queued for a worker process, which profiles it
+    there if asked to.
+    """
+    if remote:
+        from backend.crew.remote_runner import run_remote
+
+        async def runner(run):
+            await run_remote(run, mock, profile)
+    elif replay:
+        from backend.crew.replay import replay_run
+
+        async def runner(run):
+            await replay_run(run, replay, speed)
+    elif mock:
+        # Imported on first use — it pulls in matplotlib via the chart tool
+        from backend.crew.mock_runner import run_mock_crew
+        runner = run_mock_crew
+    else:
+        # Pin models in VRAM from the moment the run is queued
+        residency.run_started()
+        runner = run_real_crew
+
+    cancellation.open_scope(run.run_id)
+    start_timings(run.run_id)
+    try:
+        if (profile or PROFILE_RUNS) and not remote:
+            await run_profiled(run, runner)
+        else:
+            await runner(run)
+    finally:
+        cancellation.close_scope(run.run_id)
+        run.timings = finish_timings(run.run_id)
+
+
+async def run_real_crew(run):
+    """Execute a real CrewAI crew run with Ollama models."""
+    from backend.crew.crew import build_crew
+
+    run.status = "running"
+    run.started_at = datetime.now(timezone.utc)
+    bridge = run.bridge
+    # Copied into the crew thread by asyncio.to_thread — attributes tool
+    # timings, and the charts and files the tools write, to this run
+    current_run_id.set(run.run_id)
+    # Root span for the run — task, step, LLM and tool spans hang off it
+    start_trace(run.run_id, run.topic)
+    # Archive events, LLM calls and tool I/O for replay
+    start_recording(run)
+    # Step, repeat and token limits per agent — see watchdog.py
+    dog = open_watchdog(run.run_id, bridge)
+
+    manager_route = route_for("manager")
+    bridge.push_event(AgentStart(
+        agent="manager",
+        role="Senior Research Director",
+        model=manager_route.label,
+        vm=manager_route.vm,
+        task_summary=f"Orchestrating research on: {run.topic}",
+    ))
+
+    # Snapshot existing charts BEFORE the run — fallback attribution if the
+    # tools could not record this run's charts
+    existing_charts = set(f.name for f in CHARTS_DIR.glob("*.png"))
+
+    assembler = ReportAssembler(run, charts_dir=CHARTS_DIR)
+    report_content = None
+
+    try:
+        crew = build_crew(
+            topic=run.topic,
+            bridge=bridge,
+            report=assembler,
+        )
+
+        # CrewAI runs synchronously — must run in a thread. Cancelling
+        # stops it at the next step/task checkpoint or LLM request
+        cancellation.check(run.run_id)
+        result = await asyncio.to_thread(crew.kickoff)
+
+        run.completed_at = datetime.now(timezone.utc)
+        elapsed = run.elapsed_seconds or 0
+
+        # Charts rendered by this run's tools; other runs may be writing
+        # to the same charts directory concurrently
+        run.charts = list(dict.fromkeys(run.rendered_charts)) or [
+            f"/output/charts/{f.name}"
+            for f in CHARTS_DIR.glob("*.png")
+            if f.name not in existing_charts
+        ]
+
+        # Extract the best report content from multiple sources.
+        # The writer LLM often botches the FileTool call (e.g., saving
+        # the filename as content), so we check multiple sources and
+        # pick the longest/best one.
+        candidates = []
+
+        # Source 1: Files saved by this run's FileTool (if they look like real content)
+        for saved in run.saved_files:
+            saved_file = OUTPUT_DIR / saved
+            if saved_file.exists():
+                file_content = saved_file.read_text(encoding="utf-8").strip()
+                if len(file_content) > 200:
+                    candidates.append(file_content)
+
+        # Source 2: Crew result
+        raw_result = str(result).strip()
+        if len(raw_result) > 200:
+            candidates.append(raw_result)
+
+        # Source 3: Longest writer agent_output from the event stream (kept by the bridge)
+        longest = bridge.longest_output("writer")
+        if longest and len(longest) > 200:
+            candidates.append(longest)
+
+        # Pick the longest candidate — that's almost certainly the real report
+        if candidates:
+            best = max(candidates, key=len)
+            report_content = clean_report(best, chart_files=run.charts)
+            report_file = REPORTS_DIR / f"{run.run_id}.md"
+            write_atomic(report_file, report_content)
+            run.report_path = f"/output/reports/{report_file.name}"
+            await asyncio.to_thread(export_report, run, report_content)
+            assembler.publish_final(report_content)
+        else:
+            logger.warning("No report content found from any source")
+
+        # Emit chart_created events for each new chart (the direct chart
+        # stage has already announced the ones it rendered)
+        announced = {e.path for e in bridge.events_of("chart_created")}
+        for chart_path in run.charts:
+            if chart_path in announced:
+                continue
+            bridge.push_event(ChartCreated(
+                agent="visualizer",
+                chart_title=chart_path.split("/")[-1].replace(".png", "").replace("_", " ").title(),
+                path=chart_path,
+            ))
+
+        bridge.push_event(CrewComplete(
+            total_seconds=round(elapsed, 1),
+            report_path=run.report_path,
+            charts=run.charts,
+        ))
+        run.status = "completed"
+
+    except Exception as e:
+        # A run failed by the watchdog is cancelled to stop it, but it is an error
+        if dog and dog.tripped:
+            run.status = "error"
+            run.error = f"Stopped by the watchdog: {dog.tripped}"
+            bridge.push_event(CrewError(agent="system", message=run.error, watchdog=True))
+        # Aborted requests surface as connection errors from LiteLLM, not RunCancelled
+        elif cancellation.is_cancelled(run.run_id):
+            cancellation.mark_cancelled(run)
+        else:
+            run.status = "error"
+            run.error = str(e)
+            bridge.push_event(CrewError(agent="system", message=f"Crew execution failed: {e}"))
+
+    finally:
+        observe_run(run.status, run.elapsed_seconds)
+        finish_trace(run.run_id, run.status)
+        finish_recording(run, report_content)
+        close_watchdog(run.run_id)
+        residency.run_finished()
+        bridge.mark_complete()
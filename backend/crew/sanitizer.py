@@ -0,0 +1,181 @@
+"""LLM output sanitizer — cleans agent output for the UI and the final report.
+
+clean_content() runs on every step callback, so it has to stay linear on
+whatever a model produces: wrappers (ToolResult(...), AgentFinish(...),
+"### Assistant:") are peeled with plain string scans in one pass over the
+stages, and the only regexes are precompiled and anchored or bounded —
+nothing that can backtrack across the whole text.
+
+fix_chart_refs() points the writer's image references at the charts that
+actually exist. References resolve through a ChartIndex built once per
+report: exact stem, then a stem contained in the reference or containing
+it — the original lookup, without pathlib's cost per reference.
+"""
+
+import re
+
+STREAM_LIMIT = 1500  # characters of an agent_output shown in the live stream
+
+_ASSISTANT_PREFIX = re.compile(r"###?\s*Assistant:\s*", re.IGNORECASE)
+_WORD = re.compile(r"\w+")
+# Bounded, and stopping at brackets, so a run of "![" or "![a](" with
+# nothing closing it can't go quadratic
+_MD_IMAGE = re.compile(r"!\[([^\[\]\n]{0,500})\]\(([^()\[\]\n]{1,1000})\)")
+_EXTENSION = re.compile(r"\.\w+$")
+
+_QUOTES = ("'", '"')
+_TOOL_RESULT = "ToolResult(result="
+_AGENT_FINISH = "AgentFinish(thought="
+_OUTPUT_KWARG = "output="
+_ANSWER_KWARG = "result_as_answer="
+
+
+def _strip_quote_paren(text: str) -> str:
+    """Drop a trailing `')` / `")` (plus whitespace) closing a wrapper."""
+    tail = text.rstrip()
+    if tail.endswith(")") and tail[:-1].endswith(_QUOTES):
+        return tail[:-2]
+    return text
+
+
+def _strip_answer_kwarg(text: str) -> str:
+    """Drop a trailing `', result_as_answer=<word>)` closing a ToolResult."""
+    tail = text.rstrip()
+    if not tail.endswith(")"):
+        return text
+    idx = tail.rfind(_ANSWER_KWARG)
+    if idx < 0 or not _WORD.fullmatch(tail, idx + len(_ANSWER_KWARG), len(tail) - 1):
+        return text
+    head = tail[:idx].rstrip()
+    if head.endswith(",") and head[:-1].endswith(_QUOTES):
+        return head[:-2]
+    return text
+
+
+def _peel_tool_result(text: str) -> str:
+    if not text.startswith(_TOOL_RESULT) or text[len(_TOOL_RESULT):len(_TOOL_RESULT) + 1] not in _QUOTES:
+        return text
+    inner = text[len(_TOOL_RESULT) + 1:]
+    if not inner:
+        return text
+    return _strip_quote_paren(_strip_answer_kwarg(inner)).strip()
+
+
+def _peel_agent_finish(text: str) -> str:
+    start = len(_AGENT_FINISH) + 1
+    if not text.startswith(_AGENT_FINISH) or text[start - 1:start] not in _QUOTES:
+        return text
+    # The thought ends at the first `', output='` — scan forward, never back
+    idx = text.find(_OUTPUT_KWARG, start)
+    while idx >= 0:
+        head = text[start:idx].rstrip()
+        body_at = idx + len(_OUTPUT_KWARG) + 1
+        if (head.endswith(",") and head[:-1].endswith(_QUOTES)
+                and text[body_at - 1:body_at] in _QUOTES and body_at < len(text)):
+            return _strip_quote_paren(text[body_at:]).strip()
+        idx = text.find(_OUTPUT_KWARG, idx + 1)
+    return text
+
+
+def clean_content(content: str, limit: int = STREAM_LIMIT) -> str:
+    """Clean up raw CrewAI output for display in the UI."""
+    if not content:
+        return ""
+    content = _peel_tool_result(content)
+    content = _peel_agent_finish(content)
+    # Gemma sometimes opens with "### Assistant:"
+    m = _ASSISTANT_PREFIX.match(content)
+    if m:
+        content = content[m.end():]
+    if len(content) > limit:
+        content = content[:limit] + "... [truncated]"
+    return content.strip()
+
+
+def _strip_fences(content: str) -> str:
+    for fence in ("```markdown", "```md", "```"):
+        if content.startswith(fence):
+            content = content[len(fence):].strip()
+            break
+    if content.endswith("```"):
+        content = content[:-3].strip()
+    return content
+
+
+def clean_report(content: str, chart_files: list[str] | None = None) -> str:
+    """Strip LLM artifacts from report content and fix image references."""
+    content = content.strip()
+
+    # A "Thought: ..." preamble before the report — which starts at the
+    # first markdown heading, or at a ```markdown fence
+    if content.startswith("Thought:"):
+        idx = content.find("\n#", len("Thought:") - 1)
+        if idx >= 0:
+            content = content[idx + 1:].strip()
+    if content.startswith("Thought:"):
+        idx = content.find("```", len("Thought:"))
+        if idx >= 0:
+            content = content[idx:].strip()
+
+    content = _strip_fences(content)
+
+    if chart_files:
+        content = fix_chart_refs(content, chart_files)
+    return content
+
+
+def _stem(path: str) -> str:
+    """Path(path).stem for a URL-style path, without pathlib's parsing cost."""
+    name = path.rstrip("/").rpartition("/")[2]
+    dot = name.rfind(".")
+    return name[:dot] if 0 < dot < len(name) - 1 else name
+
+
+class ChartIndex:
+    """Resolves an image reference's stem to one of a report's chart paths.
+
+    The lookup the cleaners have always done: the exact stem, the lowercase
+    stem, then the first chart (in order) whose stem is contained in the
+    reference or contains it. A reference that only shares some words with
+    a chart stays unresolved — a broken image beats the wrong chart.
+    """
+
+    def __init__(self, chart_files: list[str]):
+        self.by_stem: dict[str, str] = {}  # stem and lowercase stem -> path, last chart wins
+        for path in chart_files:
+            stem = _stem(path)
+            self.by_stem[stem] = path
+            self.by_stem[stem.lower()] = path
+
+    def resolve(self, ref_stem: str) -> str | None:
+        path = self.by_stem.get(ref_stem) or self.by_stem.get(ref_stem.lower())
+        if path is not None:
+            return path
+        ref = ref_stem.lower()
+        for stem, path in self.by_stem.items():
+            if stem in ref or ref in stem:
+                return path
+        return None
+
+
+def fix_chart_refs(content: str, chart_files: list[str] | ChartIndex) -> str:
+    """Point markdown image references at actual chart files.
+
+    The writer LLM often gets paths wrong — wrong extension (.json instead
+    of .png), wrong prefix, missing path. Unresolved references keep their
+    path with the extension forced to .png.
+    """
+    if "![" not in content:
+        return content
+    index = chart_files if isinstance(chart_files, ChartIndex) else ChartIndex(chart_files)
+
+    def _replace(match):
+        alt, ref_path = match.group(1), match.group(2)
+        path = index.resolve(_stem(ref_path))
+        if path is None:
+            path = _EXTENSION.sub(".png", ref_path)
+            if not path.endswith(".png"):
+                path += ".png"
+        return f"![{alt}]({path})"
+
+    return _MD_IMAGE.sub(_replace, content)
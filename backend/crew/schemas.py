@@ -0,0 +1,97 @@
+"""Pydantic schemas for structured agent hand-offs."""
+
+import json
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+
+class ChartSpec(BaseModel):
+    """One chart dataset, exactly as generate_chart() takes it."""
+
+    chart_type: Literal["bar", "horizontal_bar", "pie", "line"] = "bar"
+    title: str = Field(min_length=1)
+    labels: list[str] = Field(min_length=1)
+    values: list[float] = Field(min_length=1)
+    unit: str = ""
+    filename: str = Field(min_length=1)
+
+    @field_validator("labels", mode="before")
+    @classmethod
+    def _labels_as_strings(cls, v: Any) -> Any:
+        return [str(label) for label in v] if isinstance(v, list) else v
+
+    @field_validator("filename")
+    @classmethod
+    def _filename_stem(cls, v: str) -> str:
+        # Models add ".png" / ".json" or a path — keep the bare stem
+        return Path(v).stem or "chart"
+
+    @model_validator(mode="after")
+    def _same_length(self) -> "ChartSpec":
+        if len(self.labels) != len(self.values):
+            raise ValueError(
+                f"labels ({len(self.labels)}) and values ({len(self.values)}) differ in length"
+            )
+        return self
+
+
+class ChartSpecSet(BaseModel):
+    """The analyst's full output — passed to Ollama as the `format` JSON schema."""
+
+    charts: list[ChartSpec] = Field(min_length=1, max_length=4)
+
+
+def _json_values(text: str):
+    """Yield every top-level JSON object or array embedded in text."""
+    decoder = json.JSONDecoder()
+    idx = 0
+    while True:
+        starts = [i for i in (text.find("{", idx), text.find("[", idx)) if i != -1]
+        if not starts:
+            return
+        start = min(starts)
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            idx = start + 1
+            continue
+        yield value
+        idx = end
+
+
+def _candidates(value: Any) -> list[Any]:
+    if isinstance(value, dict) and isinstance(value.get("charts"), list):
+        return value["charts"]
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def parse_chart_specs(text: str) -> list[ChartSpec]:
+    """Validate the analyst's output into chart specs.
+
+    With structured output the whole text is one {"charts": [...]} object.
+    Free-text output (structured mode off, or an older model) is scanned for
+    embedded JSON objects instead. Invalid entries are skipped.
+    """
+    specs = []
+    for value in _json_values(text or ""):
+        for candidate in _candidates(value):
+            try:
+                specs.append(ChartSpec.model_validate(candidate))
+            except ValidationError:
+                continue
+    return specs
+
+
+def parse_chart_spec(raw: Any) -> ChartSpec:
+    """Validate a single ChartTool input (dict or JSON string, possibly wrapped in prose)."""
+    if isinstance(raw, dict):
+        return ChartSpec.model_validate(_candidates(raw)[0])
+
+    specs = parse_chart_specs(str(raw))
+    if not specs:
+        raise ValueError(f"Could not parse chart input: {str(raw)[:200]}")
+    return specs[0]
@@ -0,0 +1,94 @@
+"""Run state snapshots — what a late joiner needs instead of the whole history.
+
+The bridge applies every event to its run's RunSnapshot as it is pushed:
+the current agent, each agent's status, timing and latest output, the
+charts so far and the report so far are kept up to date in O(1) per event.
+A viewer joining in snapshot mode gets this state and then only the events
+pushed after it. Once a run is complete, compact() drops the events a
+later one supersedes from the history kept in memory.
+"""
+
+import copy
+import hashlib
+
+
+class RunSnapshot:
+    def __init__(self):
+        self.status = "running"  # running | completed | cancelled | error
+        self.current_agent: str | None = None
+        self.agents: dict[str, dict] = {}  # agent -> role, model, vm, status, elapsed_seconds, latest_output
+        self.charts: list[str] = []
+        self.report: dict | None = None  # latest report_partial: stage, content
+        self.total_seconds: float | None = None
+        self.report_path: str | None = None
+        self.error: str | None = None
+
+    def _agent(self, agent: str) -> dict:
+        return self.agents.setdefault(agent, {"status": "waiting"})
+
+    def apply(self, event):
+        kind = event.type
+        agent = getattr(event, "agent", None)
+        if kind == "agent_start" and agent:
+            self.current_agent = agent
+            state = self._agent(agent)
+            state.update({k: getattr(event, k) for k in ("role", "model", "vm") if getattr(event, k)})
+            state["status"] = "working"
+        elif kind == "agent_complete" and agent:
+            state = self._agent(agent)
+            state["status"] = "done"
+            state["elapsed_seconds"] = event.elapsed_seconds
+        elif kind == "agent_output" and agent:
+            self._agent(agent)["latest_output"] = event.content
+        elif kind == "chart_created" and event.path not in self.charts:
+            self.charts.append(event.path)
+        elif kind == "report_partial":
+            self.report = {"stage": event.stage, "content": event.content}
+        elif kind == "crew_complete":
+            self.status = "completed"
+            self.current_agent = None
+            for state in self.agents.values():
+                if state["status"] == "working":
+                    state["status"] = "done"  # the manager never gets an agent_complete
+            self.total_seconds = event.total_seconds
+            self.report_path = event.report_path
+            self.charts = list(event.charts or self.charts)
+        elif kind == "error" and not event.recoverable:
+            self.status = "cancelled" if event.cancelled else "error"
+            self.current_agent = None
+            self.error = event.message
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "current_agent": self.current_agent,
+            "agents": copy.deepcopy(self.agents),
+            "charts": list(self.charts),
+            "report": dict(self.report) if self.report else None,
+            "total_seconds": self.total_seconds,
+            "report_path": self.report_path,
+            "error": self.error,
+        }
+
+
+def compact(events: list) -> list[int]:
+    """Indices of the events of a finished run worth keeping, in order.
+
+    Each report_partial carries the whole report so far, so only the last
+    one is kept; an agent_output repeating an earlier output of the same
+    agent (a delegated answer reported again as the manager's final
+    answer) is dropped.
+    """
+    last_report = max((i for i, e in enumerate(events) if e.type == "report_partial"), default=None)
+    seen: set[tuple] = set()
+    keep = []
+    for i, event in enumerate(events):
+        if event.type == "report_partial" and i != last_report:
+            continue
+        if event.type == "agent_output":
+            digest = hashlib.blake2b((event.content or "").encode(), digest_size=8).digest()
+            if (event.agent, digest) in seen:
+                continue
+            seen.add((event.agent, digest))
+        keep.append(i)
+    return keep
@@ -1,27 +1,44 @@
-"""Task definitions for the market research crew."""
+"""Task definitions for the market research crew.
+
+Task descriptions are static instructions with the run's topic appended
+last. Ollama reuses the KV cache of a prompt prefix it has already
+evaluated, so keeping everything before the topic byte-identical across
+runs saves re-prefilling the agent's system prompt and the instructions on
+every hop (bench/prompt_prefix.py measures it).
+"""
 
 from crewai import Task, Agent
 
 
+def _for_topic(instructions: str, topic: str) -> str:
+    return f"{instructions}\n\nTopic: {topic}"
+
+
 def build_tasks(
     topic: str,
     researcher: Agent,
     analyst: Agent,
     visualizer: Agent,
     writer: Agent,
+    include_visualization: bool = True,
 ) -> list[Task]:
-    """Build the task pipeline for a given research topic."""
+    """Build the task pipeline for a given research topic.
+
+    Without the visualization task (direct chart rendering) the writer reads
+    the rendered chart filenames from the analysis output instead.
+    """
 
     research_task = Task(
-        description=(
-            f"Research the following topic thoroughly: {topic}\n\n"
+        description=_for_topic(
+            "Research the topic given at the end of this task thoroughly.\n\n"
             "Identify:\n"
             "- Key players and their market positions\n"
             "- Market size estimates and growth trends\n"
             "- Competitive dynamics and differentiation\n"
             "- Technology trends and disruption vectors\n"
             "- Pricing and cost comparisons where available\n\n"
-            "Structure your findings clearly with sections and bullet points."
+            "Structure your findings clearly with sections and bullet points.",
+            topic,
         ),
         expected_output="A structured research report with key players, market data, trends, and competitive analysis.",
         agent=researcher,
@@ -30,21 +47,27 @@ def build_tasks(
     analysis_task = Task(
         description=(
             "Transform the research findings into 2-4 quantitative chart datasets.\n\n"
-            "For EACH chart, output a JSON block with exactly these fields:\n"
+            "Output a single JSON object with a \"charts\" list, one entry per chart, "
+            "each with exactly these fields:\n"
             "```json\n"
             "{\n"
-            '  "chart_type": "bar",\n'
-            '  "title": "Chart Title Here",\n'
-            '  "labels": ["Label1", "Label2", "Label3"],\n'
-            '  "values": [10, 20, 30],\n'
-            '  "unit": "% or $ or description",\n'
-            '  "filename": "descriptive_filename"\n'
+            '  "charts": [\n'
+            "    {\n"
+            '      "chart_type": "bar",\n'
+            '      "title": "Chart Title Here",\n'
+            '      "labels": ["Label1", "Label2", "Label3"],\n'
+            '      "values": [10, 20, 30],\n'
+            '      "unit": "% or $ or description",\n'
+            '      "filename": "descriptive_filename"\n'
+            "    }\n"
+            "  ]\n"
             "}\n"
             "```\n\n"
             "Chart types available: bar, horizontal_bar, pie, line.\n"
-            "Output ONLY the JSON blocks, one per chart. No other text."
+            "labels and values must have the same length.\n"
+            "Output ONLY the JSON object. No other text."
         ),
-        expected_output="2-4 JSON chart dataset blocks ready for visualization.",
+        expected_output="A JSON object with a \"charts\" list of 2-4 chart datasets.",
         agent=analyst,
         context=[research_task],
     )
@@ -52,8 +75,8 @@ def build_tasks(
     visualization_task = Task(
         description=(
             "Generate charts from the analyst's JSON datasets using the ChartTool.\n\n"
-            "For EACH JSON block from the analyst, call ChartTool with a single argument:\n"
-            "chart_data - pass the entire JSON object as a string.\n\n"
+            "For EACH entry in the analyst's \"charts\" list, call ChartTool with a single argument:\n"
+            "chart_data - pass that chart's JSON object as a string.\n\n"
             "Example call: ChartTool(chart_data='{\"chart_type\": \"bar\", \"title\": \"My Chart\", "
             "\"labels\": [\"A\", \"B\"], \"values\": [10, 20], \"unit\": \"%\", \"filename\": \"my_chart\"}')\n\n"
             "Generate ALL charts — do not skip any."
@@ -64,8 +87,8 @@ def build_tasks(
     )
 
     writing_task = Task(
-        description=(
-            f"Write a polished markdown report on: {topic}\n\n"
+        description=_for_topic(
+            "Write a polished markdown report on the topic given at the end of this task.\n\n"
             "Include these sections:\n"
             "1. Executive Summary (2-3 paragraphs)\n"
             "2. Key Players & Market Position\n"
@@ -73,12 +96,16 @@ def build_tasks(
             "4. Strategic Analysis\n"
             "5. Recommendations\n\n"
             "Embed chart references using: ![Chart Title](./charts/filename.png)\n"
-            "Use the filenames from the visualization step.\n\n"
-            "Save the final report using the FileTool with filename 'report'."
+            "Use the filenames of the rendered charts.\n\n"
+            "Save the final report using the FileTool with filename 'report'.",
+            topic,
         ),
         expected_output="A complete markdown report saved to disk with embedded chart references.",
         agent=writer,
-        context=[research_task, analysis_task, visualization_task],
+        context=[research_task, analysis_task, visualization_task] if include_visualization
+        else [research_task, analysis_task],
     )
 
+    if not include_visualization:
+        return [research_task, analysis_task, writing_task]
     return [research_task, analysis_task, visualization_task, writing_task]
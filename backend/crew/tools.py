@@ -1,10 +1,14 @@
 """CrewAI tool wrappers for chart generation and file saving."""
 
-import json
 import logging
-from typing import Any
+import time
 from crewai.tools import tool
 
+from backend.crew.context import current_run_id
+from backend.crew.metrics import track_tool
+from backend.crew.recorder import recorder_for
+from backend.crew.run_manager import run_manager
+from backend.crew.schemas import ChartSpec, parse_chart_spec
 from backend.tools.chart_tool import generate_chart
 from backend.tools.file_tool import save_report
 
@@ -29,67 +33,36 @@ def chart_tool(chart_data: str) -> str:
     Returns the file path of the generated chart image.
     """
     try:
-        data = _parse_chart_input(chart_data)
-        path = generate_chart(
-            chart_type=data.get("chart_type", "bar"),
-            title=data.get("title", "Chart"),
-            labels=[str(l) for l in data.get("labels", [])],
-            values=[float(v) for v in data.get("values", [])],
-            unit=data.get("unit", ""),
-            filename=data.get("filename", "chart"),
-        )
+        spec = parse_chart_spec(chart_data)
+        path = render_chart(spec)
         return f"Chart saved to: {path}"
     except Exception as e:
         logger.error(f"ChartTool error: {e}")
         return f"Error generating chart: {e}"
 
 
-def _parse_chart_input(raw: Any) -> dict:
-    """Robustly parse chart input from various LLM output formats."""
-    # Already a dict with the right keys
-    if isinstance(raw, dict):
-        if "chart_type" in raw:
-            return raw
-        # Model passed the schema definition instead of values
-        if "properties" in raw:
-            logger.warning("ChartTool received schema instead of data, attempting extraction")
-            props = raw["properties"]
-            # Try to extract default/example values from schema
-            extracted = {}
-            for key, spec in props.items():
-                if isinstance(spec, dict):
-                    extracted[key] = spec.get("default", spec.get("description", ""))
-            return extracted
-        return raw
-
-    # JSON string
-    if isinstance(raw, str):
-        # Try direct JSON parse
-        try:
-            parsed = json.loads(raw)
-            if isinstance(parsed, dict):
-                return parsed
-        except json.JSONDecodeError:
-            pass
-
-        # Try to find JSON object in the string (model may have wrapped it in text)
-        import re
-        json_match = re.search(r'\{[^{}]*"chart_type"[^{}]*\}', raw, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-
-        # Try to find a JSON block with nested arrays
-        json_match = re.search(r'\{.*?"labels"\s*:\s*\[.*?\].*?\}', raw, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-
-    raise ValueError(f"Could not parse chart input: {str(raw)[:200]}")
+def render_chart(spec: ChartSpec) -> str:
+    """Render a validated chart spec. Returns the path relative to output/."""
+    started = time.monotonic()
+    with track_tool("ChartTool"):
+        path = generate_chart(**spec.model_dump())
+    _record_artifact("rendered_charts", f"/output/{path}")
+    _record_tool("ChartTool", spec.model_dump(), path, started)
+    return path
+
+
+def _record_artifact(kind: str, path: str):
+    """Attribute a file written by a tool to the run in the current context."""
+    run = run_manager.get_run(current_run_id.get())
+    if run:
+        getattr(run, kind).append(path)
+
+
+def _record_tool(name: str, tool_input: dict, output: str, started: float):
+    """Add a tool call to the run archive, if this run is being recorded."""
+    run_recorder = recorder_for(current_run_id.get())
+    if run_recorder:
+        run_recorder.tool_call(name, tool_input, output, time.monotonic() - started)
 
 
 @tool("FileTool")
@@ -100,5 +73,9 @@ def file_tool(filename: str, content: str) -> str:
 
     Returns the path where the file was saved.
     """
-    path = save_report(filename, content)
+    started = time.monotonic()
+    with track_tool("FileTool"):
+        path = save_report(filename, content)
+    _record_artifact("saved_files", path)
+    _record_tool("FileTool", {"filename": filename, "content": content}, path, started)
     return f"Report saved to: {path}"
@@ -0,0 +1,224 @@
+"""Span-based tracing for crew runs, exported as OTLP/JSON files.
+
+Each real run gets a trace: a root span for the run, a child span per task
+(agent stage), a span per manager step inside the task, and leaf spans for
+every LLM HTTP call and tool call. Traces are written to
+output/traces/{run_id}.json in the OTLP/JSON layout, so they can be opened
+offline (or replayed into any OTLP collector) without running one here.
+
+Steps are only reported by CrewAI after they finish, so a step span is
+opened when the previous step (or the task) ends and closed by the next
+step_callback; LLM and tool calls made in between land inside it.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from backend.config import TRACES_DIR, TRACING_ENABLED
+from backend.crew.files import write_atomic
+
+logger = logging.getLogger("tracing")
+
+SERVICE_NAME = "agentic-simple"
+
+# OTLP status codes
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+# OTLP span kinds
+KIND_INTERNAL, KIND_CLIENT = 1, 3
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+def _attr_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, trace_id: str, parent_id: str | None, name: str, kind: int = KIND_INTERNAL,
+                 start_ns: int | None = None, attributes: dict | None = None):
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+
+    def end(self, end_ns: int | None = None, status: int = STATUS_OK):
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+            self.status = status
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": k, "value": _attr_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class RunTrace:
+    """All spans of one crew run, plus the currently open task and step spans."""
+
+    def __init__(self, run_id: str, topic: str):
+        self.run_id = run_id
+        self.trace_id = _new_id(16)
+        self.root = Span(self.trace_id, None, "crew.run", attributes={"run.id": run_id, "run.topic": topic})
+        self.spans: list[Span] = [self.root]
+        self._task: Span | None = None
+        self._step: Span | None = None
+        self._step_count = 0
+        self._step_children = 0
+        self._lock = threading.Lock()
+
+    def _open(self, name: str, parent: Span, **kwargs) -> Span:
+        span = Span(self.trace_id, parent.span_id, name, **kwargs)
+        self.spans.append(span)
+        return span
+
+    def _close_step(self, status: int = STATUS_OK, **attributes):
+        step = self._step
+        self._step = None
+        if step is None:
+            return
+        # A step with nothing in it is just the tail after the final answer
+        if not attributes and not self._step_children:
+            self.spans.remove(step)
+            self._step_count -= 1
+            return
+        step.attributes.update(attributes)
+        step.end(status=status)
+
+    def _open_step(self):
+        self._step_count += 1
+        self._step_children = 0
+        self._step = self._open(f"step {self._step_count}", self._task or self.root)
+
+    def _parent(self) -> Span:
+        return self._step or self._task or self.root
+
+    def start_task(self, agent: str, role: str, model: str, vm: str):
+        with self._lock:
+            self._end_task_locked()
+            self._task = self._open(f"task {agent}", self.root, attributes={
+                "agent.key": agent, "agent.role": role, "llm.model": model, "vm": vm,
+            })
+            self._step_count = 0
+            self._open_step()
+
+    def end_task(self, status: int = STATUS_OK):
+        with self._lock:
+            self._end_task_locked(status)
+
+    def _end_task_locked(self, status: int = STATUS_OK):
+        self._close_step(status)
+        if self._task:
+            self._task.attributes["task.steps"] = self._step_count
+            self._task.end(status=status)
+            self._task = None
+
+    def step(self, kind: str, tool: str | None = None):
+        """Close the open step span (it ended with this step output) and open the next."""
+        with self._lock:
+            attributes = {"step.kind": kind}
+            if tool:
+                attributes["step.tool"] = tool
+            if self._step is None:
+                self._open_step()
+            self._close_step(**attributes)
+            self._open_step()
+
+    def record(self, name: str, start_ns: int, end_ns: int, kind: int = KIND_INTERNAL,
+               status: int = STATUS_OK, attributes: dict | None = None):
+        """Add a finished leaf span (LLM call, tool call) under the open step."""
+        with self._lock:
+            if self._step is not None:
+                self._step_children += 1
+            span = self._open(name, self._parent(), kind=kind, start_ns=start_ns, attributes=attributes)
+            span.end(end_ns, status)
+
+    def finish(self, status: str):
+        with self._lock:
+            code = STATUS_OK if status == "completed" else STATUS_ERROR
+            self._end_task_locked(code)
+            self.root.attributes["run.status"] = status
+            self.root.end(status=code)
+
+    def to_otlp(self) -> dict:
+        with self._lock:
+            spans = [s.to_otlp() for s in self.spans]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "backend.crew.tracing"}, "spans": spans}],
+            }]
+        }
+
+
+class FileExporter:
+    """Writes one OTLP/JSON file per trace."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def export(self, trace: RunTrace):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{trace.run_id}.json"
+        write_atomic(path, json.dumps(trace.to_otlp()))
+        return path
+
+
+_traces: dict[str, RunTrace] = {}
+exporter = FileExporter(TRACES_DIR)
+
+
+def start_trace(run_id: str, topic: str) -> RunTrace | None:
+    if not TRACING_ENABLED:
+        return None
+    trace = RunTrace(run_id, topic)
+    _traces[run_id] = trace
+    return trace
+
+
+def trace_for(run_id: str | None) -> RunTrace | None:
+    if run_id is None:
+        return None
+    return _traces.get(run_id)
+
+
+def finish_trace(run_id: str, status: str):
+    """End the root span and export the trace."""
+    trace = _traces.pop(run_id, None)
+    if trace is None:
+        return None
+    trace.finish(status)
+    try:
+        path = exporter.export(trace)
+    except OSError as e:
+        logger.error(f"Failed to export trace for run {run_id}: {e}")
+        return None
+    logger.info(f"Trace for run {run_id}: {len(trace.spans)} spans -> {path}")
+    return path
@@ -0,0 +1,156 @@
+"""Per-run agent watchdog — bounds what a looping agent can cost.
+
+Small models loop: re-issue the same tool call, re-delegate a task that
+already came back, or keep reasoning well past the point of an answer.
+CrewAI only stops them at max_iter, one LLM call per turn. The watchdog
+sees every step (from the agents' step_callbacks) and every LLM call's
+completion tokens (from the Ollama transport), and per agent, per task,
+trips on:
+
+- max_repeats — the same action (tool and input) more times than this,
+  or the same tool returning the same result more times than this;
+- max_steps — this many steps within one task;
+- token_budget — this many completion tokens over the whole run.
+
+A tripped step or repeat limit forces the agent's final answer on its next
+turn (WATCHDOG_ACTION=finish), or fails the run (WATCHDOG_ACTION=fail). An
+agent still going _GRACE_STEPS steps after being told to finish, or over
+its token budget, always fails the run: it is cancelled with the reason
+recorded here, which the runner reports as the run's error.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+
+from backend.config import WATCHDOG_ACTION, WATCHDOG_ENABLED
+from backend.crew import cancellation, metrics
+from backend.crew.events import CrewError
+from backend.crew.profiles import profile_for
+
+logger = logging.getLogger("watchdog")
+
+_GRACE_STEPS = 2  # steps an agent may take after being told to finish
+
+
+def _fingerprint(text) -> str:
+    """Whitespace- and case-insensitive digest of a tool input or result."""
+    normalized = " ".join(str(text or "").split()).casefold()
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+@dataclass
+class _TaskState:
+    steps: int = 0
+    actions: Counter = field(default_factory=Counter)  # (tool, input digest) -> times
+    results: Counter = field(default_factory=Counter)  # (tool, result digest) -> times
+    forced_at: int | None = None  # step at which the final answer was forced
+
+
+class RunWatchdog:
+    def __init__(self, run_id: str, bridge):
+        self.run_id = run_id
+        self.bridge = bridge
+        self.tripped: str | None = None  # why the run was failed, once it has been
+        self._agents: dict = {}  # agent key -> crewai Agent
+        self._tasks: dict[str, _TaskState] = {}
+        self._tokens: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def watch(self, agent_key: str, agent):
+        """Track `agent`'s steps; returns its step_callback."""
+        self._agents[agent_key] = agent
+        return lambda step_output: self.on_step(agent_key, step_output)
+
+    def start_task(self):
+        """A new pipeline task has started — per-task limits start over."""
+        with self._lock:
+            self._tasks.clear()
+
+    def on_step(self, agent_key: str, step_output):
+        """Count a step; force a finish or fail the run if it trips a limit."""
+        from crewai.agents.parser import AgentAction, AgentFinish
+
+        if not isinstance(step_output, (AgentAction, AgentFinish)):
+            return  # tool results arrive again on their AgentAction
+        limits = profile_for(agent_key)
+        with self._lock:
+            state = self._tasks.setdefault(agent_key, _TaskState())
+            state.steps += 1
+            reason = None
+            if state.forced_at is not None and state.steps > state.forced_at + _GRACE_STEPS:
+                self.fail(agent_key, f"kept going {_GRACE_STEPS} steps after being told to finish")
+            elif isinstance(step_output, AgentAction):
+                action = (step_output.tool, _fingerprint(step_output.tool_input))
+                result = (step_output.tool, _fingerprint(step_output.result))
+                state.actions[action] += 1
+                state.results[result] += 1
+                if limits.max_repeats and state.actions[action] > limits.max_repeats:
+                    reason = f"repeated {step_output.tool} with the same input {state.actions[action]} times"
+                elif limits.max_repeats and state.results[result] > limits.max_repeats:
+                    reason = f"got the same {step_output.tool} result {state.results[result]} times"
+                elif limits.max_steps and state.steps >= limits.max_steps:
+                    reason = f"reached its {limits.max_steps}-step budget"
+            if reason and state.forced_at is None:
+                if WATCHDOG_ACTION == "fail":
+                    self.fail(agent_key, reason)
+                else:
+                    state.forced_at = state.steps
+                    self._force_finish(agent_key, reason)
+        cancellation.check(self.run_id)
+
+    def on_tokens(self, agent_key: str, completion_tokens: int):
+        """Count an LLM call's completion tokens against the agent's run budget."""
+        budget = profile_for(agent_key).token_budget
+        with self._lock:
+            self._tokens[agent_key] += completion_tokens
+            used = self._tokens[agent_key]
+        if budget and used > budget:
+            # Called as the response closes — the next checkpoint raises
+            self.fail(agent_key, f"generated {used} tokens, over its {budget}-token budget")
+
+    def _force_finish(self, agent_key: str, reason: str):
+        """Have CrewAI ask the agent for its final answer on its next turn."""
+        executor = getattr(self._agents.get(agent_key), "agent_executor", None)
+        if executor is not None:
+            # The loop adds one after this step; at max_iter it forces the answer
+            executor.iterations = executor.max_iter
+        logger.warning(f"[{self.run_id}] {agent_key} {reason} — forcing its final answer")
+        metrics.WATCHDOG_TRIPS.inc(agent=agent_key, action="finish")
+        self.bridge.push_event(CrewError(
+            agent=agent_key,
+            message=f"Watchdog: {agent_key} {reason} — asking for its final answer",
+            recoverable=True,
+            watchdog=True,
+        ))
+
+    def fail(self, agent_key: str, reason: str):
+        """Fail the run: cancel it, recording why for the runner."""
+        if self.tripped:
+            return
+        self.tripped = f"{agent_key} {reason}"
+        logger.warning(f"[{self.run_id}] {self.tripped} — failing the run")
+        metrics.WATCHDOG_TRIPS.inc(agent=agent_key, action="fail")
+        scope = cancellation.scope_for(self.run_id)
+        if scope:
+            scope.cancel(f"watchdog: {self.tripped}")
+
+
+_watchdogs: dict[str, RunWatchdog] = {}
+
+
+def open_watchdog(run_id: str, bridge) -> RunWatchdog | None:
+    if not WATCHDOG_ENABLED:
+        return None
+    dog = _watchdogs[run_id] = RunWatchdog(run_id, bridge)
+    return dog
+
+
+def watchdog_for(run_id: str | None) -> RunWatchdog | None:
+    return _watchdogs.get(run_id) if run_id else None
+
+
+def close_watchdog(run_id: str) -> RunWatchdog | None:
+    return _watchdogs.pop(run_id, None)
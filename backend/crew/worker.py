@@ -0,0 +1,170 @@
+"""Crew worker process for EXECUTOR_MODE=workers.
+
+    python -m backend.crew.worker            # one worker; run as many as the GPUs can feed
+    python -m backend.crew.worker --id gpu-a
+
+A worker claims queued runs from the job queue (jobs.py) one at a time
+and executes them with the same engine the API uses in-process
+(runner.execute_run), so the crew's Python work — LiteLLM parsing, CrewAI
+loops, chart rendering — runs outside the API's interpreter. Every event
+the run pushes is appended to the queue for the API to relay; a heartbeat
+marks the job alive and picks up cancellation requests.
+
+With WORKERS > 0 the API starts and supervises its workers itself
+(WorkerPool) — only one API process per JOBS_DB does, the one holding the
+pool's lock file; with WORKERS=0 run them under your own process manager.
+"""
+
+import argparse
+import asyncio
+import fcntl
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from backend.config import JOBS_DB, MOCK_MODE, WORKER_POLL_MS, ensure_output_dirs
+from backend.crew.jobs import job_queue
+
+logger = logging.getLogger("crew_worker")
+
+_HEARTBEAT_S = 1.0  # also how quickly a worker notices a cancellation request
+_RESTART_BACKOFF_S = 2.0
+
+
+async def _heartbeat(queue, run):
+    from backend.crew.run_manager import run_manager
+
+    while True:
+        await asyncio.sleep(_HEARTBEAT_S)
+        reason = await asyncio.to_thread(queue.heartbeat, run.run_id)
+        if reason:
+            run_manager.cancel_run(run, reason)
+
+
+async def run_job(queue, job: dict, worker_id: str):
+    """Execute one claimed job and store its result."""
+    from backend.crew.run_manager import run_manager
+    from backend.crew.runner import execute_run
+
+    run = run_manager.create_run(job["run_id"], job["topic"])
+    run.bridge.add_listener(lambda event: queue.append_event(run.run_id, event.to_wire()))
+    options = job["options"]
+    heartbeat = asyncio.create_task(_heartbeat(queue, run))
+    try:
+        if job["cancel"]:
+            run_manager.cancel_run(run, job["cancel"])
+        await execute_run(run, mock=options.get("mock", MOCK_MODE), profile=options.get("profile", False))
+    finally:
+        heartbeat.cancel()
+        stored = await asyncio.to_thread(queue.finish, run.run_id, worker_id, {
+            "status": run.status,
+            "error": run.error,
+            "report_path": run.report_path,
+            "charts": run.charts,
+            "exports": run.exports,
+            "report_html": run.report_html,
+            "profile": run.profile,
+            "started_at": run.started_at.isoformat() if run.started_at else None,
+            "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+            "timings": run.timings,
+        })
+        if not stored:
+            logger.warning(f"[{run.run_id}] Job was failed by the API while running; result discarded")
+
+
+async def serve(worker_id: str):
+    queue = job_queue()
+    logger.info(f"Worker {worker_id} polling {queue.path}")
+    while True:
+        job = await asyncio.to_thread(queue.claim, worker_id)
+        if job is None:
+            await asyncio.sleep(WORKER_POLL_MS / 1000)
+            continue
+        logger.info(f"[{job['run_id']}] Worker {worker_id} running: {job['topic']}")
+        try:
+            await run_job(queue, job, worker_id)
+        except Exception as e:
+            logger.error(f"[{job['run_id']}] Job failed: {e}")
+
+
+class WorkerPool:
+    """Worker subprocesses started, restarted and stopped by the API's lifespan.
+
+    Every uvicorn worker process runs the lifespan, but only the first to
+    lock JOBS_DB's pool lock file starts a pool; the lock is released when
+    that process exits, however it exits.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._procs: dict[str, subprocess.Popen] = {}
+        self._task: asyncio.Task | None = None
+        self._lock_file = None
+
+    def _spawn(self, worker_id: str):
+        self._procs[worker_id] = subprocess.Popen([sys.executable, "-m", "backend.crew.worker", "--id", worker_id])
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(_RESTART_BACKOFF_S)
+            for worker_id, proc in list(self._procs.items()):
+                if proc.poll() is not None:
+                    logger.warning(f"Worker {worker_id} exited with {proc.returncode}, restarting")
+                    self._spawn(worker_id)
+
+    def _lock(self) -> bool:
+        JOBS_DB.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(JOBS_DB.with_name(JOBS_DB.name + ".pool.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def start(self):
+        if not self._lock():
+            logger.info("Crew workers are supervised by another API process")
+            return
+        for n in range(self.size):
+            self._spawn(f"{os.getpid()}-{n}")
+        self._task = asyncio.create_task(self._supervise())
+        logger.info(f"Started {self.size} crew workers")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        for proc in self._procs.values():
+            proc.terminate()
+        deadline = time.monotonic() + 10
+        for proc in self._procs.values():
+            try:
+                await asyncio.to_thread(proc.wait, max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if self._lock_file:
+            self._lock_file.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.crew.worker", description="Execute queued crew runs.")
+    parser.add_argument("--id", default=f"{os.uname().nodename}-{os.getpid()}", help="Worker name in the job queue")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    ensure_output_dirs()
+    try:
+        asyncio.run(serve(args.id))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        from backend.crew.ollama_http import shutdown_hedging
+        shutdown_hedging()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,58 @@
 """FastAPI application — mounts routes, serves built frontend."""
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from pathlib import Path
 
-from backend.routers import health_router, crew_router
+from backend.config import EXECUTOR_MODE, WARM_IMPORTS, WORKERS, ensure_output_dirs
+from backend.routers import health_router, crew_router, metrics_router, artifacts_router
+
+logger = logging.getLogger("main")
 
-app = FastAPI(title="Akamai Edge AI Market Analyst")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # crewai / litellm / matplotlib load in the background once we're serving
+    if WARM_IMPORTS:
+        from backend.startup import start_warmup
+        start_warmup()
+    # Crew runs execute in worker processes; start and supervise them here
+    pool = None
+    if EXECUTOR_MODE == "workers":
+        from backend.crew.jobs import job_queue
+        orphans = await asyncio.to_thread(job_queue().fail_orphans)
+        if orphans:
+            logger.warning(f"Failed {orphans} unfinished runs of exited API processes")
+        if WORKERS > 0:
+            from backend.crew.worker import WorkerPool
+            pool = WorkerPool(WORKERS)
+            pool.start()
+    yield
+    if pool:
+        await pool.stop()
+    from backend.crew.ollama_http import shutdown_hedging
+    shutdown_hedging()
+
+
+app = FastAPI(title="Akamai Edge AI Market Analyst", lifespan=lifespan)
 
 # API routes
 app.include_router(health_router.router, prefix="/api")
 app.include_router(crew_router.router, prefix="/api/crew")
 
+# Prometheus scrape endpoint (conventional path, no /api prefix)
+app.include_router(metrics_router.router)
+
 # WebSocket routes (separate prefix from REST)
 app.include_router(crew_router.ws_router, prefix="/ws/crew")
 
-# Serve chart images from output directory
-output_dir = Path(__file__).parent / "output"
-output_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/output", StaticFiles(directory=str(output_dir)), name="output")
+# Charts, reports, traces and profiles from the output directory
+ensure_output_dirs()
+app.include_router(artifacts_router.router)
 
 # Serve built Svelte frontend (production)
 frontend_build = Path(__file__).parent.parent / "frontend" / "build"
@@ -0,0 +1,13 @@
+"""Run artifacts under /output — charts, reports, traces, profiles."""
+
+from fastapi import APIRouter, Request
+
+from backend.artifacts import artifacts
+
+router = APIRouter()
+
+
+@router.api_route("/output/{path:path}", methods=["GET", "HEAD"])
+async def artifact(request: Request, path: str):
+    """Serve a file from OUTPUT_DIR from memory, with ETag revalidation and gzip/brotli."""
+    return await artifacts.serve(request, path)
@@ -5,77 +5,220 @@ import json
 import logging
 from uuid import uuid4
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
 logger = logging.getLogger("crew_router")
 
-from backend.config import MOCK_MODE, OUTPUT_DIR
-from backend.crew.run_manager import run_manager
-from backend.crew.mock_runner import run_mock_crew
+from backend.artifacts import REVALIDATE, LRUCache, Payload, artifacts
+from backend.config import ARCHIVES_DIR, AUTO_CANCEL_ABANDONED, CANCEL_GRACE_SECONDS, EXECUTOR_MODE, SHARED_EVENTS
+from backend.crew import event_log
+from backend.crew.metrics import RUNS_COALESCED, timings_for
+from backend.crew.recorder import archive_path, list_archives, read_header
+from backend.crew.run_manager import IN_FLIGHT, coalesce_key, run_manager
+from backend.crew.runner import execute_run
 
 router = APIRouter()
 ws_router = APIRouter()
 
+# Encoded /report responses of completed runs — a final report never changes,
+# so viewers refreshing the dashboard are answered from memory (or with a 304)
+report_payloads = LRUCache(16 * 1024 * 1024)
+
 
 class CrewRunRequest(BaseModel):
     topic: str
+    profile: bool = False  # capture a sampling profile of the backend for this run
+    force_new: bool = False  # start a separate crew even if an identical run is in flight
 
 
 @router.post("/run")
 async def start_crew_run(request: CrewRunRequest):
-    """Kick off a crew run. Returns a run_id for WebSocket subscription."""
-    run_id = str(uuid4())[:8]
-    run = run_manager.create_run(run_id, request.topic)
+    """Kick off a crew run. Returns a run_id for WebSocket subscription.
 
-    if MOCK_MODE:
-        asyncio.create_task(run_mock_crew(run))
-    else:
-        # Real crew run — will be implemented in Phase 4
-        asyncio.create_task(_run_real_crew(run))
+    A request matching a run that is still pending or running joins that
+    run instead of starting another crew: the new run_id streams the same
+    events and gets the same report (`coalesced_with` names the run).
+    """
+    run_id = str(uuid4())[:8]
+    key = coalesce_key(request.topic, profile=request.profile)
+
+    if not request.force_new:
+        existing = run_manager.find_in_flight(key)
+        if existing is not None:
+            run_manager.alias_run(run_id, existing)
+            if SHARED_EVENTS:
+                event_log.publish_alias(run_id, existing.run_id)
+            RUNS_COALESCED.inc()
+            logger.info(f"[{run_id}] Coalesced with in-flight run {existing.run_id}")
+            return {"run_id": run_id, "status": "started", "coalesced_with": existing.run_id}
+
+    run = run_manager.create_run(run_id, request.topic, key=None if request.force_new else key)
+    if SHARED_EVENTS:
+        event_log.publish(run, lambda requested: _request_cancel(run, requested))
+    asyncio.create_task(execute_run(run, profile=request.profile, remote=EXECUTOR_MODE == "workers"))
 
     return {"run_id": run_id, "status": "started"}
 
 
+@router.delete("/run/{run_id}")
+async def cancel_crew_run(run_id: str):
+    """Cancel a queued or running run, aborting its in-flight LLM generations.
+
+    A coalesced run serves several run ids; the crew is stopped once every
+    one of them has asked to cancel.
+    """
+    run = await _find_run(run_id)
+    if not run:
+        return {"error": "Run not found", "run_id": run_id}
+    if run.status not in IN_FLIGHT:
+        return {"error": "Run is not in progress", "run_id": run_id, "status": run.status}
+    if isinstance(run, event_log.SharedRun):
+        # Another worker process runs it — it handles the request as its own
+        await asyncio.to_thread(event_log.request_cancel, run_id)
+        return {"run_id": run_id, "status": run.status, "forwarded": True}
+    return _request_cancel(run, run_id)
+
+
+def _request_cancel(run, run_id: str) -> dict:
+    if run.status not in IN_FLIGHT:
+        return {"error": "Run is not in progress", "run_id": run_id, "status": run.status}
+    run.cancel_requests.add(run_id)
+    waiting = [r for r in (run.run_id, *run.aliases) if r not in run.cancel_requests]
+    if waiting:
+        return {"run_id": run_id, "status": run.status, "shared_with": len(waiting)}
+
+    run_manager.cancel_run(run, "cancelled by request")
+    return {"run_id": run_id, "status": run.status}
+
+
+async def _find_run(run_id: str):
+    """This process's run for `run_id` or, with SHARED_EVENTS, another worker's (a SharedRun)."""
+    run = run_manager.get_run(run_id)
+    if run is None and SHARED_EVENTS:
+        run = await asyncio.to_thread(event_log.shared_run, run_id)
+    return run
+
+
+async def _cancel_if_abandoned(run):
+    await asyncio.sleep(CANCEL_GRACE_SECONDS)
+    if run.viewers == 0 and run.status in IN_FLIGHT:
+        logger.info(f"[{run.run_id}] No viewers for {CANCEL_GRACE_SECONDS:g}s")
+        run_manager.cancel_run(run, "all viewers disconnected")
+
+
+class ReplayRequest(BaseModel):
+    archive: str  # run id of a recorded run
+    speed: float = 1.0  # 1.0 = real time, N = N times faster, 0 = as fast as possible
+    profile: bool = False
+
+
+@router.post("/replay")
+async def start_replay(request: ReplayRequest):
+    """Replay a recorded run as a new run. Returns a run_id for WebSocket subscription."""
+    # Only ids from /archives — no arbitrary paths from the API
+    path = archive_path(request.archive)
+    header = await asyncio.to_thread(read_header, path) if path.parent == ARCHIVES_DIR else None
+    if header is None:
+        return {"error": "Archive not found", "archive": request.archive}
+
+    run_id = str(uuid4())[:8]
+    run = run_manager.create_run(run_id, header.get("topic", request.archive))
+    if SHARED_EVENTS:
+        event_log.publish(run, lambda requested: _request_cancel(run, requested))
+    asyncio.create_task(execute_run(run, profile=request.profile, replay=request.archive, speed=request.speed))
+
+    return {"run_id": run_id, "status": "started", "replay_of": request.archive}
+
+
+@router.get("/archives")
+async def archives():
+    """List recorded runs that can be replayed."""
+    return {"archives": await asyncio.to_thread(list_archives)}
+
+
 @router.get("/status/{run_id}")
 async def crew_status(run_id: str):
     """Get current state of a crew run."""
-    run = run_manager.get_run(run_id)
+    run = await _find_run(run_id)
     if not run:
         return {"error": "Run not found", "run_id": run_id}
+    shared = isinstance(run, event_log.SharedRun)
 
     return {
-        "run_id": run.run_id,
+        "run_id": run_id,
+        "coalesced_with": run.run_id if run.run_id != run_id else None,
         "topic": run.topic,
         "status": run.status,
         "elapsed_seconds": run.elapsed_seconds,
-        "events_count": len(run.bridge.events),
+        "events_count": len(await asyncio.to_thread(run.events)) if shared else len(run.bridge.events),
         "report_path": run.report_path,
         "charts": run.charts,
         "error": run.error,
+        "timings": _timings(run),
+        "profile": run.profile,
+        "exports": run.exports,
     }
 
 
+def _timings(run) -> dict | None:
+    """A finished run's timings, or those recorded so far by this process."""
+    if run.timings is not None:
+        return run.timings
+    timings = timings_for(run.run_id)
+    return timings.summary() if timings else None
+
+
 @router.get("/report/{run_id}")
-async def crew_report(run_id: str):
-    """Return the completed markdown report content."""
-    run = run_manager.get_run(run_id)
+async def crew_report(run_id: str, request: Request, partial: bool = False):
+    """Return the completed markdown report content.
+
+    With ?partial=1 a run still in progress returns the report assembled so
+    far (research, then charts) instead of "Report not ready".
+    """
+    run = await _find_run(run_id)
     if not run:
         return {"error": "Run not found"}
     if not run.report_path:
+        if partial and run.partial_report:
+            return {
+                "run_id": run_id,
+                "report": run.partial_report,
+                "charts": run.charts,
+                "partial": True,
+                "stage": run.partial_stage,
+            }
         return {"error": "Report not ready", "status": run.status}
 
-    # report_path is like "/output/report.md" — resolve to filesystem
-    filename = run.report_path.replace("/output/", "")
-    filepath = OUTPUT_DIR / filename
-    if not filepath.exists():
-        return {"error": "Report file not found"}
+    payload = report_payloads.get(run_id)
+    if payload is None:
+        # report_path is like "/output/reports/{run_id}.md"
+        report = await artifacts.read_text(run.report_path.removeprefix("/output/"))
+        if report is None:
+            return {"error": "Report file not found"}
+        body = {"run_id": run_id, "report": report, "charts": run.charts, "html": run.report_html, "exports": run.exports}
+        payload = Payload(json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode(), "application/json")
+        # report_path is set before the HTML and exports — cache only a finished run's
+        if run.status not in IN_FLIGHT:
+            report_payloads.put(run_id, payload)
+    return payload.respond(request, REVALIDATE)
+
+
+@router.get("/export/{run_id}")
+async def crew_export(run_id: str, request: Request, format: str = "html"):
+    """Download the finished report as one file — standalone HTML or a zip bundle."""
+    run = await _find_run(run_id)
+    if not run:
+        return {"error": "Run not found"}
+    if format not in ("html", "zip"):
+        return {"error": "format must be html or zip"}
+    if not run.exports:
+        return {"error": "Export not ready", "status": run.status}
 
-    return {
-        "run_id": run_id,
-        "report": filepath.read_text(encoding="utf-8"),
-        "charts": run.charts,
-    }
+    response = await artifacts.serve(request, run.exports[format].removeprefix("/output/"))
+    if response.status_code == 200:
+        response.headers["Content-Disposition"] = f'attachment; filename="report-{run_id}.{format}"'
+    return response
 
 
 @router.get("/runs")
@@ -87,28 +230,20 @@ async def list_runs():
 @router.get("/events/{run_id}")
 async def crew_events(run_id: str):
     """Debug: return all events for a run."""
-    run = run_manager.get_run(run_id)
+    run = await _find_run(run_id)
     if not run:
         return {"error": "Run not found"}
-    return {"events": run.bridge.events}
-
+    if isinstance(run, event_log.SharedRun):
+        return {"events": await asyncio.to_thread(run.events)}
+    return {"events": [event.to_wire() for event in run.bridge.events]}
 
-@ws_router.websocket("/stream/{run_id}")
-async def crew_stream(websocket: WebSocket, run_id: str):
-    """Real-time event stream for a crew run."""
-    await websocket.accept()
-
-    run = run_manager.get_run(run_id)
-    if not run:
-        await websocket.send_json({"type": "error", "message": "Run not found"})
-        await websocket.close()
-        return
 
+async def _stream_bridge(websocket: WebSocket, bridge, since: int = 0, snapshot: bool = False):
     try:
         # Stream all events (past and future) using index-based consumer
         # This handles both replay and live streaming in one pass
-        async for event in run.bridge.consume_from(0):
-            await websocket.send_json(event)
+        async for event in bridge.consume_from(since, snapshot=snapshot):
+            await websocket.send_json(event.to_wire())
 
         # All events delivered — wait for the client to close
         while True:
@@ -123,194 +258,32 @@ async def crew_stream(websocket: WebSocket, run_id: str):
             pass
 
 
-async def _run_real_crew(run):
-    """Execute a real CrewAI crew run with Ollama models."""
-    from datetime import datetime, timezone
-    from backend.crew.crew import build_crew
-    from backend.config import CHARTS_DIR
-
-    run.status = "running"
-    run.started_at = datetime.now(timezone.utc)
-    bridge = run.bridge
-
-    bridge.push_event({
-        "type": "agent_start",
-        "agent": "manager",
-        "role": "Senior Research Director",
-        "model": "gemma3:27b",
-        "vm": "orchestrator",
-        "task_summary": f"Orchestrating research on: {run.topic}",
-    })
+@ws_router.websocket("/stream/{run_id}")
+async def crew_stream(websocket: WebSocket, run_id: str, since: int = 0, snapshot: bool = False):
+    """Real-time event stream for a crew run.
+
+    By default every event from the start of the run; ?since=N resumes
+    after the first N (a reconnect), and ?snapshot=1 sends a `snapshot`
+    message of the run's current state followed by only the events after
+    it. A run started by another API worker process is streamed from its
+    shared event log (SHARED_EVENTS).
+    """
+    await websocket.accept()
 
-    # Snapshot existing charts BEFORE the run so we only report new ones
-    existing_charts = set(f.name for f in CHARTS_DIR.glob("*.png"))
+    run = run_manager.get_run(run_id)
+    if not run:
+        bridge = event_log.mirror(run_id) if SHARED_EVENTS else None
+        if bridge is None:
+            await websocket.send_json({"type": "error", "message": "Run not found"})
+            await websocket.close()
+            return
+        await _stream_bridge(websocket, bridge, since, snapshot)
+        return
 
+    run.viewers += 1
     try:
-        crew = build_crew(
-            topic=run.topic,
-            bridge=bridge,
-        )
-
-        # CrewAI runs synchronously — must run in a thread
-        result = await asyncio.to_thread(crew.kickoff)
-
-        run.completed_at = datetime.now(timezone.utc)
-        elapsed = run.elapsed_seconds or 0
-
-        # Collect only NEW chart paths created during this run
-        run.charts = [
-            f"/output/charts/{f.name}"
-            for f in CHARTS_DIR.glob("*.png")
-            if f.name not in existing_charts
-        ]
-
-        # Extract the best report content from multiple sources.
-        # The writer LLM often botches the FileTool call (e.g., saving
-        # the filename as content), so we check multiple sources and
-        # pick the longest/best one.
-        from backend.config import OUTPUT_DIR
-        report_file = OUTPUT_DIR / "report.md"
-
-        candidates = []
-
-        # Source 1: File saved by FileTool (if it looks like real content)
-        if report_file.exists():
-            file_content = report_file.read_text(encoding="utf-8").strip()
-            if len(file_content) > 200:
-                candidates.append(file_content)
-
-        # Source 2: Crew result
-        raw_result = str(result).strip()
-        if len(raw_result) > 200:
-            candidates.append(raw_result)
-
-        # Source 3: Longest writer agent_output from the event stream
-        writer_outputs = [
-            e.get("content", "")
-            for e in bridge.events
-            if e.get("agent") == "writer" and e.get("type") == "agent_output"
-        ]
-        if writer_outputs:
-            longest = max(writer_outputs, key=len)
-            if len(longest) > 200:
-                candidates.append(longest)
-
-        # Pick the longest candidate — that's almost certainly the real report
-        if candidates:
-            best = max(candidates, key=len)
-            report_content = _clean_report(best, chart_files=run.charts)
-            report_file.write_text(report_content, encoding="utf-8")
-            run.report_path = "/output/report.md"
-        else:
-            logger.warning("No report content found from any source")
-
-        # Emit chart_created events for each new chart
-        for chart_path in run.charts:
-            bridge.push_event({
-                "type": "chart_created",
-                "agent": "visualizer",
-                "chart_title": chart_path.split("/")[-1].replace(".png", "").replace("_", " ").title(),
-                "path": chart_path,
-            })
-
-        bridge.push_event({
-            "type": "crew_complete",
-            "total_seconds": round(elapsed, 1),
-            "report_path": run.report_path,
-            "charts": run.charts,
-        })
-        run.status = "completed"
-
-    except Exception as e:
-        run.status = "error"
-        run.error = str(e)
-        bridge.push_event({
-            "type": "error",
-            "agent": "system",
-            "message": f"Crew execution failed: {e}",
-            "recoverable": False,
-        })
-
+        await _stream_bridge(websocket, run.bridge, since, snapshot)
     finally:
-        bridge.mark_complete()
-
-
-def _clean_report(content: str, chart_files: list[str] = None) -> str:
-    """Strip LLM artifacts from report content and fix image references."""
-    import re
-    content = content.strip()
-
-    # Remove "Thought: ..." preamble before the actual markdown
-    # The real report starts at the first markdown heading
-    thought_match = re.match(r'^Thought:.*?(?=^#)', content, flags=re.DOTALL | re.MULTILINE)
-    if thought_match:
-        content = content[thought_match.end():].strip()
-
-    # Also handle "Thought: ..." followed by ```markdown
-    thought_match2 = re.match(r'^Thought:.*?(?=```)', content, flags=re.DOTALL)
-    if thought_match2:
-        content = content[thought_match2.end():].strip()
-
-    # Remove ```markdown ... ``` wrapping
-    if content.startswith("```markdown"):
-        content = content[len("```markdown"):].strip()
-    elif content.startswith("```md"):
-        content = content[len("```md"):].strip()
-    elif content.startswith("```"):
-        content = content[3:].strip()
-    if content.endswith("```"):
-        content = content[:-3].strip()
-
-    # Fix image references to match actual chart files on disk
-    if chart_files:
-        content = _fix_chart_refs(content, chart_files)
-
-    return content
-
-
-def _fix_chart_refs(content: str, chart_files: list[str]) -> str:
-    """Fix markdown image references to point to actual chart files.
-
-    The writer LLM often gets paths wrong — wrong extension (.json instead of .png),
-    wrong prefix, missing path, etc. We match by fuzzy filename stem comparison.
-    """
-    import re
-    from pathlib import Path
-
-    # Build a lookup from stem fragments to actual paths
-    # e.g. "cdn_market_share_2023" -> "/output/charts/cdn_market_share_2023.png"
-    stem_to_path = {}
-    for chart_path in chart_files:
-        stem = Path(chart_path).stem  # e.g. "cdn_market_share_2023"
-        stem_to_path[stem] = chart_path
-        # Also index without common suffixes the model adds
-        stem_to_path[stem.lower()] = chart_path
-
-    def replace_image(match):
-        full_match = match.group(0)
-        alt = match.group(1)
-        ref_path = match.group(2)
-
-        # Extract the stem from whatever the writer put
-        ref_stem = Path(ref_path).stem  # strips .json, .png, etc.
-
-        # Try exact match
-        if ref_stem in stem_to_path:
-            return f"![{alt}]({stem_to_path[ref_stem]})"
-        if ref_stem.lower() in stem_to_path:
-            return f"![{alt}]({stem_to_path[ref_stem.lower()]})"
-
-        # Try fuzzy: find the chart whose stem contains or is contained by ref_stem
-        for stem, path in stem_to_path.items():
-            if stem in ref_stem.lower() or ref_stem.lower() in stem:
-                return f"![{alt}]({path})"
-
-        # No match — leave as-is but fix to .png extension
-        fixed = re.sub(r'\.\w+$', '.png', ref_path)
-        if not fixed.endswith('.png'):
-            fixed += '.png'
-        return f"![{alt}]({fixed})"
-
-    # Match markdown image syntax: ![alt](path)
-    content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', replace_image, content)
-    return content
+        run.viewers -= 1
+        if AUTO_CANCEL_ABANDONED and run.viewers == 0 and run.status in IN_FLIGHT:
+            asyncio.create_task(_cancel_if_abandoned(run))
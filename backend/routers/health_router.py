@@ -1,12 +1,16 @@
 """Health and warmup endpoints."""
 
 from fastapi import APIRouter
+import asyncio
 import httpx
 
 from backend.config import (
     MANAGER_BASE_URL, SPECIALIST_BASE_URL,
-    MANAGER_MODEL, SPECIALIST_MODEL, MOCK_MODE,
+    MANAGER_MODEL, SPECIALIST_MODEL, MOCK_MODE, EXECUTOR_MODE,
+    MODEL_KEEP_ALIVE, MODEL_IDLE_KEEP_ALIVE,
 )
+from backend.crew.residency import residency
+from backend.crew.routing import ROUTES
 
 router = APIRouter()
 
@@ -24,6 +28,11 @@ async def _check_ollama(base_url: str) -> dict:
     return {"reachable": False, "models": []}
 
 
+def _routes() -> dict:
+    """Model and VM serving each agent."""
+    return {agent: {"model": route.label, "vm": route.vm} for agent, route in ROUTES.items()}
+
+
 @router.get("/health")
 async def health():
     if MOCK_MODE:
@@ -32,6 +41,7 @@ async def health():
             "mock_mode": True,
             "orchestrator": {"ollama": True, "model": MANAGER_MODEL},
             "specialist": {"ollama": True, "model": SPECIALIST_MODEL},
+            "routes": _routes(),
         }
 
     orch = await _check_ollama(MANAGER_BASE_URL)
@@ -46,30 +56,49 @@ async def health():
         "mock_mode": False,
         "orchestrator": {"ollama": orch["reachable"], "models": orch["models"]},
         "specialist": {"ollama": spec["reachable"], "models": spec["models"]},
+        "routes": _routes(),
     }
 
 
 @router.post("/warmup")
 async def warmup():
-    """Send a short prompt to both Ollama endpoints to pre-load models into VRAM."""
+    """Pre-load every routed model into VRAM with an explicit keep_alive."""
     if MOCK_MODE:
         return {"orchestrator_ms": 0, "specialist_ms": 0, "mock_mode": True}
 
-    import time
+    loads = await asyncio.to_thread(residency.warm_all)
+
+    return {"orchestrator_ms": loads.get("orchestrator", 0), "specialist_ms": loads.get("specialist", 0), "loads_ms": loads}
+
+
+async def _residency_stats() -> dict:
+    stats = residency.stats()
+    if EXECUTOR_MODE == "workers":
+        # Runs pin models in the worker processes; count them from the job queue
+        from backend.crew.jobs import job_queue
+        jobs = await asyncio.to_thread(job_queue().stats)
+        stats["active_runs"] = jobs.get("queued", 0) + jobs.get("running", 0)
+        stats["keep_alive"] = MODEL_KEEP_ALIVE if stats["active_runs"] else MODEL_IDLE_KEEP_ALIVE
+    return stats
 
-    async def _warmup(base_url: str, model: str) -> int:
-        start = time.monotonic()
-        try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                await client.post(
-                    f"{base_url}/api/generate",
-                    json={"model": model.split("/")[-1], "prompt": "Hello", "stream": False},
-                )
-        except Exception:
-            return -1
-        return int((time.monotonic() - start) * 1000)
 
-    orch_ms = await _warmup(MANAGER_BASE_URL, MANAGER_MODEL)
-    spec_ms = await _warmup(SPECIALIST_BASE_URL, SPECIALIST_MODEL)
+@router.get("/residency")
+async def residency_status():
+    """Model residency state — pinned runs, cold-start count, last load times.
 
-    return {"orchestrator_ms": orch_ms, "specialist_ms": spec_ms}
+    active_runs counts this process's runs, or every queued and running job
+    with EXECUTOR_MODE=workers; cold starts and load times are this
+    process's own.
+    """
+    if MOCK_MODE:
+        return {"mock_mode": True, **await _residency_stats()}
+
+    orch, spec = await asyncio.gather(
+        asyncio.to_thread(residency.loaded_models, MANAGER_BASE_URL),
+        asyncio.to_thread(residency.loaded_models, SPECIALIST_BASE_URL),
+    )
+    return {
+        **await _residency_stats(),
+        "orchestrator": {"loaded": sorted(orch) if orch is not None else None},
+        "specialist": {"loaded": sorted(spec) if spec is not None else None},
+    }
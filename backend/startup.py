@@ -0,0 +1,41 @@
+"""Background warm-up of the heavy imports, after the server is accepting connections.
+
+crewai, litellm and matplotlib take seconds to import. The API server no
+longer imports them at startup, so health checks and --reload cycles are
+fast; this preloads them in a thread so the first crew run doesn't pay
+for it either.
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+
+from backend.config import MOCK_MODE
+
+logger = logging.getLogger("startup")
+
+# Mock runs only render charts; real runs need the full crew stack
+MOCK_MODULES = ["backend.tools.chart_tool", "backend.crew.mock_runner"]
+CREW_MODULES = ["backend.tools.chart_tool", "backend.crew.crew", "litellm.llms.custom_httpx.http_handler"]
+
+
+def warm_imports(modules: list[str] | None = None) -> dict[str, float]:
+    """Import each module, returning seconds spent per module."""
+    modules = modules or (MOCK_MODULES if MOCK_MODE else CREW_MODULES)
+    timings = {}
+    for name in modules:
+        start = time.monotonic()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"Warm-up import of {name} failed: {e}")
+            continue
+        timings[name] = round(time.monotonic() - start, 3)
+    logger.info(f"Warm-up imports done: {timings}")
+    return timings
+
+
+def start_warmup() -> asyncio.Task:
+    """Schedule warm_imports on a worker thread from the running event loop."""
+    return asyncio.get_running_loop().create_task(asyncio.to_thread(warm_imports))
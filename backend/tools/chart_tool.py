@@ -5,11 +5,15 @@ from pathlib import Path
 
 import matplotlib
 matplotlib.use("Agg")  # Non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
+import matplotlib.style
+from matplotlib.figure import Figure
 
 from backend.config import CHARTS_DIR
 
+# Applied once at import: figures are built with the object-oriented API
+# (no pyplot global state), so charts can be rendered from several threads.
+matplotlib.style.use("dark_background")
+
 # Akamai palette
 COLORS = ["#009BDE", "#00D4AA", "#6366F1", "#EAB308", "#EF4444", "#94A3B8"]
 
@@ -27,8 +31,8 @@ def generate_chart(
     """Generate a chart and return the file path relative to output/."""
     # Clean filename — strip any extension the LLM may have added
     filename = Path(filename).stem
-    plt.style.use("dark_background")
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
     fig.patch.set_facecolor("#0D1B2A")
     ax.set_facecolor("#0D1B2A")
 
@@ -111,6 +115,5 @@ def generate_chart(
     filepath = CHARTS_DIR / f"{safe_filename}.png"
     fig.tight_layout()
     fig.savefig(filepath, dpi=150, bbox_inches="tight", facecolor="#0D1B2A")
-    plt.close(fig)
 
     return f"charts/{safe_filename}.png"
@@ -0,0 +1,313 @@
+"""Fake Ollama server for load tests — drives the real crew path without GPUs.
+
+Speaks enough of the Ollama API for LiteLLM, the health check and the
+residency manager: /api/generate and /api/chat (streaming and not),
+/api/show, /api/tags, /api/ps and /api/version. Replies are canned ReAct
+turns picked from the prompt ("You are <role>."): the manager delegates each
+task to the matching coworker and then returns its result, the analyst
+emits a valid {"charts": [...]} object, the visualizer calls ChartTool and
+the writer calls FileTool before answering. That is enough for a full
+hierarchical run through build_crew.
+
+Timing is shaped by configurable distributions: prompt evaluation at
+--prompt-tps, time to first token drawn log-normally around --ttft-ms, and
+generation at --tps tokens/s (also log-normal). --error-rate injects 500s.
+
+    python bench/fake_ollama.py --port 11500 --ttft-ms 400 --tps 40
+    MANAGER_BASE_URL=http://127.0.0.1:11500 SPECIALIST_BASE_URL=http://127.0.0.1:11500 \\
+        uvicorn backend.main:app --port 8000
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARTS = [
+    {
+        "chart_type": "bar",
+        "title": "Market Share by Provider",
+        "labels": ["Provider A", "Provider B", "Provider C", "Provider D"],
+        "values": [34.0, 27.5, 21.0, 17.5],
+        "unit": "%",
+        "filename": "bench_market_share",
+    },
+    {
+        "chart_type": "line",
+        "title": "Market Size Growth",
+        "labels": ["2022", "2023", "2024", "2025"],
+        "values": [8.2, 14.6, 24.1, 38.5],
+        "unit": "$B",
+        "filename": "bench_market_growth",
+    },
+]
+
+RESEARCH = """## Key Players
+- Provider A leads with roughly a third of deployments, driven by existing CDN footprint.
+- Provider B and Provider C compete on GPU availability and price per hour.
+- Provider D is the fastest-growing entrant.
+
+## Market Data
+The market grew from $8.2B in 2022 to an estimated $38.5B in 2025, a compound rate near 67%.
+
+## Trends
+1. Inference moves to the edge to cut latency below 50 ms.
+2. Smaller quantized models make mid-range GPUs viable.
+3. Pricing pressure compresses margins for general-purpose clouds.
+
+## Competitive Analysis
+Provider A wins on reach, Provider B on ecosystem, Provider C on price, and Provider D on flexibility."""
+
+REPORT = """# Market Analysis Report
+
+## Executive Summary
+The edge inference market is growing quickly, led by four providers with distinct strengths.
+Pricing pressure and smaller models are moving workloads closer to users.
+
+## Market Overview
+![Market Size Growth](./charts/bench_market_growth.png)
+
+Demand grew roughly 67% a year between 2022 and 2025.
+
+## Competitive Landscape
+![Market Share by Provider](./charts/bench_market_share.png)
+
+Provider A leads on share while Provider D grows fastest.
+
+## Key Trends
+- Latency-sensitive inference moves to the edge.
+- Quantized models make mid-range GPUs viable.
+
+## Strategic Recommendations
+1. Compete on latency and regional coverage.
+2. Offer price-per-token plans for small models.
+
+## Conclusion
+The market rewards providers that pair GPU capacity with a wide edge footprint."""
+
+# (keyword in the manager's current task, coworker role) — first match wins
+DELEGATION_RULES = [
+    ("ChartTool", "Data Visualization Specialist"),
+    ("chart datasets", "Data Analyst"),
+    ("markdown report", "Report Writer"),
+    ("", "Market Research Specialist"),
+]
+
+_ROLE = re.compile(r"You are ([^.\n]+)\.")
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+class Profile:
+    """Latency model shared by all handler threads."""
+
+    def __init__(self, args):
+        self.ttft = args.ttft_ms / 1000
+        self.ttft_sigma = args.ttft_sigma
+        self.tps = args.tps
+        self.tps_sigma = args.tps_sigma
+        self.prompt_tps = args.prompt_tps
+        self.error_rate = args.error_rate
+        self.rng = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def draw(self, prompt_tokens: int) -> tuple[float, float, bool]:
+        """(seconds to first token, tokens per second, fail?) for one request."""
+        with self.lock:
+            self.requests += 1
+            ttft = self.ttft * math.exp(self.rng.gauss(0, self.ttft_sigma)) + prompt_tokens / self.prompt_tps
+            tps = max(1.0, self.tps * math.exp(self.rng.gauss(0, self.tps_sigma)))
+            fail = self.rng.random() < self.error_rate
+        return ttft, tps, fail
+
+
+def _after_current_task(prompt: str) -> str:
+    idx = prompt.rfind("Current Task:")
+    return prompt[idx:] if idx >= 0 else prompt
+
+
+def _last_observation(text: str) -> str:
+    idx = text.rfind("Observation:")
+    observation = text[idx + len("Observation:"):] if idx >= 0 else ""
+    # Stop at the next turn the executor appended after the tool result
+    return re.split(r"\n\s*Thought:", observation, maxsplit=1)[0].strip()
+
+
+def reply_for(prompt: str, structured: bool) -> str:
+    """A canned ReAct turn for whichever agent sent this prompt."""
+    match = _ROLE.search(prompt)
+    role = match.group(1).strip() if match else ""
+    turn = _after_current_task(prompt)
+    observations = turn.count("Observation:")
+
+    if role == "Senior Research Director":
+        if observations:
+            return f"Thought: The coworker delivered the result.\nFinal Answer: {_last_observation(turn)}"
+        coworker = next(r for keyword, r in DELEGATION_RULES if keyword in turn)
+        action_input = json.dumps({
+            "task": turn[len("Current Task:"):].strip()[:1500],
+            "context": "Complete the task exactly as described and return the full result.",
+            "coworker": coworker,
+        })
+        return f"Thought: I will delegate this to the {coworker}.\nAction: Delegate work to coworker\nAction Input: {action_input}"
+
+    if role == "Data Analyst":
+        payload = json.dumps({"charts": CHARTS})
+        return payload if structured else f"Thought: I have the datasets.\nFinal Answer: {payload}"
+
+    if role == "Data Visualization Specialist":
+        if observations < len(CHARTS):
+            action_input = json.dumps({"chart_data": json.dumps(CHARTS[observations])})
+            return f"Thought: Render the next chart.\nAction: ChartTool\nAction Input: {action_input}"
+        paths = "\n".join(f"- charts/{c['filename']}.png" for c in CHARTS)
+        return f"Thought: All charts are rendered.\nFinal Answer: Generated charts:\n{paths}"
+
+    if role == "Report Writer":
+        if not observations:
+            action_input = json.dumps({"filename": "report", "content": REPORT})
+            return f"Thought: Save the report.\nAction: FileTool\nAction Input: {action_input}"
+        return f"Thought: The report is saved.\nFinal Answer: {REPORT}"
+
+    return f"Thought: I now can give a great answer\nFinal Answer: {RESEARCH}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    profile: Profile = None  # set by main()
+    models: list[str] = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, body: dict, status: int = 200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._json({"models": [{"name": m, "model": m} for m in self.models]})
+        elif self.path == "/api/ps":
+            self._json({"models": [{"name": m, "model": m} for m in self.models]})
+        elif self.path == "/api/version":
+            self._json({"version": "0.0.0-fake"})
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        body = self._body()
+        if self.path == "/api/show":
+            self._json({
+                "details": {"family": "fake"},
+                "model_info": {"general.architecture": "fake", "fake.context_length": 32768},
+                "capabilities": ["completion"],
+            })
+        elif self.path in ("/api/generate", "/api/chat"):
+            self._generate(body, chat=self.path == "/api/chat")
+        else:
+            self._json({"error": "not found"}, 404)
+
+    def _generate(self, body: dict, chat: bool):
+        model = body.get("model", "fake")
+        if "keep_alive" in (body.get("options") or {}):
+            # Real Ollama ignores it there, so the model's residency falls back to the default
+            print(f"warning: {self.path} got keep_alive inside options, not at the top level", flush=True)
+        if chat:
+            prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        else:
+            prompt = body.get("prompt", "")
+
+        # Residency warm-up / pin: empty prompt just loads the model
+        if not prompt:
+            self._json({"model": model, "response": "", "done": True, "done_reason": "load"})
+            return
+
+        prompt_tokens = max(1, len(prompt) // 4)
+        ttft, tps, fail = self.profile.draw(prompt_tokens)
+        time.sleep(ttft)
+        if fail:
+            self._json({"error": "injected failure"}, 500)
+            return
+
+        text = reply_for(prompt, structured=isinstance(body.get("format"), dict))
+        tokens = _TOKEN.findall(text)
+
+        def chunk(piece: str, done: bool) -> dict:
+            out = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+            if chat:
+                out["message"] = {"role": "assistant", "content": piece}
+            else:
+                out["response"] = piece
+            if done:
+                out.update({
+                    "done_reason": "stop",
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": len(tokens),
+                    "eval_duration": int(len(tokens) / tps * 1e9),
+                })
+            return out
+
+        if not body.get("stream", True):
+            time.sleep(len(tokens) / tps)
+            self._json(chunk(text, True))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write(obj: dict):
+            line = json.dumps(obj).encode() + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+
+        # Flush in ~20 ms batches rather than per token, like a real server under load
+        batch = max(1, int(tps * 0.02))
+        for i in range(0, len(tokens), batch):
+            write(chunk("".join(tokens[i:i + batch]), False))
+            time.sleep(batch / tps)
+        write(chunk("", True))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Median time to first token (excl. prompt eval)")
+    parser.add_argument("--ttft-sigma", type=float, default=0.3, help="Log-normal sigma for TTFT")
+    parser.add_argument("--tps", type=float, default=40, help="Median generation tokens/s")
+    parser.add_argument("--tps-sigma", type=float, default=0.15, help="Log-normal sigma for tokens/s")
+    parser.add_argument("--prompt-tps", type=float, default=2000, help="Prompt evaluation tokens/s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of generations answered with HTTP 500")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--models", default="gemma3:27b,gemma3:12b,qwen2.5:14b,qwen2.5:3b",
+                        help="Comma-separated models reported by /api/tags and /api/ps")
+    args = parser.parse_args()
+
+    Handler.profile = Profile(args)
+    Handler.models = [m.strip() for m in args.models.split(",") if m.strip()]
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"Fake Ollama on http://{args.host}:{args.port} "
+          f"(ttft {args.ttft_ms:.0f}ms, {args.tps:.0f} tok/s, errors {args.error_rate:.0%})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
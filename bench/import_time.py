@@ -0,0 +1,81 @@
+"""Import-time benchmark for the API server.
+
+Runs `python -X importtime -c "import backend.main"` in a fresh interpreter
+(several times, keeping the fastest), prints the slowest imports, and fails
+if the total exceeds the budget or if any module that is meant to load
+lazily (crewai, litellm, matplotlib) was imported at startup.
+
+    python bench/import_time.py                 # default budget
+    python bench/import_time.py --budget-ms 600 --runs 5
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGET = "backend.main"
+DEFAULT_BUDGET_MS = 750
+# Must not be imported until a crew run (or the background warm-up) needs them
+LAZY_MODULES = ("crewai", "litellm", "matplotlib", "chromadb")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure() -> list[tuple[str, int, int, int]]:
+    """One cold import. Returns (module, self_us, cumulative_us, depth) per import."""
+    env = dict(os.environ, WARM_IMPORTS="false")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {TARGET} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        rows = measure()
+        total = next(cum for name, _, cum, _ in rows if name == TARGET)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total_us, rows = best
+
+    print(f"import {TARGET}: {total_us / 1000:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print("\nSlowest top-level imports:")
+    top_level = sorted((r for r in rows if r[3] <= 1), key=lambda r: -r[2])[: args.top]
+    for name, _, cum, _ in top_level:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    failures = []
+    eager = sorted({name for name, *_ in rows if name.split(".")[0] in LAZY_MODULES})
+    if eager:
+        roots = sorted({name.split(".")[0] for name in eager})
+        failures.append(f"lazy modules imported at startup: {', '.join(roots)}")
+    if total_us / 1000 > args.budget_ms:
+        failures.append(f"{total_us / 1000:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
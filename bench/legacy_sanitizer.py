@@ -0,0 +1,119 @@
+"""The regex-chain sanitizer that backend/crew/sanitizer.py replaced, verbatim.
+
+Kept as the reference for bench/sanitizer_fuzz.py (differential checks)
+and bench/sanitizer_bench.py (timings). Not imported by the backend.
+"""
+
+import re
+from pathlib import Path
+
+
+def clean_content(content: str) -> str:
+    """Clean up raw CrewAI output for display in the UI."""
+    if not content:
+        return ""
+
+    # Strip ToolResult(result='...', result_as_answer=...) wrappers
+    # Match: ToolResult(result='...' followed by optional kwargs and closing paren
+    m = re.match(r"ToolResult\(result=['\"](.+)", content, flags=re.DOTALL)
+    if m:
+        inner = m.group(1)
+        # Remove trailing ', result_as_answer=...) or similar
+        inner = re.sub(r"['\"],\s*result_as_answer=\w+\)\s*$", "", inner, flags=re.DOTALL)
+        # Also handle simple closing
+        inner = re.sub(r"['\"]\)\s*$", "", inner)
+        content = inner.strip()
+
+    # Strip AgentFinish(...) wrappers
+    m = re.match(r"AgentFinish\(thought=['\"].*?['\"],\s*output=['\"](.+)", content, flags=re.DOTALL)
+    if m:
+        inner = m.group(1)
+        inner = re.sub(r"['\"]\)\s*$", "", inner)
+        content = inner.strip()
+
+    # Strip "### Assistant:" prefix that Gemma sometimes adds
+    content = re.sub(r"^###?\s*Assistant:\s*", "", content, flags=re.IGNORECASE)
+
+    # Truncate for live stream display
+    if len(content) > 1500:
+        content = content[:1500] + "... [truncated]"
+
+    return content.strip()
+
+
+def clean_report(content: str, chart_files: list[str] = None) -> str:
+    """Strip LLM artifacts from report content and fix image references."""
+    content = content.strip()
+
+    # Remove "Thought: ..." preamble before the actual markdown
+    # The real report starts at the first markdown heading
+    thought_match = re.match(r'^Thought:.*?(?=^#)', content, flags=re.DOTALL | re.MULTILINE)
+    if thought_match:
+        content = content[thought_match.end():].strip()
+
+    # Also handle "Thought: ..." followed by ```markdown
+    thought_match2 = re.match(r'^Thought:.*?(?=```)', content, flags=re.DOTALL)
+    if thought_match2:
+        content = content[thought_match2.end():].strip()
+
+    # Remove ```markdown ... ``` wrapping
+    if content.startswith("```markdown"):
+        content = content[len("```markdown"):].strip()
+    elif content.startswith("```md"):
+        content = content[len("```md"):].strip()
+    elif content.startswith("```"):
+        content = content[3:].strip()
+    if content.endswith("```"):
+        content = content[:-3].strip()
+
+    # Fix image references to match actual chart files on disk
+    if chart_files:
+        content = fix_chart_refs(content, chart_files)
+
+    return content
+
+
+def fix_chart_refs(content: str, chart_files: list[str]) -> str:
+    """Fix markdown image references to point to actual chart files.
+
+    The writer LLM often gets paths wrong — wrong extension (.json instead of .png),
+    wrong prefix, missing path, etc. We match by fuzzy filename stem comparison.
+    """
+
+    # Build a lookup from stem fragments to actual paths
+    # e.g. "cdn_market_share_2023" -> "/output/charts/cdn_market_share_2023.png"
+    stem_to_path = {}
+    for chart_path in chart_files:
+        stem = Path(chart_path).stem  # e.g. "cdn_market_share_2023"
+        stem_to_path[stem] = chart_path
+        # Also index without common suffixes the model adds
+        stem_to_path[stem.lower()] = chart_path
+
+    def replace_image(match):
+        full_match = match.group(0)
+        alt = match.group(1)
+        ref_path = match.group(2)
+
+        # Extract the stem from whatever the writer put
+        ref_stem = Path(ref_path).stem  # strips .json, .png, etc.
+
+        # Try exact match
+        if ref_stem in stem_to_path:
+            return f"![{alt}]({stem_to_path[ref_stem]})"
+        if ref_stem.lower() in stem_to_path:
+            return f"![{alt}]({stem_to_path[ref_stem.lower()]})"
+
+        # Try fuzzy: find the chart whose stem contains or is contained by ref_stem
+        for stem, path in stem_to_path.items():
+            if stem in ref_stem.lower() or ref_stem.lower() in stem:
+                return f"![{alt}]({path})"
+
+        # No match — leave as-is but fix to .png extension
+        fixed = re.sub(r'\.\w+$', '.png', ref_path)
+        if not fixed.endswith('.png'):
+            fixed += '.png'
+        return f"![{alt}]({fixed})"
+
+    # Match markdown image syntax: ![alt](path)
+    content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', replace_image, content)
+    return content
@@ -0,0 +1,222 @@
+"""Load-test driver — ramps concurrent runs and WebSocket viewers against a running server.
+
+For each concurrency level it starts --runs-per-level runs (at most `level`
+in flight), attaches --viewers WebSocket viewers to each, and reports:
+
+  runs/hour           completed runs over the level's wall time
+  event latency       viewer receive time minus the event's server timestamp
+  CPU / RSS           from the server's /metrics (process_* series)
+  error rate          failed starts, viewer errors, runs ending in error/timeout
+
+Run it against the real crew path with bench/fake_ollama.py standing in for
+the GPUs, or against MOCK_MODE for the event pipeline alone. Latencies
+compare clocks, so run the driver on the same host as the server.
+
+    python bench/fake_ollama.py --port 11500 &
+    MANAGER_BASE_URL=http://127.0.0.1:11500 SPECIALIST_BASE_URL=http://127.0.0.1:11500 \\
+        uvicorn backend.main:app --port 8000 &
+    python bench/load_test.py --levels 1,2,4 --viewers 3 --json load.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import websockets
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TOPICS = ROOT / "demo" / "sample-topics.txt"
+_METRIC = re.compile(r"^(process_cpu_seconds_total|process_resident_memory_bytes) (\S+)$", re.MULTILINE)
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class ResourceSampler:
+    """Polls /metrics for the server's CPU time and RSS."""
+
+    def __init__(self, client: httpx.AsyncClient, interval: float = 1.0):
+        self.client = client
+        self.interval = interval
+        self.rss: list[float] = []
+        self.cpu_start = self.cpu_end = None
+        self.errors = 0
+
+    async def _sample(self):
+        try:
+            text = (await self.client.get("/metrics")).text
+        except httpx.HTTPError:
+            self.errors += 1
+            return
+        values = dict(_METRIC.findall(text))
+        if "process_cpu_seconds_total" in values:
+            cpu = float(values["process_cpu_seconds_total"])
+            if self.cpu_start is None:
+                self.cpu_start = cpu
+            self.cpu_end = cpu
+        if "process_resident_memory_bytes" in values:
+            self.rss.append(float(values["process_resident_memory_bytes"]))
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            await self._sample()
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+        await self._sample()
+
+
+async def _viewer(ws_url: str, latencies: list[float], timeout: float) -> str | None:
+    """Follow one run's stream to the end. Returns the final event type, or None on error."""
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        deadline = time.monotonic() + timeout
+        while True:
+            raw = await asyncio.wait_for(ws.recv(), max(0.1, deadline - time.monotonic()))
+            received = datetime.now(timezone.utc)
+            event = json.loads(raw)
+            if "timestamp" in event:
+                latencies.append((received - datetime.fromisoformat(event["timestamp"])).total_seconds())
+            if event.get("type") in ("crew_complete", "error"):
+                return event["type"]
+
+
+async def _one_run(client, ws_base: str, topic: str, viewers: int, timeout: float, stats: dict):
+    try:
+        resp = await client.post("/api/crew/run", json={"topic": topic})
+        resp.raise_for_status()
+        run_id = resp.json()["run_id"]
+    except (httpx.HTTPError, KeyError, ValueError):
+        stats["start_errors"] += 1
+        return
+
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(_viewer(f"{ws_base}/ws/crew/stream/{run_id}", stats["latencies"], timeout) for _ in range(viewers)),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            stats["viewer_errors"] += 1
+
+    try:
+        status = (await client.get(f"/api/crew/status/{run_id}")).json().get("status")
+    except httpx.HTTPError:
+        status = None
+    if status == "completed":
+        stats["completed"] += 1
+        stats["run_seconds"].append(time.monotonic() - started)
+    else:
+        stats["run_errors"] += 1
+
+
+async def run_level(base_url: str, level: int, runs: int, viewers: int, topics: list[str], timeout: float) -> dict:
+    ws_base = re.sub(r"^http", "ws", base_url)
+    stats = {"completed": 0, "start_errors": 0, "run_errors": 0, "viewer_errors": 0,
+             "latencies": [], "run_seconds": []}
+    limits = httpx.Limits(max_connections=level * 2 + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        sampler = ResourceSampler(client)
+        stop = asyncio.Event()
+        sampling = asyncio.create_task(sampler.run(stop))
+        semaphore = asyncio.Semaphore(level)
+        topic_cycle = itertools.cycle(topics)
+
+        async def _bounded(topic):
+            async with semaphore:
+                await _one_run(client, ws_base, topic, viewers, timeout, stats)
+
+        started = time.monotonic()
+        await asyncio.gather(*(_bounded(next(topic_cycle)) for _ in range(runs)))
+        wall = time.monotonic() - started
+        stop.set()
+        await sampling
+
+    failures = stats["start_errors"] + stats["run_errors"]
+    latencies = stats["latencies"]
+    cpu = None
+    if sampler.cpu_start is not None and sampler.cpu_end is not None:
+        cpu = (sampler.cpu_end - sampler.cpu_start) / wall * 100
+    return {
+        "concurrency": level,
+        "runs": runs,
+        "viewers_per_run": viewers,
+        "completed": stats["completed"],
+        "error_rate": round(failures / runs, 3) if runs else 0.0,
+        "viewer_errors": stats["viewer_errors"],
+        "wall_seconds": round(wall, 1),
+        "runs_per_hour": round(stats["completed"] / wall * 3600, 1) if wall else 0.0,
+        "run_seconds_p50": _round(_percentile(stats["run_seconds"], 0.5), 1),
+        "events_delivered": len(latencies),
+        "event_latency_ms": {
+            q: _round(v * 1000 if v is not None else None, 1)
+            for q, v in (("p50", _percentile(latencies, 0.5)), ("p95", _percentile(latencies, 0.95)),
+                         ("p99", _percentile(latencies, 0.99)), ("max", max(latencies) if latencies else None))
+        },
+        "server_cpu_percent": _round(cpu, 1),
+        "server_rss_mb_max": _round(max(sampler.rss) / 1e6 if sampler.rss else None, 1),
+    }
+
+
+def _round(value, digits):
+    return round(value, digits) if value is not None else None
+
+
+def _print_table(results: list[dict]):
+    header = f"{'conc':>4} {'runs':>5} {'ok':>4} {'err%':>5} {'runs/h':>8} {'run p50':>8} " \
+             f"{'ev p50':>7} {'ev p99':>7} {'ev max':>7} {'cpu%':>6} {'rss MB':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        lat = r["event_latency_ms"]
+        print(f"{r['concurrency']:>4} {r['runs']:>5} {r['completed']:>4} {r['error_rate'] * 100:>5.1f} "
+              f"{r['runs_per_hour']:>8} {_fmt(r['run_seconds_p50'], 's'):>8} "
+              f"{_fmt(lat['p50'], 'ms'):>7} {_fmt(lat['p99'], 'ms'):>7} {_fmt(lat['max'], 'ms'):>7} "
+              f"{_fmt(r['server_cpu_percent'], ''):>6} {_fmt(r['server_rss_mb_max'], ''):>7}")
+
+
+def _fmt(value, unit):
+    return "-" if value is None else f"{value}{unit}"
+
+
+async def main_async(args) -> list[dict]:
+    topics = [line.strip() for line in args.topics.read_text(encoding="utf-8").splitlines() if line.strip()]
+    results = []
+    for level in args.levels:
+        runs = args.runs_per_level or level * 2
+        print(f"level {level}: {runs} runs, {args.viewers} viewers each...", flush=True)
+        results.append(await run_level(args.base_url, level, runs, args.viewers, topics, args.timeout))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(",")], default=[1, 2, 4],
+                        help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument("--runs-per-level", type=int, default=0, help="Runs per level (default 2x the level)")
+    parser.add_argument("--viewers", type=int, default=2, help="WebSocket viewers per run")
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds before a viewer gives up on a run")
+    parser.add_argument("--topics", type=Path, default=DEFAULT_TOPICS)
+    parser.add_argument("--json", type=Path, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print()
+    _print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
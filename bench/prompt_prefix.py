@@ -0,0 +1,92 @@
+"""Shared prompt prefix per agent between two recorded runs.
+
+    python bench/prompt_prefix.py                    # the two most recent archives
+    python bench/prompt_prefix.py 1a2b3c4d 5e6f7a8b  # run ids or archive paths
+    python bench/prompt_prefix.py --min-share 0.5    # exit 1 if an agent's first call shares less
+
+Ollama reuses the KV cache of a prompt prefix it has already evaluated, so
+what one run can reuse from another is the byte-identical start of each
+agent's prompt. Run archives (RECORD_RUNS) hold every LLM request body;
+this pairs each agent's calls in order across two runs on different topics
+and reports how much of each prompt is shared. A run-specific detail early
+in a prompt — the topic in the first line of a task, a timestamp in a
+backstory — shows up as a short prefix.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.crew.recorder import archive_path, list_archives, read_archive  # noqa: E402
+
+CHARS_PER_TOKEN = 4  # rough, for reading the table
+
+
+def prompt_text(request: dict | None) -> str:
+    """The text Ollama evaluates for a request, in order (chat messages or a raw prompt)."""
+    if not request:
+        return ""
+    if "messages" in request:
+        return "".join(f"<{m.get('role')}>{m.get('content') or ''}" for m in request["messages"])
+    return (request.get("system") or "") + (request.get("prompt") or "")
+
+
+def shared_prefix(a: str, b: str) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def agent_prompts(archive: str) -> tuple[str, dict[str, list[str]]]:
+    records = read_archive(archive_path(archive))
+    topic = records[0].get("topic", "?") if records else "?"
+    prompts: dict[str, list[str]] = {}
+    for record in records:
+        if record.get("kind") == "llm":
+            prompts.setdefault(record["agent"], []).append(prompt_text(record.get("request")))
+    return topic, prompts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared prompt prefix per agent between two recorded runs.")
+    parser.add_argument("runs", nargs="*", help="Two run ids or archive paths (default: the two most recent)")
+    parser.add_argument("--min-share", type=float, default=0.0,
+                        help="Fail if an agent's first call shares less than this fraction of its prompt")
+    args = parser.parse_args(argv)
+
+    runs = args.runs
+    if not runs:
+        recent = sorted(list_archives(), key=lambda a: a.get("started_at") or "", reverse=True)
+        runs = [a["run_id"] for a in recent[:2]]
+    if len(runs) != 2:
+        parser.error("need two recorded runs")
+
+    topic_a, a = agent_prompts(runs[0])
+    topic_b, b = agent_prompts(runs[1])
+    print(f"A {runs[0]}: {topic_a}\nB {runs[1]}: {topic_b}\n")
+    print(f"{'agent':<12} {'calls':>5} {'first call shared':>20} {'of prompt':>10} {'all calls shared':>17}")
+
+    failed = []
+    for agent in sorted(set(a) & set(b)):
+        pairs = list(zip(a[agent], b[agent]))
+        shared = [shared_prefix(x, y) for x, y in pairs]
+        first_share = shared[0] / max(1, min(len(pairs[0][0]), len(pairs[0][1])))
+        total_share = sum(shared) / max(1, sum(min(len(x), len(y)) for x, y in pairs))
+        print(f"{agent:<12} {len(pairs):>5} {shared[0]:>9} ch ~{shared[0] // CHARS_PER_TOKEN:>5} tok "
+              f"{first_share:>10.0%} {total_share:>17.0%}")
+        if first_share < args.min_share:
+            failed.append(agent)
+
+    if failed:
+        print(f"\nBelow {args.min_share:.0%} shared: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
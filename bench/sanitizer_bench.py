@@ -0,0 +1,88 @@
+"""Benchmark the LLM output sanitizer against the legacy regex chain.
+
+Times clean_content (every step callback) and clean_report (the final
+report) on typical and large outputs, on inputs that made the old
+patterns scale quadratically (runs of "![" with no closing bracket), and
+on chart-reference fixing with many references and charts.
+
+    python bench/sanitizer_bench.py
+    python bench/sanitizer_bench.py --scale 4      # bigger inputs
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import legacy_sanitizer as legacy  # noqa: E402
+from backend.crew import sanitizer  # noqa: E402
+
+PARAGRAPH = (
+    "The edge inference market grew from $8.2B in 2022 to an estimated $38.5B in 2025. "
+    "Provider A leads on reach, Provider B on ecosystem, and Provider C on price.\n\n"
+)
+
+
+def _report(n_paragraphs: int, refs: list[str]) -> str:
+    body = [f"## Section {i}\n\n{PARAGRAPH}" for i in range(n_paragraphs)]
+    for i, ref in enumerate(refs):
+        body.insert(i * len(body) // max(1, len(refs)), f"![Figure {i}](./charts/{ref}.json)\n\n")
+    return "Thought: I now have everything.\n```markdown\n# Report\n\n" + "".join(body) + "```"
+
+
+def cases(scale: int) -> list[tuple[str, str, tuple]]:
+    """(name, function name, args) — args are shared by both implementations."""
+    charts = [f"/output/charts/{topic}_{metric}_{year}.png"
+              for topic in ("market", "cost", "adoption", "latency", "revenue")
+              for metric in ("share", "growth", "by_region", "per_gpu_hour")
+              for year in (2023, 2024)]
+    fuzzy_refs = [f"fig_{c.split('/')[-1][:-4]}_v2" for c in charts[:20]]
+    many_charts = [f"/output/charts/chart_{i}_series_{i % 7}.png" for i in range(100 * scale)]
+    many_refs = [f"figure_{i}_series_{i % 7}" for i in range(0, 300 * scale, 3)]
+    step = "ToolResult(result='" + PARAGRAPH * 10 + "', result_as_answer=False)"
+    return [
+        ("step output, 2 KB", "clean_content", (step,)),
+        ("step output, 100 KB", "clean_content", ("ToolResult(result='" + PARAGRAPH * 600 * scale + "')",)),
+        ("AgentFinish, 1 MB", "clean_content",
+         ("AgentFinish(thought='" + PARAGRAPH * 3000 * scale + "', output='" + PARAGRAPH * 3000 * scale + "')",)),
+        ("report 50 KB, 20 fuzzy refs, 40 charts", "clean_report", (_report(300 * scale, fuzzy_refs), charts)),
+        (f"report, {len(many_refs)} refs x {len(many_charts)} charts", "clean_report",
+         (_report(50, many_refs), many_charts)),
+        ('"![" x 4k, no closing bracket', "clean_report", ("# R\n" + "![" * 4000 * scale, charts)),
+        ('"![" x 16k, no closing bracket', "clean_report", ("# R\n" + "![" * 16000 * scale, charts)),
+        ('"![a](" x 16k, no closing paren', "clean_report", ("# R\n" + "![a](x" * 16000 * scale, charts)),
+    ]
+
+
+def best_of(fn, args, min_seconds: float = 0.2, max_runs: int = 1000) -> float:
+    """Fastest of repeated calls, in ms."""
+    best, spent, runs = float("inf"), 0.0, 0
+    while runs < max_runs and (spent < min_seconds or runs < 3):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+        if elapsed > 2:
+            break  # one slow run is enough
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="Input size multiplier")
+    args = parser.parse_args()
+
+    print(f"{'case':<44} {'size':>9} {'legacy ms':>10} {'new ms':>9} {'speedup':>8}")
+    print("-" * 84)
+    for name, fn_name, fn_args in cases(args.scale):
+        size = len(fn_args[0])
+        old = best_of(getattr(legacy, fn_name), fn_args)
+        new = best_of(getattr(sanitizer, fn_name), fn_args)
+        print(f"{name:<44} {size / 1024:>7.0f}KB {old:>10.3f} {new:>9.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Fuzz the LLM output sanitizer (backend/crew/sanitizer.py).
+
+Generates random agent outputs and reports from the fragments models
+actually produce — ToolResult / AgentFinish wrappers, "### Assistant:",
+Thought preambles, code fences, image references with wrong paths and
+extensions — plus random noise, and checks:
+
+  differential  clean_content / clean_report (without chart fixing) give
+                exactly what the legacy regex chain gave
+  charts        every image reference resolves to a chart that exists, or
+                to a .png; exact stems resolve to their own chart; reports
+                made of image references resolve exactly as legacy does
+                (so a reference sharing only a word with a chart, like
+                cdn_latency vs cdn_market_share, stays unresolved)
+  time          no single call takes longer than --max-ms
+
+    python bench/sanitizer_fuzz.py                  # 20k cases
+    python bench/sanitizer_fuzz.py --cases 200000 --seed 7
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path, PurePosixPath
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import legacy_sanitizer as legacy  # noqa: E402
+from backend.crew import sanitizer  # noqa: E402
+
+FRAGMENTS = [
+    "ToolResult(result='", 'ToolResult(result="', "', result_as_answer=False)", '", result_as_answer=True)',
+    "')", '")', ")", "'", '"', ",", " ", "\n", "\t", "  \n ",
+    "AgentFinish(thought='", "', output='", '", output="', "output=", "thought=",
+    "### Assistant:", "## assistant: ", "###Assistant:", "Thought: ", "Final Answer: ",
+    "```markdown\n", "```md\n", "```", "\n# Title\n", "#", "## Section\n",
+    "![Chart](./charts/market_share.png)", "![x](charts/growth.json)", "![](", "![a]", "](", "![",
+    "Market share grew 12% in 2024.", "résumé – naïve 🚀", "\\", "\r\n",
+]
+STEMS = ["market_share", "market_growth_2024", "cost_comparison", "Revenue_By_Region", "q3", "edge_ai_adoption",
+         "cdn_market_share", "edge_growth"]
+# (document, charts) pairs resolved against legacy before the random cases
+FIXED_CHART_CASES = [
+    ("![x](charts/cdn_latency.png)", ["/output/charts/cdn_market_share.png", "/output/charts/edge_growth.png"]),
+]
+
+
+def random_text(rng: random.Random, max_parts: int) -> str:
+    parts = []
+    for _ in range(rng.randint(0, max_parts)):
+        if rng.random() < 0.8:
+            parts.append(rng.choice(FRAGMENTS))
+        else:
+            parts.append("".join(chr(rng.randint(32, 0x24F)) for _ in range(rng.randint(1, 20))))
+    return "".join(parts)
+
+
+def random_wrapped(rng: random.Random) -> str:
+    """Something shaped like a real wrapped step output."""
+    body = random_text(rng, 12)
+    shape = rng.randrange(4)
+    q = rng.choice("'\"")
+    if shape == 0:
+        return f"ToolResult(result={q}{body}{q}, result_as_answer={rng.choice(['False', 'True'])})"
+    if shape == 1:
+        return f"AgentFinish(thought={q}{random_text(rng, 4)}{q},{' ' * rng.randint(0, 2)}output={q}{body}{q})"
+    if shape == 2:
+        return f"{rng.choice(['### Assistant:', '## Assistant: '])}{body}"
+    return body
+
+
+def random_ref(rng: random.Random, charts: list[str]) -> str:
+    """An image reference the writer might produce for one of the charts (or none)."""
+    stem = PurePosixPath(rng.choice(charts)).stem
+    ref = rng.choice([stem, stem.upper(), f"{stem}_chart", stem[: max(1, len(stem) // 2)],
+                      f"fig_{stem}", "unrelated_figure", f"{stem.split('_')[0]}_latency",
+                      f"{stem.split('_')[-1]}_by_region"])
+    prefix = rng.choice(["./charts/", "charts/", "/output/charts/", ""])
+    ext = rng.choice([".png", ".json", ".jpg", ""])
+    return f"{prefix}{ref}{ext}"
+
+
+def random_report(rng: random.Random, charts: list[str]) -> tuple[str, list[str]]:
+    lines, refs = [], []
+    if rng.random() < 0.5:
+        lines.append("Thought: " + random_text(rng, 4))
+    if rng.random() < 0.3:
+        lines.append(rng.choice(["```markdown", "```md", "```"]))
+    lines.append("# Report")
+    for _ in range(rng.randint(0, 6)):
+        if rng.random() < 0.5 and charts:
+            ref = random_ref(rng, charts)
+            refs.append(ref)
+            lines.append(f"![{random_text(rng, 1)[:20].replace(']', '')}]({ref})")
+        else:
+            lines.append(random_text(rng, 6))
+    if rng.random() < 0.3:
+        lines.append("```")
+    return "\n".join(lines), refs
+
+
+def random_refs(rng: random.Random, charts: list[str]) -> str:
+    """A report of plain image references — both implementations' patterns match them alike."""
+    return "\n\n".join(f"![Figure {i}]({random_ref(rng, charts)})" for i in range(rng.randint(1, 8)))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ms", type=float, default=50.0, help="Fail if any single call is slower")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = []
+    slowest = 0.0
+
+    def fail(kind, text, detail):
+        failures.append((kind, text, detail))
+
+    for doc, charts in FIXED_CHART_CASES:
+        if sanitizer.fix_chart_refs(doc, charts) != legacy.fix_chart_refs(doc, charts):
+            fail("charts", doc, f"got {sanitizer.fix_chart_refs(doc, charts)!r}, "
+                                f"legacy {legacy.fix_chart_refs(doc, charts)!r}")
+
+    for i in range(args.cases):
+        text = random_wrapped(rng) if i % 2 else random_text(rng, 30)
+
+        got, ms = timed(sanitizer.clean_content, text)
+        slowest = max(slowest, ms)
+        want = legacy.clean_content(text)
+        if got != want:
+            fail("clean_content", text, f"got {got!r}, legacy {want!r}")
+
+        report, ms = timed(sanitizer.clean_report, text)
+        slowest = max(slowest, ms)
+        if report != legacy.clean_report(text):
+            fail("clean_report", text, f"got {report!r}, legacy {legacy.clean_report(text)!r}")
+
+        charts = [f"/output/charts/{s}.png" for s in rng.sample(STEMS, rng.randint(1, len(STEMS)))]
+        doc, refs = random_report(rng, charts)
+        fixed, ms = timed(sanitizer.clean_report, doc, charts)
+        slowest = max(slowest, ms)
+        for ref in sanitizer._MD_IMAGE.findall(fixed):
+            path = ref[1]
+            if path not in charts and not path.endswith(".png"):
+                fail("charts", doc, f"unresolved {path!r}")
+        refs_doc = random_refs(rng, charts)
+        got, want = sanitizer.fix_chart_refs(refs_doc, charts), legacy.fix_chart_refs(refs_doc, charts)
+        if got != want:
+            fail("charts", refs_doc, f"got {got!r}, legacy {want!r}")
+        index = sanitizer.ChartIndex(charts)
+        for chart in charts:
+            stem = PurePosixPath(chart).stem
+            if index.resolve(stem) != chart or index.resolve(stem.upper()) != chart:
+                fail("charts", stem, f"exact stem resolved to {index.resolve(stem)!r}")
+
+        if len(failures) >= 20:
+            break
+
+    if slowest > args.max_ms:
+        fail("time", "", f"slowest call {slowest:.1f} ms > {args.max_ms} ms")
+
+    for kind, text, detail in failures[:20]:
+        print(f"FAIL {kind}: input {text[:200]!r}\n     {detail[:400]}")
+    print(f"{args.cases} cases, seed {args.seed}, slowest call {slowest:.2f} ms, {len(failures)} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,74 @@
-import { writable, derived } from 'svelte/store';
-import type { CrewEvent, RunStatus } from '$lib/types';
+import { writable } from 'svelte/store';
+import type { CrewEvent, RunSnapshot, RunStatus } from '$lib/types';
 
 export const events = writable<CrewEvent[]>([]);
 export const status = writable<RunStatus>('idle');
 export const runId = writable<string | null>(null);
 export const topic = writable<string>('');
 export const reportMarkdown = writable<string | null>(null);
+// Final report rendered server-side (charts inlined) and its download links
+export const reportHtml = writable<string | null>(null);
+export const reportExports = writable<{ html: string; zip: string } | null>(null);
 export const charts = writable<string[]>([]);
 export const elapsedSeconds = writable<number>(0);
 export const error = writable<string | null>(null);
 
-export const currentAgent = derived(events, ($events) => {
-	const last = [...$events].reverse().find((e) => e.type === 'agent_start');
-	return last?.agent ?? null;
-});
+// Kept up to date per event (applyEvent) rather than re-derived from the whole history
+export const currentAgent = writable<string | null>(null);
+export const agentTimings = writable<Record<string, number>>({});
 
-export const agentTimings = derived(events, ($events) => {
+/** Fold one stream event into the stores — O(1) per event. */
+export function applyEvent(event: CrewEvent) {
+	if (event.type === 'snapshot') {
+		if (event.state) applySnapshot(event.state);
+		return;
+	}
+	// Appended in place: the store still notifies, without copying the history
+	events.update((e) => {
+		e.push(event);
+		return e;
+	});
+
+	if (event.type === 'agent_start' && event.agent) {
+		currentAgent.set(event.agent);
+	}
+
+	if (event.type === 'agent_complete' && event.agent && event.elapsed_seconds) {
+		agentTimings.update((t) => ({ ...t, [event.agent!]: event.elapsed_seconds! }));
+	}
+
+	if (event.type === 'chart_created' && event.path) {
+		charts.update((c) => (c.includes(event.path!) ? c : [...c, event.path!]));
+	}
+
+	// Show the report assembled so far — the final fetch replaces it
+	if (event.type === 'report_partial' && event.content) {
+		reportMarkdown.set(event.content);
+	}
+}
+
+/** Take the server's run state as of joining (snapshot join mode). */
+export function applySnapshot(state: RunSnapshot) {
+	currentAgent.set(state.current_agent);
 	const timings: Record<string, number> = {};
-	for (const e of $events) {
-		if (e.type === 'agent_complete' && e.agent && e.elapsed_seconds) {
-			timings[e.agent] = e.elapsed_seconds;
-		}
+	for (const [agent, s] of Object.entries(state.agents)) {
+		if (s.elapsed_seconds) timings[agent] = s.elapsed_seconds;
 	}
-	return timings;
-});
+	agentTimings.set(timings);
+	charts.set([...state.charts]);
+	if (state.report?.content) reportMarkdown.set(state.report.content);
+}
 
 export function resetCrew() {
 	events.set([]);
 	status.set('idle');
 	runId.set(null);
 	reportMarkdown.set(null);
+	reportHtml.set(null);
+	reportExports.set(null);
 	charts.set([]);
 	elapsedSeconds.set(0);
 	error.set(null);
+	currentAgent.set(null);
+	agentTimings.set({});
 }
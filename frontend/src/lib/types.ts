@@ -5,8 +5,10 @@ export interface CrewEvent {
 		| 'agent_complete'
 		| 'delegation'
 		| 'chart_created'
+		| 'report_partial'
 		| 'crew_complete'
-		| 'error';
+		| 'error'
+		| 'snapshot';
 	timestamp: string;
 	run_id?: string;
 	agent?: string;
@@ -24,14 +26,40 @@ export interface CrewEvent {
 	total_seconds?: number;
 	report_path?: string;
 	charts?: string[];
+	stage?: 'research' | 'charts' | 'final';
 	message?: string;
 	recoverable?: boolean;
+	cancelled?: boolean;
+	watchdog?: boolean;
+	// snapshot: the run's state when the stream joined, then events from next_index on
+	state?: RunSnapshot;
+	next_index?: number;
+}
+
+export interface AgentState {
+	status: 'waiting' | 'working' | 'done';
+	role?: string;
+	model?: string;
+	vm?: string;
+	elapsed_seconds?: number;
+	latest_output?: string;
+}
+
+export interface RunSnapshot {
+	status: 'running' | 'completed' | 'cancelled' | 'error';
+	current_agent: string | null;
+	agents: Record<string, AgentState>;
+	charts: string[];
+	report: { stage: 'research' | 'charts' | 'final'; content: string } | null;
+	total_seconds: number | null;
+	report_path: string | null;
+	error: string | null;
 }
 
 export interface CrewStatus {
 	run_id: string;
 	topic: string;
-	status: 'pending' | 'running' | 'completed' | 'error';
+	status: 'pending' | 'running' | 'cancelling' | 'completed' | 'cancelled' | 'error';
 	elapsed_seconds: number | null;
 	events_count: number;
 	report_path: string | null;
@@ -14,9 +14,11 @@ export function connectCrewStream(
 	let ws: WebSocket | null = null;
 	let reconnectAttempts = 0;
 	let closed = false;
+	// Index of the next event — a reconnect resumes there instead of replaying the run
+	let nextIndex = 0;
 
 	function connect() {
-		ws = new WebSocket(url);
+		ws = new WebSocket(nextIndex > 0 ? `${url}?since=${nextIndex}` : url);
 
 		ws.onopen = () => {
 			reconnectAttempts = 0;
@@ -25,6 +27,7 @@ export function connectCrewStream(
 		ws.onmessage = (msg) => {
 			try {
 				const event: CrewEvent = JSON.parse(msg.data);
+				nextIndex = event.type === 'snapshot' ? (event.next_index ?? nextIndex) : nextIndex + 1;
 				onEvent(event);
 			} catch {
 				// Ignore malformed messages
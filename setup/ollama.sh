@@ -1,8 +1,8 @@
 #!/usr/bin/env bash
-# ollama.sh — Install Ollama, configure bind address, pull model
+# ollama.sh — Install Ollama, configure bind address, pull models
 set -euo pipefail
 
-MODEL="${1:?Usage: ollama.sh <model_name>}"
+: "${1:?Usage: ollama.sh <model_name> [<model_name>...]}"
 
 # Install Ollama if not present
 if ! command -v ollama &>/dev/null; then
@@ -35,7 +35,9 @@ for i in $(seq 1 30); do
     sleep 2
 done
 
-# Pull the model
-echo "Pulling ${MODEL} (this may take several minutes)..."
-ollama pull "${MODEL}"
-echo "✓ Ollama ready: $(ollama list | grep "${MODEL}")"
+# Pull the models
+for MODEL in "$@"; do
+    echo "Pulling ${MODEL} (this may take several minutes)..."
+    ollama pull "${MODEL}"
+    echo "✓ Ollama ready: $(ollama list | grep "${MODEL}")"
+done